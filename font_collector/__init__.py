@@ -2,10 +2,14 @@ import logging
 from .ass_document import AssDocument
 from .ass_style import AssStyle
 from .exceptions import InvalidFontException, NameNotFoundException
+from .font_index import FontIndex
 from .font_loader import FontLoader
 from .font_result import FontResult
 from .font import Font
+from .font_file import FontFacePool, FontFile, FontFileReader
+from .glyph_coverage import GlyphCoverage
 from .helpers import Helpers
+from .mapped_font_index import MappedFontIndex
 from .mkvpropedit import Mkvpropedit
 from .usage_data import UsageData
 from ._version import __version__
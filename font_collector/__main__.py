@@ -1,19 +1,34 @@
 import logging
+import os
+import signal
 import sys
+import threading
 from .ass_document import AssDocument
+from .ass_style import AssStyle
 from .font import Font
 from .font_loader import FontLoader
 from .font_result import FontResult
+from .font_server import FontClient, FontServer
 from .helpers import Helpers
 from .mkvpropedit import Mkvpropedit
-from .parse_arguments import parse_arguments
-from typing import List
+from .parse_arguments import parse_arguments, parse_index_arguments, parse_serve_arguments
+from .usage_data import UsageData
+from concurrent.futures import Future
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 
 _logger = logging.getLogger(__name__)
 
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        return serve(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "index":
+        return index(sys.argv[2:])
+
     (
         ass_files_path,
         output_directory,
@@ -21,21 +36,59 @@ def main():
         delete_fonts,
         additional_fonts,
         use_system_font,
-        collect_draw_fonts
+        collect_draw_fonts,
+        jobs,
+        use_font_index,
+        font_index_format,
+        rescan_system_fonts,
+        lazy_system_fonts,
+        parse_timeout,
+        socket_path,
+        use_server
     ) = parse_arguments()
     font_results: List[FontResult] = []
-    font_collection = FontLoader(additional_fonts, use_system_font).fonts
+
+    font_client: Optional[FontClient] = None
+    if use_server:
+        font_client = _connect_to_server(socket_path, additional_fonts, use_system_font, lazy_system_fonts)
+
+    subtitles_styles: List[Dict[AssStyle, UsageData]] = []
+
+    # The subtitles don't need the fonts, so they are parsed while the fonts are loaded
+    if font_client is None:
+        font_loader_future = _run_in_daemon_thread(
+            FontLoader,
+            additional_fonts,
+            use_system_font,
+            jobs,
+            use_font_index,
+            font_index_format,
+            rescan_system_fonts,
+            lazy_system_fonts,
+            parse_timeout,
+        )
 
     for ass_path in ass_files_path:
         subtitle = AssDocument.from_file(ass_path)
         _logger.info(f"Loaded successfully {ass_path}")
-        styles = subtitle.get_used_style(collect_draw_fonts)
+        subtitles_styles.append(subtitle.get_used_style(collect_draw_fonts))
+
+    if font_client is None:
+        font_collection = font_loader_future.result()
+
+    for styles in subtitles_styles:
+
+        if font_client is not None:
+            server_font_results = font_client.get_used_fonts_by_style(list(styles.keys()))
 
         nbr_font_not_found = 0
 
-        for style, usage_data in styles.items():
+        for i, (style, usage_data) in enumerate(styles.items()):
 
-            font_result = Helpers.get_used_font_by_style(font_collection, style)
+            if font_client is not None:
+                font_result = server_font_results[i]
+            else:
+                font_result = Helpers.get_used_font_by_style(font_collection, style)
 
             # Did not found the font
             if font_result is None:
@@ -58,14 +111,18 @@ def main():
                         f"Used on lines: {' '.join(str(line) for line in usage_data.ordered_lines)}"
                     )
 
-                if (
-                    len(
-                        missing_glyphs := font_result.font.get_missing_glyphs(
-                            usage_data.characters_used
-                        )
+                # The server send the coverage with the font, so the missing glyphs are found locally.
+                # Only the fonts without coverage need the server to open their file.
+                if font_client is not None and font_result.font.coverage is None:
+                    missing_glyphs = font_client.get_missing_glyphs(
+                        font_result.font, usage_data.characters_used
                     )
-                    > 0
-                ):
+                else:
+                    missing_glyphs = font_result.font.get_missing_glyphs(
+                        usage_data.characters_used
+                    )
+
+                if len(missing_glyphs) > 0:
                     _logger.warning(
                         f"'{style.fontname}' is missing the following glyphs used: {missing_glyphs}"
                     )
@@ -75,6 +132,9 @@ def main():
         else:
             _logger.info(f"{nbr_font_not_found} fonts could not be found.")
 
+    if font_client is not None:
+        font_client.close()
+
     fonts_found: List[Font] = [font.font for font in font_results]
 
     if mkv_path is not None:
@@ -85,5 +145,230 @@ def main():
         Helpers.copy_font_to_directory(fonts_found, output_directory)
 
 
+def _connect_to_server(socket_path, additional_fonts, use_system_font, lazy_system_font) -> Optional[FontClient]:
+    """
+    Returns:
+        A client connected to the FontCollector server.
+        If the server isn't running or if it has been started with other fonts, None.
+    """
+    font_client = FontClient.connect(socket_path)
+
+    if font_client is None:
+        return None
+
+    if font_client.ping()["config"] != FontServer.get_config(additional_fonts, use_system_font, lazy_system_font):
+        _logger.info(
+            f'The FontCollector server "{font_client.socket_path}" has been started with other fonts. It won\'t be used.'
+        )
+        font_client.close()
+        return None
+
+    _logger.info(f'Using the FontCollector server "{font_client.socket_path}"')
+    return font_client
+
+
+def serve(arguments: List[str]):
+    (
+        additional_fonts,
+        use_system_font,
+        jobs,
+        use_font_index,
+        font_index_format,
+        rescan_system_fonts,
+        lazy_system_fonts,
+        parse_timeout,
+        socket_path
+    ) = parse_serve_arguments(arguments)
+
+    font_loader = FontLoader(
+        additional_fonts, use_system_font, jobs, use_font_index, font_index_format, rescan_system_fonts, lazy_system_fonts, parse_timeout
+    )
+
+    with FontServer(
+        font_loader,
+        FontServer.get_config(additional_fonts, use_system_font, lazy_system_fonts),
+        socket_path,
+    ) as font_server:
+        _logger.info(f'FontCollector server listening on "{font_server.server_address}"')
+
+        # Stop the server cleanly (and remove the socket) when it is terminated
+        def stop_server(signum, frame):
+            raise KeyboardInterrupt
+
+        signal.signal(signal.SIGTERM, stop_server)
+
+        try:
+            font_server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def index(arguments: List[str]) -> int:
+    (
+        action,
+        additional_fonts,
+        use_system_font,
+        jobs,
+        use_font_index,
+        font_index_format,
+        parse_timeout
+    ) = parse_index_arguments(arguments)
+
+    sources = _get_index_sources(additional_fonts, use_system_font, use_font_index, font_index_format)
+
+    if action in ("build", "clear"):
+        if use_system_font:
+            if not use_font_index:
+                FontLoader.discard_system_font_cache()
+            elif font_index_format == "sqlite":
+                FontLoader.discard_system_font_index()
+            else:
+                FontLoader.discard_system_mapped_font_index()
+        for additional_font in additional_fonts:
+            FontLoader.discard_additional_font_cache(additional_font)
+
+        if action == "clear":
+            FontLoader.discard_quarantined_files()
+            FontLoader.save_index_build(sources, None)
+            _logger.info("The cache has been deleted")
+            return 0
+
+    if action in ("build", "refresh"):
+        start_time = perf_counter()
+        font_loader = FontLoader(
+            additional_fonts,
+            use_system_font,
+            jobs,
+            use_font_index,
+            font_index_format,
+            force_system_font_enumeration=True,
+            parse_timeout=parse_timeout,
+        )
+        if font_loader.system_font_index is not None:
+            font_loader.system_font_index.close()
+
+        duration = perf_counter() - start_time
+        FontLoader.save_index_build(sources, action, datetime.now().timestamp(), duration)
+
+        # FontLoader.fonts also contain the generated fonts, which aren't in this cache
+        fonts, _, _ = _read_font_caches(additional_fonts, use_system_font, use_font_index, font_index_format)
+        _logger.info(f"The cache contain {len(fonts)} fonts. It has been updated in {duration:.2f} seconds")
+        return 0
+
+    fonts, files_signature, cache_files = _read_font_caches(
+        additional_fonts, use_system_font, use_font_index, font_index_format
+    )
+
+    if action == "stats":
+        fonts_filename = set(font.filename for font in fonts)
+        faces = set((font.filename, font.font_index) for font in fonts)
+        cache_size = sum(os.path.getsize(cache_file) for cache_file in cache_files)
+
+        _logger.info(f"Cache files: {len(cache_files)} ({cache_size / 1024 / 1024:.2f} MiB)")
+        if len(cache_files) > 0:
+            last_update = max(os.path.getmtime(cache_file) for cache_file in cache_files)
+            _logger.info(f"Last update: {datetime.fromtimestamp(last_update).isoformat(sep=' ', timespec='seconds')}")
+
+            index_build = FontLoader.load_index_builds().get(sources)
+            if index_build is not None:
+                build_action, build_timestamp, build_duration = index_build
+                _logger.info(
+                    f"Last {build_action}: {datetime.fromtimestamp(build_timestamp).isoformat(sep=' ', timespec='seconds')} "
+                    f"(it took {build_duration:.2f} seconds)"
+                )
+        _logger.info(f"Font files: {len(files_signature)} ({len(set(files_signature).difference(fonts_filename))} without any valid font)")
+        _logger.info(f"Font faces: {len(faces)}")
+        _logger.info(f"Fonts: {len(fonts)} ({sum(font.is_var for font in fonts)} variable font instances)")
+
+        quarantined_files = FontLoader.load_quarantined_files()
+        _logger.info(f"Quarantined files: {len(quarantined_files)}")
+        for font_path, (_, reason) in sorted(quarantined_files.items()):
+            _logger.warning(f'The file "{font_path}" is quarantined: {reason}')
+        return 0
+
+    # verify
+    modified_files: List[str] = []
+    deleted_files: List[str] = []
+    for font_path, file_signature in sorted(files_signature.items()):
+        try:
+            if FontLoader.get_file_signature(font_path) != file_signature:
+                modified_files.append(font_path)
+        except FileNotFoundError:
+            deleted_files.append(font_path)
+
+    for font_path in modified_files:
+        _logger.warning(f'The file "{font_path}" has been modified since it has been cached')
+    for font_path in deleted_files:
+        _logger.warning(f'The file "{font_path}" has been deleted since it has been cached')
+
+    if len(modified_files) == 0 and len(deleted_files) == 0:
+        _logger.info(f"The cache is up to date. {len(files_signature)} files have been checked.")
+        return 0
+
+    _logger.info(f'The cache is outdated. Run "fontcollector index refresh" to update it.')
+    return 1
+
+
+def _get_index_sources(
+    additional_fonts: Set[Path], use_system_font: bool, use_font_index: bool, font_index_format: str
+) -> Tuple:
+    """
+    Returns:
+        A value that identify the fonts sources of the index command. See FontLoader.save_index_build.
+    """
+    return (
+        tuple(sorted(os.path.abspath(additional_font) for additional_font in additional_fonts)),
+        use_system_font,
+        font_index_format if use_system_font and use_font_index else None,
+    )
+
+
+def _run_in_daemon_thread(function: Callable, *args) -> Future:
+    """
+    Unlike ThreadPoolExecutor, the program does not wait for the thread before exiting.
+    So, if the main thread raise an exception (ex: an invalid subtitle), it is reported without waiting for the function to finish.
+
+    Returns:
+        The future of function(*args).
+    """
+    future: Future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(function(*args))
+        except BaseException as exception:
+            future.set_exception(exception)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def _read_font_caches(
+    additional_fonts: Set[Path], use_system_font: bool, use_font_index: bool, font_index_format: str
+) -> Tuple[Set[Font], Dict[str, Tuple[int, int, int]], List[Path]]:
+    """
+    Returns:
+        The cached fonts, the signature of the cached files and the files that contain the cache.
+    """
+    fonts: Set[Font] = set()
+    files_signature: Dict[str, Tuple[int, int, int]] = {}
+    cache_files: List[Path] = []
+
+    if use_system_font:
+        fonts, files_signature, cache_files = FontLoader.read_system_font_cache(use_font_index, font_index_format)
+
+    for additional_font in additional_fonts:
+        cache_file = FontLoader.get_additional_font_cache_file_path(additional_font)
+        if os.path.isfile(cache_file):
+            cached_fonts, cached_files_signature = FontLoader.load_font_cache_file(cache_file)
+            fonts.update(cached_fonts)
+            files_signature.update(cached_files_signature)
+            cache_files.append(cache_file)
+
+    return fonts, files_signature, cache_files
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,89 @@
+import os
+import threading
+from pathlib import Path
+from typing import Dict
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+class FileLock:
+    """
+    Advisory lock shared between processes. It is used to coordinate the processes that write the same cache file.
+    It is also shared between the threads of a process, since some platforms only lock a file per process.
+    The lock is not reentrant. A process must not acquire the same lock twice.
+
+    Example:
+        with FileLock(Path("cache.bin.lock")):
+            ...
+    """
+
+    lock_file: Path
+
+    # The lock used between the threads of this process for each lock file
+    _thread_locks: Dict[str, threading.Lock] = {}
+    _thread_locks_lock = threading.Lock()
+
+    def __init__(self, lock_file: Path):
+        """
+        Parameters:
+            lock_file (Path): File used to hold the lock. It is created if it does not exist.
+        """
+        self.lock_file = lock_file
+        self._file = None
+
+        with FileLock._thread_locks_lock:
+            self._thread_lock = FileLock._thread_locks.setdefault(os.path.abspath(lock_file), threading.Lock())
+
+    def acquire(self) -> None:
+        """
+        Wait until the lock is free, then acquire it.
+        """
+        self._thread_lock.acquire()
+
+        try:
+            self._file = open(self.lock_file, "a+b")
+        except BaseException:
+            self._thread_lock.release()
+            raise
+
+        try:
+            if os.name == "nt":
+                while True:
+                    try:
+                        # LK_LOCK only retry for 10 seconds, so we retry until the lock is acquired
+                        self._file.seek(0)
+                        msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            self._file.close()
+            self._file = None
+            self._thread_lock.release()
+            raise
+
+    def release(self) -> None:
+        if self._file is None:
+            return
+
+        if os.name == "nt":
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+        self._file.close()
+        self._file = None
+        self._thread_lock.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.release()
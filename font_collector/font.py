@@ -1,114 +1,217 @@
 import logging
 import os
+import sys
 from .exceptions import InvalidFontException
+from .font_file import FontFacePool, FontFileReader
 from .font_parser import FontParser, NameID
-from ctypes import byref
+from .glyph_coverage import GlyphCoverage
 from fontTools.ttLib.ttFont import TTFont
 from fontTools.ttLib.ttCollection import TTCollection
 from freetype import (
-    FT_Done_Face,
-    FT_Done_FreeType,
     FT_Exception,
     FT_Face,
     FT_Get_Char_Index,
-    FT_Get_CMap_Format,
-    FT_Init_FreeType,
-    FT_Library,
-    FT_New_Memory_Face,
     FT_Set_Charmap,
 )
-from typing import Any, Dict, List, Sequence, Set, Tuple
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
 
 _logger = logging.getLogger(__name__)
 
 
 class Font:
+    """
+    A font face. A Font is immutable: its attributes can't be modified after it has been created.
+    The names are lowercased and interned, so the fonts of the same family share the same strings.
+    The hash is computed once, since the fonts are mostly used in sets.
+    The coverage is the characters that the font can display. It is computed when the font is parsed, so get_missing_glyphs does not need to open the font file.
+        It isn't part of the identity of the font (__eq__ and __hash__).
+
+    face_pool: The FreeType faces used by get_missing_glyphs when a font does not have a coverage.
+        They are kept between the calls. Call face_pool.close() to release them.
+    """
+
+    __slots__ = (
+        "filename",
+        "font_index",
+        "family_names",
+        "weight",
+        "italic",
+        "exact_names",
+        "named_instance_coordinates",
+        "coverage",
+        "_hash",
+    )
+
     filename: str
     font_index: int
-    __family_names: Set[str]
+    family_names: FrozenSet[str]
     weight: int
     italic: bool
-    __exact_names: Set[
+    exact_names: FrozenSet[
         str
     ]  # if the font is a TrueType, it will be the "full_name". if the font is a OpenType, it will be the "postscript name"
-    named_instance_coordinates: Dict[str, float] = {}
+    named_instance_coordinates: Dict[str, float]
+    coverage: Optional[GlyphCoverage]
+    _hash: int
+
+    face_pool: FontFacePool = FontFacePool()
 
     def __init__(
         self,
         filename: str,
         font_index: int,
-        family_names: Sequence[str],
+        family_names: Iterable[str],
         weight: int,
         italic: bool,
-        exact_names: Sequence[str],
+        exact_names: Iterable[str],
         named_instance_coordinates: Dict[str, float] = {},
+        coverage: Optional[GlyphCoverage] = None,
     ):
-        self.filename = filename
-        self.font_index = font_index
-        self.family_names = family_names
-        self.weight = weight
-        self.italic = italic
-        self.exact_names = exact_names
-        self.named_instance_coordinates = named_instance_coordinates
+        Font._initialize(self, filename, font_index, family_names, weight, italic, exact_names, named_instance_coordinates, coverage)
+
+    @staticmethod
+    def _initialize(
+        font: "Font",
+        filename: str,
+        font_index: int,
+        family_names: Iterable[str],
+        weight: int,
+        italic: bool,
+        exact_names: Iterable[str],
+        named_instance_coordinates: Dict[str, float],
+        coverage: Optional[GlyphCoverage],
+    ) -> None:
+        # The attributes can only be set here, see __setattr__
+        family_names = frozenset(sys.intern(family_name.lower()) for family_name in family_names)
+        exact_names = frozenset(sys.intern(exact_name.lower()) for exact_name in exact_names)
+        filename = sys.intern(str(filename))
+
+        object.__setattr__(font, "filename", filename)
+        object.__setattr__(font, "font_index", font_index)
+        object.__setattr__(font, "family_names", family_names)
+        object.__setattr__(font, "weight", weight)
+        object.__setattr__(font, "italic", italic)
+        object.__setattr__(font, "exact_names", exact_names)
+        object.__setattr__(font, "named_instance_coordinates", named_instance_coordinates)
+        object.__setattr__(font, "coverage", coverage)
+        object.__setattr__(
+            font, "_hash", hash((filename, font_index, family_names, italic, weight, exact_names))
+        )
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f'A Font is immutable, "{name}" can\'t be modified. Create a new Font instead.')
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f'A Font is immutable, "{name}" can\'t be deleted.')
+
+    def __reduce__(self):
+        # Only the constructor arguments are pickled. It make the caches smaller than pickling the attributes by name.
+        arguments = (
+            self.filename,
+            self.font_index,
+            tuple(self.family_names),
+            self.weight,
+            self.italic,
+            tuple(self.exact_names),
+        )
+        if self.coverage is not None:
+            arguments += (self.named_instance_coordinates, self.coverage)
+        elif len(self.named_instance_coordinates) > 0:
+            arguments += (self.named_instance_coordinates,)
+        return (Font, arguments)
+
+    def __setstate__(self, state: Dict[str, Any]):
+        # previous version to 2.1.4 (included) was pickling the attributes of the font
+        Font._initialize(
+            self,
+            state["filename"],
+            state["font_index"],
+            state["_Font__family_names"],
+            state["weight"],
+            state["italic"],
+            state["_Font__exact_names"],
+            state.get("named_instance_coordinates", {}),
+            None,
+        )
 
     @classmethod
     def from_font_path(cls, font_path: str) -> List["Font"]:
         """
         Parameters:
             font_path (str): Font path. The font can be a .ttf, .otf or .ttc
+                It can also be a member of a .zip archive. See FontFile.
         Returns:
             An Font object that represent the file at the font_path
         """
         ttFonts: List[TTFont] = []
         fonts: List[Font] = []
 
-        with open(font_path, "rb") as font_file:
+        # The file is read once. fontTools and freetype share its content.
+        # The tables are loaded lazily, so only the tables used to identify the font (name, OS/2, fvar and STAT) are read and decompiled.
+        # The big tables (glyf, CFF, GSUB, ...) are never read, and the file isn't copied in memory.
+        with FontFileReader(font_path) as font_file_reader:
+            font_file = font_file_reader.get_stream()
             if FontParser.is_file_truetype_collection(font_file):
-                ttFonts.extend(TTCollection(font_path).fonts)
+                ttFonts.extend(TTCollection(font_file_reader.get_stream(), lazy=True).fonts)
             elif FontParser.is_file_truetype(font_file) or FontParser.is_file_opentype(
                 font_file
             ):
-                ttFonts.append(TTFont(font_path))
+                ttFonts.append(TTFont(font_file_reader.get_stream(), lazy=True))
             else:
                 raise FileExistsError(
                     f'The file "{font_path}" is not a valid font file'
                 )
 
-        try:
+            try:
 
-            # Read font attributes
-            for font_index, ttFont in enumerate(ttFonts):
+                # Read font attributes
+                for font_index, ttFont in enumerate(ttFonts):
 
-                # If is Variable Font, else "normal" font
-                if FontParser.is_valid_variable_font(ttFont):
-                    fonts.extend(
-                        Font._open_variable_font(ttFont, font_path, font_index)
-                    )
-                else:
+                    # The named instances of a variable font share the same coverage
                     try:
-                        font = Font._open_normal_font(ttFont, font_path, font_index)
-                    except InvalidFontException as e:
-                        _logger.info(f"{e}. The font {font_path} will be ignored.")
-                        continue
+                        coverage = GlyphCoverage.from_face(font_file_reader.get_face(font_index))
+                    except FT_Exception:
+                        # get_missing_glyphs will use freetype
+                        coverage = None
+
+                    # If is Variable Font, else "normal" font
+                    if FontParser.is_valid_variable_font(ttFont):
+                        fonts.extend(
+                            Font._open_variable_font(ttFont, font_path, font_index, coverage)
+                        )
+                    else:
+                        try:
+                            font = Font._open_normal_font(ttFont, font_path, font_index, font_file_reader, coverage)
+                        except InvalidFontException as e:
+                            _logger.info(f"{e}. The font {font_path} will be ignored.")
+                            continue
 
-                    fonts.append(font)
+                        fonts.append(font)
 
-        except Exception:
-            _logger.error(
-                f'An unknown error occurred while reading the font "{font_path}"{os.linesep}Please open an issue on github, share the font and the following error message:'
-            )
-            raise
+            except Exception:
+                _logger.error(
+                    f'An unknown error occurred while reading the font "{font_path}"{os.linesep}Please open an issue on github, share the font and the following error message:'
+                )
+                raise
+        # The lazy TTFont read the stream of the reader, so they must not be used after it has been closed
         return fonts
 
     @classmethod
     def _open_normal_font(
-        cls, ttFont: TTFont, font_path: str, font_index: int
+        cls,
+        ttFont: TTFont,
+        font_path: str,
+        font_index: int,
+        font_file_reader: Optional[FontFileReader] = None,
+        coverage: Optional[GlyphCoverage] = None,
     ) -> "Font":
         """
         Parameters:
             font (TTFont): An fontTools object
             font_path (str): Font path.
             font_index (int): Font index.
+            font_file_reader (FontFileReader): The reader of the font file. If None and freetype is needed, the file is read again.
+            coverage (GlyphCoverage): The coverage of the font. See GlyphCoverage.from_face.
         Returns:
             An Font instance that represent the ttFont
         """
@@ -137,13 +240,13 @@ class Font:
         else:
             exact_names = set()
             postscript_name = FontParser.get_font_postscript_property(
-                font_path, font_index
+                font_path, font_index, font_file_reader
             )
             if postscript_name is not None:
                 exact_names.add(postscript_name)
 
         is_italic, weight = FontParser.get_font_italic_bold_property(
-            ttFont, font_path, font_index
+            ttFont, font_path, font_index, font_file_reader
         )
 
         return cls(
@@ -153,17 +256,19 @@ class Font:
             weight,
             is_italic,
             exact_names,
+            coverage=coverage,
         )
 
     @classmethod
     def _open_variable_font(
-        cls, ttFont: TTFont, font_path: str, font_index: int
+        cls, ttFont: TTFont, font_path: str, font_index: int, coverage: Optional[GlyphCoverage] = None
     ) -> List["Font"]:
         """
         Parameters:
             font (TTFont): An fontTools object
             font_path (str): Font path.
             font_index (int): Font index.
+            coverage (GlyphCoverage): The coverage of the font. See GlyphCoverage.from_face.
         Returns:
             An list of Font instance that represent the ttFont.
         """
@@ -207,32 +312,19 @@ class Font:
                 is_italic,
                 fullnames,
                 instance_coordinates,
+                coverage,
             )
             fonts.append(font)
 
         return fonts
 
-    @property
-    def family_names(self):
-        return self.__family_names
-
-    @family_names.setter
-    def family_names(self, family_names: List[str]):
-        self.__family_names = set([family_name.lower() for family_name in family_names])
-
-    @property
-    def exact_names(self):
-        return self.__exact_names
-
-    @exact_names.setter
-    def exact_names(self, exact_names: List[str]):
-        self.__exact_names = set([exact_name.lower() for exact_name in exact_names])
-
     @property
     def is_var(self):
         return len(self.named_instance_coordinates) > 0
 
     def __eq__(self, other: "Font"):
+        if not isinstance(other, Font):
+            return NotImplemented
         return (self.family_names, self.weight, self.italic, self.exact_names) == (
             other.family_names,
             other.weight,
@@ -241,16 +333,7 @@ class Font:
         )
 
     def __hash__(self):
-        return hash(
-            (
-                self.filename,
-                self.font_index,
-                tuple(self.family_names),
-                self.italic,
-                self.weight,
-                tuple(self.exact_names),
-            )
-        )
+        return self._hash
 
     def __repr__(self):
         return f'Filename: "{self.filename}" Family_names: "{self.family_names}", Weight: "{self.weight}", Italic: "{self.italic}, Exact_names: "{self.exact_names}", Named_instance_coordinates: "{self.named_instance_coordinates}"'
@@ -271,78 +354,73 @@ class Font:
         Returns:
             A set of all the character that the font cannot display.
         """
+        # The coverage has been computed when the font has been parsed
+        if self.coverage is not None:
+            return self.coverage.get_missing_glyphs(text, support_only_ascii_char_for_symbol_font)
 
-        char_not_found: Set[str] = set()
+        # We cannot use FT_New_Face due to this issue: https://github.com/rougier/freetype-py/issues/157
+        # The pool give the memory-mapped file to FT_New_Memory_Face, and the face is kept for the next calls
+        with Font.face_pool.acquire(self.filename, self.font_index) as face:
+            return self._get_missing_glyphs(face, text, support_only_ascii_char_for_symbol_font)
 
-        library = FT_Library()
-        face = FT_Face()
+    def _get_missing_glyphs(
+        self,
+        face: FT_Face,
+        text: Sequence[str],
+        support_only_ascii_char_for_symbol_font: bool
+    ) -> Set[str]:
+        # Each charmap is selected once, then all the characters that haven't been found yet are searched in it
+        char_not_found = set(text)
 
-        error = FT_Init_FreeType(byref(library))
-        if error: raise FT_Exception(error)
+        for charmap in FontParser.get_supported_charmaps(face):
+            if len(char_not_found) == 0:
+                break
 
-        # We cannot use FT_New_Face due to this issue: https://github.com/rougier/freetype-py/issues/157
-        with open(self.filename, mode="rb") as f:
-            filebody = f.read()
-        error = FT_New_Memory_Face(library, filebody, len(filebody), self.font_index, byref(face))
-        if error: raise FT_Exception(error)
+            error = FT_Set_Charmap(face, charmap)
+            if error: raise FT_Exception(error)
 
-        supported_charmaps = [face.contents.charmaps[i] for i in range(face.contents.num_charmaps) if FT_Get_CMap_Format(face.contents.charmaps[i]) != -1 and face.contents.charmaps[i].contents.platform_id == 3]
+            platform_id = charmap.contents.platform_id
+            encoding_id = charmap.contents.encoding_id
 
-        # GDI seems to take apple cmap if there isn't any microsoft cmap: https://github.com/libass/libass/issues/679
-        if len(supported_charmaps) == 0:
-            supported_charmaps = [face.contents.charmaps[i] for i in range(face.contents.num_charmaps) if FT_Get_CMap_Format(face.contents.charmaps[i]) != -1 and face.contents.charmaps[i].contents.platform_id == 1 and face.contents.charmaps[i].contents.encoding_id == 0]
+            cmap_encoding = FontParser.get_cmap_encoding(platform_id, encoding_id)
 
-        for char in text:
-            char_found = False
+            # cmap not supported
+            if cmap_encoding is None:
+                continue
 
-            for charmap in supported_charmaps:
-                error = FT_Set_Charmap(face, charmap)
-                if error: raise FT_Exception(error)
+            if cmap_encoding == "unicode":
+                char_not_found.difference_update([char for char in char_not_found if FT_Get_Char_Index(face, ord(char))])
+                continue
 
-                platform_id = charmap.contents.platform_id
-                encoding_id = charmap.contents.encoding_id
+            is_symbol_cmap = platform_id == 3 and encoding_id == 0
+            chars = char_not_found
+            if cmap_encoding == "unknown":
+                if not is_symbol_cmap:
+                    # cmap not supported
+                    continue
 
-                cmap_encoding = FontParser.get_cmap_encoding(platform_id, encoding_id)
+                if support_only_ascii_char_for_symbol_font:
+                    chars = set(char for char in char_not_found if char.isascii())
 
-                # cmap not supported 
+                cmap_encoding = FontParser.get_symbol_cmap_encoding(face)
                 if cmap_encoding is None:
+                    # Fallback if guess fails
+                    cmap_encoding = "cp1252"
+
+            # The table replace char.encode(cmap_encoding). A character that the encoding can't encode isn't in it.
+            encoding_table = FontParser.get_cmap_encoding_table(cmap_encoding)
+            char_found: List[str] = []
+            for char in chars:
+                codepoint = encoding_table.get(char)
+                if codepoint is None:
                     continue
 
-                if cmap_encoding == "unicode":
-                    codepoint = ord(char)
-                else:
-                    if cmap_encoding == "unknown":
-                        if platform_id == 3 and encoding_id == 0:
-                            if support_only_ascii_char_for_symbol_font and not char.isascii():
-                                continue
-                            cmap_encoding = FontParser.get_symbol_cmap_encoding(face)
-
-                            if cmap_encoding is None:
-                                # Fallback if guess fails
-                                cmap_encoding = "cp1252"
-                        else:
-                            # cmap not supported 
-                            continue
-
-                    try:
-                        codepoint = int.from_bytes(char.encode(cmap_encoding), "big")
-                    except UnicodeEncodeError:
-                        continue
-
                 # GDI/Libass modify the codepoint for microsoft symbol cmap: https://github.com/libass/libass/blob/04a208d5d200360d2ac75f8f6cfc43dd58dd9225/libass/ass_font.c#L249-L250
-                if platform_id == 3 and encoding_id == 0:
+                if is_symbol_cmap:
                     codepoint = 0xF000 | codepoint
 
-                index = FT_Get_Char_Index(face, codepoint)
-
-                if index:
-                    char_found = True
-                    break
-
-            if not char_found:
-                char_not_found.add(char)
-
-        FT_Done_Face(face)
-        FT_Done_FreeType(library)
+                if FT_Get_Char_Index(face, codepoint):
+                    char_found.append(char)
+            char_not_found.difference_update(char_found)
 
         return char_not_found
@@ -0,0 +1,361 @@
+import mmap
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from ctypes import byref, c_ubyte
+from freetype import FT_Done_Face, FT_Done_FreeType, FT_Exception, FT_Face, FT_Init_FreeType, FT_Library, FT_New_Memory_Face
+from functools import lru_cache
+from io import BytesIO
+from typing import BinaryIO, Dict, Iterator, Optional, Set, Tuple
+from zipfile import ZipFile, is_zipfile
+
+FONT_FILE_EXTENSIONS = frozenset([".ttf", ".otf", ".ttc", ".otc"])
+
+
+class FontFile:
+    """
+    Access the font files. A font file can be a file on the disk or a member of a .zip archive.
+    The filename of a member is the archive path and the member name joined by ARCHIVE_MEMBER_SEPARATOR.
+        Example: "C:\\Fonts\\pack.zip::Fonts/Arial.ttf"
+    A path on the disk can also contain ARCHIVE_MEMBER_SEPARATOR, so a filename is only a member if the part before it is a .zip archive.
+    The members are read in memory, they are never extracted on the disk.
+    """
+
+    ARCHIVE_MEMBER_SEPARATOR = "::"
+
+    @staticmethod
+    def is_archive(path: str) -> bool:
+        """
+        Parameters:
+            path (str): Path
+        Returns:
+            True if the path is a .zip archive, false in any others cases
+        """
+        return os.path.splitext(path)[1].lower() == ".zip" and is_zipfile(path)
+
+    @staticmethod
+    def is_archive_member(filename: str) -> bool:
+        return FontFile._split_archive_member(str(filename)) is not None
+
+    @staticmethod
+    def join_archive_member(archive_path: str, member_name: str) -> str:
+        return f"{archive_path}{FontFile.ARCHIVE_MEMBER_SEPARATOR}{member_name}"
+
+    @staticmethod
+    def split_archive_member(filename: str) -> Tuple[str, str]:
+        """
+        Parameters:
+            filename (str): Filename of an archive member.
+        Returns:
+            The archive path and the member name.
+        """
+        archive_member = FontFile._split_archive_member(str(filename))
+        if archive_member is None:
+            raise ValueError(f'The file "{filename}" is not a member of an archive')
+        return archive_member
+
+    @staticmethod
+    def _split_archive_member(filename: str) -> Optional[Tuple[str, str]]:
+        # A path on the disk can also contain the separator, so the filename is only split where the part before it is an archive
+        separator_index = filename.find(FontFile.ARCHIVE_MEMBER_SEPARATOR)
+        while separator_index != -1:
+            archive_path = filename[:separator_index]
+            if os.path.isfile(archive_path) and FontFile.is_archive(archive_path):
+                return archive_path, filename[separator_index + len(FontFile.ARCHIVE_MEMBER_SEPARATOR) :]
+            separator_index = filename.find(FontFile.ARCHIVE_MEMBER_SEPARATOR, separator_index + 1)
+        return None
+
+    @staticmethod
+    def get_fonts_paths_in_archive(archive_path: str) -> Set[str]:
+        """
+        Parameters:
+            archive_path (str): Path of a .zip archive.
+        Returns:
+            The filename of all the .ttf, .otf, .ttc and .otc members of the archive.
+        """
+        return set(
+            FontFile.join_archive_member(archive_path, member.filename)
+            for member in FontFile._open_archive(archive_path, os.stat(archive_path).st_mtime_ns).infolist()
+            if not member.is_dir() and os.path.splitext(member.filename)[1].strip().lower() in FONT_FILE_EXTENSIONS
+        )
+
+    @staticmethod
+    def get_name(filename: str) -> str:
+        """
+        Parameters:
+            filename (str): Filename of a font.
+        Returns:
+            The name of the file, without its directory.
+        """
+        if FontFile.is_archive_member(filename):
+            return os.path.basename(FontFile.split_archive_member(filename)[1])
+        return os.path.basename(filename)
+
+    @staticmethod
+    def get_signature_path(filename: str) -> str:
+        """
+        Parameters:
+            filename (str): Filename of a font.
+        Returns:
+            The path on the disk that need to be checked to know if the font changed.
+            For an archive member, it is the archive.
+        """
+        if FontFile.is_archive_member(filename):
+            return FontFile.split_archive_member(filename)[0]
+        return filename
+
+    @staticmethod
+    def open(filename: str) -> BinaryIO:
+        """
+        Parameters:
+            filename (str): Filename of a font.
+        Returns:
+            The font file opened in binary mode. An archive member is read in memory.
+        """
+        if FontFile.is_archive_member(filename):
+            return BytesIO(FontFile.read(filename))
+        return open(filename, "rb")
+
+    @staticmethod
+    def read(filename: str) -> bytes:
+        """
+        Parameters:
+            filename (str): Filename of a font.
+        Returns:
+            The content of the font file.
+        """
+        if FontFile.is_archive_member(filename):
+            archive_path, member_name = FontFile.split_archive_member(filename)
+            return FontFile._open_archive(archive_path, os.stat(archive_path).st_mtime_ns).read(member_name)
+
+        with open(filename, "rb") as file:
+            return file.read()
+
+    @staticmethod
+    def copy(filename: str, destination: str) -> None:
+        """
+        Copy the font file. An archive member is streamed from the archive to the destination.
+
+        Parameters:
+            filename (str): Filename of a font.
+            destination (str): The destination file path.
+        """
+        if FontFile.is_archive_member(filename):
+            archive_path, member_name = FontFile.split_archive_member(filename)
+            archive = FontFile._open_archive(archive_path, os.stat(archive_path).st_mtime_ns)
+
+            with archive.open(member_name) as member, open(destination, "wb") as destination_file:
+                shutil.copyfileobj(member, destination_file)
+        else:
+            shutil.copy(filename, destination)
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _open_archive(archive_path: str, mtime_ns: int) -> ZipFile:
+        # Reading the central directory of a big archive is slow, so the archives stay open.
+        # The modification time is part of the key, so a modified archive is opened again.
+        return ZipFile(archive_path)
+
+
+class FontFileReader:
+    """
+    Read a font file once and share its content between fontTools and FreeType.
+    A file on the disk is memory-mapped, so it is read by the page cache instead of being copied for each parser.
+    A member of an archive is read in memory.
+
+    The reader need to be closed (or used as a context manager) when the fonts have been parsed.
+    It release the FreeType faces and the mapping immediately instead of when the garbage collector run.
+
+    Example:
+        with FontFileReader("Arial.ttf") as reader:
+            ttFont = TTFont(reader.get_stream())
+            face = reader.get_face(0)
+    """
+
+    filename: str
+
+    def __init__(self, filename: str):
+        """
+        Parameters:
+            filename (str): Filename of a font. It can be a member of a .zip archive. See FontFile.
+        """
+        self.filename = filename
+        self._mmap: Optional[mmap.mmap] = None
+        self._data = b""
+        self._library: Optional[FT_Library] = None
+        self._faces: Dict[int, FT_Face] = {}
+        self._is_closed = False
+
+        if FontFile.is_archive_member(filename):
+            self._data = FontFile.read(filename)
+        else:
+            with open(filename, "rb") as file:
+                # An empty file can't be mapped
+                if os.fstat(file.fileno()).st_size > 0:
+                    # ACCESS_COPY give a buffer that ctypes can point to. It is never written, so the pages stay shared with the page cache.
+                    self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+                    self._buffer = (c_ubyte * len(self._mmap)).from_buffer(self._mmap)
+
+    def get_stream(self) -> BinaryIO:
+        """
+        Returns:
+            A stream over the content of the file, positioned at the beginning. The content isn't copied.
+            Each call rewind the same stream, so a stream must not be used after the next call.
+        """
+        self._check_not_closed()
+        if self._mmap is not None:
+            self._mmap.seek(0)
+            return self._mmap
+        return BytesIO(self._data)
+
+    def get_face(self, font_index: int) -> FT_Face:
+        """
+        Parameters:
+            font_index (int): Font index.
+        Returns:
+            The FreeType face. It is created from the same content than the stream and it is released when the reader is closed.
+        """
+        self._check_not_closed()
+        face = self._faces.get(font_index)
+        if face is not None:
+            return face
+
+        # Each reader has its own library, so the readers can be used by multiple threads
+        if self._library is None:
+            library = FT_Library()
+            error = FT_Init_FreeType(byref(library))
+            if error: raise FT_Exception(error)
+            self._library = library
+
+        face = FT_Face()
+        if self._mmap is not None:
+            error = FT_New_Memory_Face(self._library, self._buffer, len(self._mmap), font_index, byref(face))
+        else:
+            error = FT_New_Memory_Face(self._library, self._data, len(self._data), font_index, byref(face))
+        if error: raise FT_Exception(error)
+
+        self._faces[font_index] = face
+        return face
+
+    def _check_not_closed(self) -> None:
+        if self._is_closed:
+            raise ValueError(f'The reader of "{self.filename}" is closed')
+
+    def close(self) -> None:
+        self._is_closed = True
+
+        for face in self._faces.values():
+            FT_Done_Face(face)
+        self._faces.clear()
+
+        if self._library is not None:
+            FT_Done_FreeType(self._library)
+            self._library = None
+
+        if self._mmap is not None:
+            # The mapping can only be closed when ctypes does not point to it anymore
+            del self._buffer
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "FontFileReader":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class FontFacePool:
+    """
+    LRU pool of FreeType faces keyed by (filename, font_index).
+    Using a face again does not read the file, initialize FreeType and create the face again.
+
+    A face can only be used by one thread at a time, so acquire lend it until the end of the with block.
+    A thread that need a face already lent get a new one.
+    When there is more than max_size faces in the pool, the least recently used are released.
+    A face is also released when its file has been modified.
+
+    Example:
+        with pool.acquire("Arial.ttf", 0) as face:
+            glyph_index = FT_Get_Char_Index(face, ord("a"))
+    """
+
+    max_size: int
+
+    def __init__(self, max_size: int = 32):
+        """
+        Parameters:
+            max_size (int): Maximum number of faces kept in the pool.
+        """
+        self.max_size = max_size
+        # (filename, font_index): (signature of the file, reader that contain the face)
+        self._readers: "OrderedDict[Tuple[str, int], Tuple[Tuple[int, int, int], FontFileReader]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._readers)
+
+    @contextmanager
+    def acquire(self, filename: str, font_index: int) -> Iterator[FT_Face]:
+        """
+        Parameters:
+            filename (str): Filename of a font. It can be a member of a .zip archive. See FontFile.
+            font_index (int): Font index.
+        Returns:
+            A context manager that give the FreeType face. It must not be used after the with block.
+        """
+        key = (str(filename), font_index)
+        stat = os.stat(FontFile.get_signature_path(key[0]))
+        signature = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+        with self._lock:
+            entry = self._readers.pop(key, None)
+
+        if entry is not None and entry[0] != signature:
+            entry[1].close()
+            entry = None
+
+        if entry is None:
+            reader = FontFileReader(key[0])
+            try:
+                reader.get_face(font_index)
+            except BaseException:
+                reader.close()
+                raise
+            entry = (signature, reader)
+
+        try:
+            yield entry[1].get_face(font_index)
+        finally:
+            self._release(key, entry)
+
+    def _release(self, key: Tuple[str, int], entry: Tuple[Tuple[int, int, int], FontFileReader]) -> None:
+        released_readers = []
+
+        with self._lock:
+            # Another thread may have given back the same face while it was lent
+            if key in self._readers:
+                released_readers.append(entry[1])
+            else:
+                self._readers[key] = entry
+
+            while len(self._readers) > self.max_size:
+                released_readers.append(self._readers.popitem(last=False)[1][1])
+
+        for reader in released_readers:
+            reader.close()
+
+    def close(self) -> None:
+        """
+        Release the faces that are in the pool, for example before deleting their files.
+        The lent faces aren't released. The pool can still be used after.
+        """
+        with self._lock:
+            released_readers = [reader for _, reader in self._readers.values()]
+            self._readers.clear()
+
+        for reader in released_readers:
+            reader.close()
@@ -0,0 +1,257 @@
+import json
+import sqlite3
+import threading
+from .font import Font
+from .glyph_coverage import GlyphCoverage
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+# (size, mtime_ns, inode) of a file. See FontLoader.get_file_signature
+FileSignature = Tuple[int, int, int]
+
+
+class FontIndex:
+    """
+    SQLite index of fonts.
+    Contrary to the pickled cache, only the changed files are written and a lookup only read the fonts that match.
+
+    Each font is identified by its filename, its font_index and its named instance coordinates (a variable font file contains multiple fonts).
+    The family names and the exact names are stored lowercased, like in Font.
+    The coverage of a font is stored with GlyphCoverage.to_bytes.
+
+    SCHEMA_VERSION: Version of the database schema. It is stored in the user_version pragma.
+        Increment it when the schema or the way a font is parsed change.
+    SCHEMA_MIGRATIONS: SQL script that upgrade the database from the schema version N (the key) to N + 1.
+        If the way a font is parsed change, don't add any migration. The index will be rebuilt.
+
+    An index can be shared between threads. Its connection is used by one thread at a time.
+    """
+
+    SCHEMA_VERSION: int = 2
+    SCHEMA_MIGRATIONS: Dict[int, str] = {}
+
+    database_path: Path
+
+    def __init__(self, database_path: Path):
+        """
+        Parameters:
+            database_path (Path): Path of the SQLite database. If it does not exist, it will be created.
+                If the database has an older schema version, it is upgraded with SCHEMA_MIGRATIONS.
+                If it can't be upgraded, it is emptied.
+        """
+        self.database_path = database_path
+        # Multiple FontCollector process can update the index at the same time, so wait for the other writers
+        # The connection can be used by any thread, but only one at a time
+        self._connection = sqlite3.connect(database_path, timeout=60, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        with self._connection:
+            schema_version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+
+            while 0 < schema_version < FontIndex.SCHEMA_VERSION and schema_version in FontIndex.SCHEMA_MIGRATIONS:
+                self._connection.executescript(FontIndex.SCHEMA_MIGRATIONS[schema_version])
+                schema_version += 1
+                # PRAGMA does not support parameters
+                self._connection.execute(f"PRAGMA user_version = {schema_version:d}")
+
+            # The version 0 is an empty database or an index created before the schema was versioned
+            if schema_version != FontIndex.SCHEMA_VERSION:
+                self._connection.executescript(
+                    """
+                    DROP TABLE IF EXISTS metadata;
+                    DROP TABLE IF EXISTS file;
+                    DROP TABLE IF EXISTS font;
+                    DROP TABLE IF EXISTS family_name;
+                    DROP TABLE IF EXISTS exact_name;
+                    """
+                )
+
+            self._connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS file (
+                    filename TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    inode INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS font (
+                    id INTEGER PRIMARY KEY,
+                    filename TEXT NOT NULL REFERENCES file(filename) ON DELETE CASCADE,
+                    font_index INTEGER NOT NULL,
+                    weight INTEGER NOT NULL,
+                    italic INTEGER NOT NULL,
+                    named_instance_coordinates TEXT NOT NULL,
+                    coverage BLOB,
+                    UNIQUE (filename, font_index, named_instance_coordinates)
+                );
+                CREATE TABLE IF NOT EXISTS family_name (
+                    font_id INTEGER NOT NULL REFERENCES font(id) ON DELETE CASCADE,
+                    name TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS exact_name (
+                    font_id INTEGER NOT NULL REFERENCES font(id) ON DELETE CASCADE,
+                    name TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS font_weight_italic ON font(weight, italic);
+                CREATE INDEX IF NOT EXISTS font_named_instance_coordinates ON font(named_instance_coordinates);
+                CREATE INDEX IF NOT EXISTS family_name_name ON family_name(name);
+                CREATE INDEX IF NOT EXISTS family_name_font_id ON family_name(font_id);
+                CREATE INDEX IF NOT EXISTS exact_name_name ON exact_name(name);
+                CREATE INDEX IF NOT EXISTS exact_name_font_id ON exact_name(font_id);
+                """
+            )
+            self._connection.execute(f"PRAGMA user_version = {FontIndex.SCHEMA_VERSION:d}")
+        self._connection.execute("PRAGMA foreign_keys = ON")
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> "FontIndex":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM font").fetchone()[0]
+
+    @property
+    def files_signature(self) -> Dict[str, FileSignature]:
+        """
+        Returns:
+            The signature of every indexed file.
+        """
+        with self._lock:
+            return {
+                filename: (size, mtime_ns, inode)
+                for filename, size, mtime_ns, inode in self._connection.execute("SELECT filename, size, mtime_ns, inode FROM file")
+            }
+
+    @property
+    def fonts(self) -> Set[Font]:
+        """
+        Get all the fonts. It load the whole index in memory, so prefer get_fonts_by_family_name and get_fonts_by_exact_name.
+        """
+        with self._lock:
+            return set(self._get_fonts_by_ids([row[0] for row in self._connection.execute("SELECT id FROM font")]))
+
+    def add_fonts(self, fonts: Iterable[Font], files_signature: Dict[str, FileSignature]) -> None:
+        """
+        Parameters:
+            fonts (Iterable[Font]): Fonts to add. If a file was already indexed, its old fonts are replaced.
+            files_signature (Dict[str, FileSignature]): Signature of the files that contain the fonts.
+        """
+        fonts_by_file: Dict[str, List[Font]] = {filename: [] for filename in files_signature}
+        for font in fonts:
+            fonts_by_file[font.filename].append(font)
+
+        with self._lock, self._connection:
+            self._connection.executemany("DELETE FROM file WHERE filename = ?", ((filename,) for filename in fonts_by_file))
+            self._connection.executemany(
+                "INSERT INTO file (filename, size, mtime_ns, inode) VALUES (?, ?, ?, ?)",
+                ((filename, *files_signature[filename]) for filename in fonts_by_file),
+            )
+
+            for file_fonts in fonts_by_file.values():
+                for font in file_fonts:
+                    cursor = self._connection.execute(
+                        "INSERT OR IGNORE INTO font (filename, font_index, weight, italic, named_instance_coordinates, coverage) VALUES (?, ?, ?, ?, ?, ?)",
+                        (
+                            font.filename,
+                            font.font_index,
+                            font.weight,
+                            font.italic,
+                            json.dumps(font.named_instance_coordinates, sort_keys=True),
+                            font.coverage.to_bytes() if font.coverage is not None else None,
+                        ),
+                    )
+
+                    # The same named instance can be duplicated in a variable font. See test_variable_font_duplicate_font_face
+                    if cursor.rowcount == 0:
+                        continue
+
+                    font_id = cursor.lastrowid
+                    self._connection.executemany(
+                        "INSERT INTO family_name (font_id, name) VALUES (?, ?)",
+                        ((font_id, family_name) for family_name in font.family_names),
+                    )
+                    self._connection.executemany(
+                        "INSERT INTO exact_name (font_id, name) VALUES (?, ?)",
+                        ((font_id, exact_name) for exact_name in font.exact_names),
+                    )
+
+    def remove_files(self, filenames: Iterable[str]) -> None:
+        """
+        Parameters:
+            filenames (Iterable[str]): Files to remove from the index. All their fonts are also removed.
+        """
+        with self._lock, self._connection:
+            self._connection.executemany("DELETE FROM file WHERE filename = ?", ((filename,) for filename in filenames))
+
+    def get_fonts_by_family_name(self, family_name: str) -> List[Font]:
+        """
+        Parameters:
+            family_name (str): Family name. It need to be lowercase.
+        Returns:
+            All the fonts that have this family name.
+        """
+        with self._lock:
+            return self._get_fonts_by_ids(
+                [row[0] for row in self._connection.execute("SELECT DISTINCT font_id FROM family_name WHERE name = ?", (family_name,))]
+            )
+
+    def get_fonts_by_exact_name(self, exact_name: str) -> List[Font]:
+        """
+        Parameters:
+            exact_name (str): Exact name (fullname or postscript name). It need to be lowercase.
+        Returns:
+            All the fonts that have this exact name.
+        """
+        with self._lock:
+            return self._get_fonts_by_ids(
+                [row[0] for row in self._connection.execute("SELECT DISTINCT font_id FROM exact_name WHERE name = ?", (exact_name,))]
+            )
+
+    def _get_fonts_by_ids(self, font_ids: List[int]) -> List[Font]:
+        fonts: List[Font] = []
+
+        # SQLite limit the number of parameters per query
+        chunk_size = 500
+        for i in range(0, len(font_ids), chunk_size):
+            chunk = font_ids[i : i + chunk_size]
+            placeholders = ", ".join("?" * len(chunk))
+
+            family_names: Dict[int, List[str]] = {font_id: [] for font_id in chunk}
+            for font_id, name in self._connection.execute(
+                f"SELECT font_id, name FROM family_name WHERE font_id IN ({placeholders})", chunk
+            ):
+                family_names[font_id].append(name)
+
+            exact_names: Dict[int, List[str]] = {font_id: [] for font_id in chunk}
+            for font_id, name in self._connection.execute(
+                f"SELECT font_id, name FROM exact_name WHERE font_id IN ({placeholders})", chunk
+            ):
+                exact_names[font_id].append(name)
+
+            for font_id, filename, font_index, weight, italic, named_instance_coordinates, coverage in self._connection.execute(
+                f"SELECT id, filename, font_index, weight, italic, named_instance_coordinates, coverage FROM font WHERE id IN ({placeholders}) ORDER BY id",
+                chunk,
+            ):
+                fonts.append(
+                    Font(
+                        filename,
+                        font_index,
+                        family_names[font_id],
+                        weight,
+                        bool(italic),
+                        exact_names[font_id],
+                        json.loads(named_instance_coordinates),
+                        GlyphCoverage.from_bytes(coverage) if coverage is not None else None,
+                    )
+                )
+
+        return fonts
@@ -1,11 +1,29 @@
+import logging
+import multiprocessing
 import os
 import pickle
-from ._version import __version__
+import sys
+import threading
+from .file_lock import FileLock
 from .font import Font
+from .font_file import FONT_FILE_EXTENSIONS, FontFile
+from .font_index import FileSignature, FontIndex
+from .mapped_font_index import MappedFontIndex
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 from find_system_fonts_filename import get_system_fonts_filename
+from glob import glob
+from hashlib import sha1
+from math import ceil
+from multiprocessing.connection import Connection, wait
+from multiprocessing.context import BaseContext
 from pathlib import Path
-from tempfile import gettempdir
-from typing import List, Set
+from tempfile import gettempdir, mkstemp
+from time import monotonic
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+_logger = logging.getLogger(__name__)
 
 
 class FontLoader:
@@ -13,28 +31,289 @@ class FontLoader:
     system_fonts: Font installed on the system
     additional_fonts: Font added by the user
     generated_fonts: Contain all the generated font by Helpers.variable_font_to_collection.
+    jobs: Number of worker process used to parse the fonts. If 1, the fonts are parsed in the current process.
+    system_font_index: If use_font_index is true, it replace system_fonts. The system fonts are queried from an index instead of being loaded in memory.
+        If font_index_format is "sqlite", it is a FontIndex. If it is "mmap", it is a MappedFontIndex.
+    force_system_font_enumeration: If true, the system fonts are enumerated even if their directories have not changed. See get_system_fonts_paths.
+    lazy_system_font: If true, the system fonts are only loaded when a font can't be found in the additional fonts and the generated fonts.
+        The additional fonts and the generated fonts take precedence over the system fonts. See get_font_tiers.
+    parse_timeout: If not None, the fonts are parsed in isolated worker processes. A file that take more than parse_timeout seconds
+        to parse, or that crash the parser, is quarantined. See load_fonts_from_paths.
+    generation: Incremented each time the fonts are changed by add_additional_font, add_generated_font(s) or the discard methods.
+        The fonts property is only rebuilt when it change, when another process change the generated fonts cache
+        or when a generated font file has been deleted.
+
+    Thread safety:
+        A FontLoader can be shared between threads. The fonts are published as immutable snapshots (copy-on-write):
+        a change build new sets and replace the old ones, so a reader never see a set being modified and never need a lock.
+        - Can run concurrently with anything: fonts, get_font_tiers, get_fonts_by_family_name, get_fonts_by_exact_name,
+          to_mapped_font_index and Helpers.get_used_font_by_style.
+        - Serialized by the lock of the FontLoader: add_additional_font and load_system_font_tier.
+          The fonts are parsed before the lock is taken, so the readers are not blocked while a font is parsed.
+        - Serialized between the threads and the processes by the cache lock: add_generated_font(s), the cache loading and the discard methods.
+        A set returned by the FontLoader (ex: fonts or additional_fonts) must not be modified. Use add_additional_font instead.
+        A reader that started before a change can still use the previous snapshot. The next call see the change.
+
+    CACHE_SCHEMA_VERSION: Version of the cache file format.
+        Increment it when the Font attributes or the way a font is parsed change.
+    CACHE_MIGRATIONS: Upgrade a cached font from the schema version N (the key) to N + 1.
+        If the way a font is parsed change, the cached fonts can't be upgraded, so don't add any migration. The cache will be rebuilt.
+        A migration can return None to drop a font. Its file will be parsed again.
+        A Font is immutable, so a migration that change a font return a new Font.
     """
 
+    CACHE_SCHEMA_VERSION: int = 2
+    CACHE_MIGRATIONS: Dict[int, Callable[[Font], Optional[Font]]] = {}
+
     system_fonts: Set[Font]
     additional_fonts: Set[Font]
+    system_font_index: Optional[Union[FontIndex, MappedFontIndex]]
+
+    jobs: int
+    use_system_font: bool
+    use_font_index: bool
+    font_index_format: str
+    force_system_font_enumeration: bool
+    lazy_system_font: bool
+    parse_timeout: Optional[float]
+    is_system_font_loaded: bool
+
+    # The generated fonts are shared by every FontLoader, so the counter is too
+    generation: int = 0
+    _generation_lock = threading.Lock()
+    _lock: threading.Lock
+    # The key used to build it (see _get_fonts_snapshot_key), the memory fonts, the additional fonts with the generated fonts,
+    # then the filenames of the generated fonts (see is_font_deleted).
+    # The tuple is replaced as a whole, so the readers always see consistent sets.
+    _fonts_snapshot: Tuple[Optional[Tuple[int, Optional[FileSignature]]], Set[Font], Set[Font], FrozenSet[str]]
 
     def __init__(
-        self, additional_fonts_path: List[Path] = [], use_system_font: bool = True
+        self,
+        additional_fonts_path: List[Path] = [],
+        use_system_font: bool = True,
+        jobs: int = 1,
+        use_font_index: bool = False,
+        font_index_format: str = "sqlite",
+        force_system_font_enumeration: bool = False,
+        lazy_system_font: bool = False,
+        parse_timeout: Optional[float] = None,
     ):
+        if use_font_index and font_index_format not in ("sqlite", "mmap"):
+            raise ValueError(f'The font index format "{font_index_format}" is not supported. It need to be "sqlite" or "mmap"')
 
-        if use_system_font:
-            self.system_fonts = FontLoader.load_system_fonts()
-        else:
-            self.system_fonts = set()
+        self.jobs = jobs
+        self.use_system_font = use_system_font
+        self.use_font_index = use_font_index
+        self.font_index_format = font_index_format
+        self.force_system_font_enumeration = force_system_font_enumeration
+        self.lazy_system_font = lazy_system_font
+        self.parse_timeout = parse_timeout
+        self.is_system_font_loaded = False
+        self.system_fonts = set()
+        self.system_font_index = None
+        self._lock = threading.Lock()
+        self._fonts_snapshot = (None, set(), set(), frozenset())
+
+        if not lazy_system_font:
+            self.load_system_font_tier()
+
+        self.additional_fonts = FontLoader.load_additional_fonts(additional_fonts_path, jobs, parse_timeout=parse_timeout)
+
+    def load_system_font_tier(self) -> None:
+        """
+        Load the system fonts (or their index) if they are used and haven't been loaded yet.
+        If multiple threads call it at the same time, the system fonts are only loaded once.
+        """
+        if self.is_system_font_loaded:
+            return
 
-        self.additional_fonts = FontLoader.load_additional_fonts(additional_fonts_path)
+        with self._lock:
+            if self.is_system_font_loaded:
+                return
+
+            if self.use_system_font:
+                if self.use_font_index and self.font_index_format == "sqlite":
+                    self.system_font_index = FontLoader.load_system_font_index(
+                        self.jobs, self.force_system_font_enumeration, self.parse_timeout
+                    )
+                elif self.use_font_index and self.font_index_format == "mmap":
+                    self.system_font_index = FontLoader.load_system_mapped_font_index(
+                        self.jobs, self.force_system_font_enumeration, self.parse_timeout
+                    )
+                else:
+                    self.system_fonts = FontLoader.load_system_fonts(
+                        self.jobs, self.force_system_font_enumeration, self.parse_timeout
+                    )
+
+            # The system fonts are part of the memory fonts, so they need to be combined again
+            self._fonts_snapshot = (None, set(), set(), frozenset())
+            # It is set last, so a thread that see it also see the system fonts
+            self.is_system_font_loaded = True
+
+    def get_font_tiers(self) -> Iterator[Union[Set[Font], "FontLoader"]]:
+        """
+        The fonts grouped by precedence. A font should only be searched in a tier if it wasn't found in the previous ones.
+        If lazy_system_font is true, the system fonts are only loaded when the second tier is requested.
+
+        Returns:
+            If lazy_system_font is false, the FontLoader itself.
+            Else, the additional fonts with the generated fonts, then the FontLoader itself (which contain the system fonts).
+        """
+        if self.lazy_system_font:
+            yield self._get_fonts_snapshot()[2]
+            self.load_system_font_tier()
+
+        yield self
 
     @property
     def fonts(self) -> Set[Font]:
         """
-        Get all the fonts
+        Get all the fonts. The result must not be modified.
+        The system, additional and generated fonts are only combined again when they change. See generation.
+        If the system fonts are in an index (see system_font_index), the whole index is decoded on each call,
+        so prefer get_fonts_by_family_name and get_fonts_by_exact_name.
+        """
+        self.load_system_font_tier()
+        fonts = self._get_memory_fonts()
+
+        if self.system_font_index is not None:
+            fonts = fonts.union(self.system_font_index.fonts)
+
+        return fonts
+
+    def _get_memory_fonts(self) -> Set[Font]:
+        """
+        Returns:
+            The system fonts, the generated fonts and the additional fonts.
+            They are only combined again if they changed since the last call. See generation.
+        """
+        return self._get_fonts_snapshot()[1]
+
+    def _get_fonts_snapshot(self) -> Tuple[Optional[Tuple[int, Optional[FileSignature]]], Set[Font], Set[Font], FrozenSet[str]]:
+        """
+        Returns:
+            The current snapshot. See _fonts_snapshot.
+            If the fonts changed, a new snapshot is built. Only one thread build it, the others wait for it.
+        """
+        fonts_snapshot = self._fonts_snapshot
+        if FontLoader._is_fonts_snapshot_valid(fonts_snapshot):
+            return fonts_snapshot
+
+        with self._lock:
+            # The key is read before the fonts, so a change made while the snapshot is built trigger another rebuild
+            fonts_snapshot_key = FontLoader._get_fonts_snapshot_key()
+            fonts_snapshot = self._fonts_snapshot
+
+            if not FontLoader._is_fonts_snapshot_valid(fonts_snapshot, fonts_snapshot_key):
+                generated_fonts = FontLoader.load_generated_fonts()
+                additional_and_generated_fonts = generated_fonts.union(self.additional_fonts)
+                fonts_snapshot = (
+                    fonts_snapshot_key,
+                    self.system_fonts.union(additional_and_generated_fonts),
+                    additional_and_generated_fonts,
+                    frozenset(font.filename for font in generated_fonts),
+                )
+                self._fonts_snapshot = fonts_snapshot
+
+        return fonts_snapshot
+
+    @staticmethod
+    def _get_fonts_snapshot_key() -> Tuple[int, Optional[FileSignature]]:
+        """
+        Returns:
+            The generation and the signature of the generated fonts cache.
+            Another process can add generated fonts without changing the generation, so the signature of the cache is also needed.
+        """
+        generation = FontLoader.generation
+        try:
+            generated_font_cache_signature: Optional[FileSignature] = FontLoader.get_file_signature(
+                str(FontLoader.get_generated_font_cache_file_path())
+            )
+        except FileNotFoundError:
+            generated_font_cache_signature = None
+        return generation, generated_font_cache_signature
+
+    @staticmethod
+    def _is_fonts_snapshot_valid(
+        fonts_snapshot: Tuple[Optional[Tuple[int, Optional[FileSignature]]], Set[Font], Set[Font], FrozenSet[str]],
+        fonts_snapshot_key: Optional[Tuple[int, Optional[FileSignature]]] = None,
+    ) -> bool:
+        if fonts_snapshot_key is None:
+            fonts_snapshot_key = FontLoader._get_fonts_snapshot_key()
+
+        # The files of the generated fonts aren't checked here, since it would be done on each access. See is_font_deleted.
+        return fonts_snapshot[0] == fonts_snapshot_key
+
+    def is_font_deleted(self, font: Font) -> bool:
+        """
+        Another process can delete the file of a generated font without changing the generated fonts cache.
+        Like load_generated_fonts, such a font must not be used, but checking every generated font on each access would be slow.
+        So, only the font that is about to be used is checked.
+
+        Parameters:
+            font (Font): A font of this FontLoader.
+        Returns:
+            True if it is a generated font whose file has been deleted. The next snapshot won't contain it.
+        """
+        fonts_snapshot = self._fonts_snapshot
+        if font.filename not in fonts_snapshot[3] or os.path.isfile(font.filename):
+            return False
+
+        with self._lock:
+            if self._fonts_snapshot is fonts_snapshot:
+                self._fonts_snapshot = (None, set(), set(), frozenset())
+        return True
+
+    def get_fonts_by_family_name(self, family_name: str) -> List[Font]:
+        """
+        Parameters:
+            family_name (str): Family name. It need to be lowercase.
+        Returns:
+            All the fonts that have this family name.
+        """
+        self.load_system_font_tier()
+        fonts = [font for font in self._get_memory_fonts() if family_name in font.family_names]
+
+        if self.system_font_index is not None:
+            fonts.extend(self.system_font_index.get_fonts_by_family_name(family_name))
+
+        return fonts
+
+    def get_fonts_by_exact_name(self, exact_name: str) -> List[Font]:
+        """
+        Parameters:
+            exact_name (str): Exact name (fullname or postscript name). It need to be lowercase.
+        Returns:
+            All the fonts that have this exact name.
+        """
+        self.load_system_font_tier()
+        fonts = [font for font in self._get_memory_fonts() if exact_name in font.exact_names]
+
+        if self.system_font_index is not None:
+            fonts.extend(self.system_font_index.get_fonts_by_exact_name(exact_name))
+
+        return fonts
+
+    def to_mapped_font_index(self, index_path: Path) -> MappedFontIndex:
+        """
+        Publish all the fonts (system, additional and generated) in a memory-mapped index.
+        The worker processes can then attach to it instead of creating their own FontLoader.
+        The index is read-only and the operating system share its pages between the processes, so the fonts aren't copied in each process.
+
+        Example:
+            font_index = font_loader.to_mapped_font_index(Path("fonts.idx"))
+            with ProcessPoolExecutor() as executor:
+                # The index is pickled as its path, so each worker map the same file
+                executor.map(analyze, ass_paths, repeat(font_index))
+
+        Parameters:
+            index_path (Path): Path of the index. It is replaced if it exist.
+        Returns:
+            The index. Helpers.get_used_font_by_style can query it directly.
         """
-        return self.system_fonts.union(FontLoader.load_generated_fonts()).union(self.additional_fonts)
+        fonts = self.fonts
+        MappedFontIndex.build(index_path, fonts, FontLoader.get_fonts_files_signature(fonts))
+        return MappedFontIndex(index_path)
 
     def add_additional_font(self, font_path: Path):
         """
@@ -43,7 +322,13 @@ class FontLoader:
                 If you need to use woff font, you will need to decompress them.
                 See fontTools documentation to know how to do it: https://fonttools.readthedocs.io/en/latest/ttLib/woff2.html#fontTools.ttLib.woff2.decompress
         """
-        self.additional_fonts.update(FontLoader.load_additional_fonts([font_path]))
+        # The font is parsed without the lock, so the other threads can still read the fonts
+        fonts = FontLoader.load_additional_fonts([font_path], self.jobs, parse_timeout=self.parse_timeout)
+
+        with self._lock:
+            # Copy-on-write: a thread that is iterating the previous set is not affected
+            self.additional_fonts = self.additional_fonts.union(fonts)
+        FontLoader._increment_generation()
 
     @staticmethod
     def add_generated_font(font: Font):
@@ -51,72 +336,890 @@ class FontLoader:
         Parameters:
             font (Font): Generated font by Helpers.variable_font_to_collection
         """
+        FontLoader.add_generated_fonts([font])
+
+    @staticmethod
+    def add_generated_fonts(fonts: Iterable[Font]):
+        """
+        Add multiple fonts with a single load and a single save of the generated font cache.
 
-        generated_fonts = FontLoader.load_generated_fonts()
-        generated_fonts.add(font)
-        FontLoader.save_generated_fonts(generated_fonts)
+        Parameters:
+            fonts (Iterable[Font]): Generated fonts by Helpers.variable_font_to_collection
+        """
+        fonts = list(fonts)
+        if len(fonts) == 0:
+            return
+
+        # Another thread or process could add a font between the load and the save
+        with FontLoader.get_cache_lock(FontLoader.get_generated_font_cache_file_path()):
+            generated_fonts = FontLoader.load_generated_fonts()
+            generated_fonts.update(fonts)
+            FontLoader.save_generated_fonts(generated_fonts)
+
+    @staticmethod
+    def load_font_cache_file(cache_file: Path) -> Tuple[Set[Font], Dict[str, FileSignature]]:
+        """
+        Parameters:
+            cache_file (Path): Cache file path.
+        Returns:
+            The cached fonts and the signature of the parsed files.
+            A file that has a signature, but no font, has been rejected (it does not contain any valid font).
+            If the cache has an older schema version, the fonts are upgraded with CACHE_MIGRATIONS.
+            If they can't be upgraded, an empty cache is returned.
+        """
+        cached_fonts, files_signature, _ = FontLoader._load_font_cache_file(cache_file)
+        return cached_fonts, files_signature
 
     @staticmethod
-    def load_font_cache_file(cache_file: Path) -> Set[Font]:
+    def _load_font_cache_file(cache_file: Path) -> Tuple[Set[Font], Dict[str, FileSignature], bool]:
+        """
+        Returns:
+            Like load_font_cache_file, and if the cache already has the CACHE_SCHEMA_VERSION.
+            If not, the cache need to be saved again, even if the fonts didn't change, otherwise it would be migrated on each load.
+        """
         if not os.path.isfile(cache_file):
             raise FileNotFoundError(f'The file "{cache_file}" does not exist')
         
         with open(cache_file, "rb") as file:
             file_content = pickle.load(file)
 
-        if isinstance(file_content, set):
+        # We don't delete an outdated cache since another process may be replacing it. It will be overwritten by the next save.
+        if isinstance(file_content, set) or (isinstance(file_content, tuple) and len(file_content) == 2):
             # previous version to 2.1.3 (included) was saving a set of fonts
-            os.remove(cache_file)
+            # previous version to 2.1.4 (included) was saving the fonts without their file signature
+            return set(), {}, False
+        elif isinstance(file_content, tuple) and len(file_content) == 3:
+            cache_schema_version, cached_fonts, files_signature = file_content
+
+            # previous version to 2.1.4 (included) was saving the FontCollector version instead of a schema version
+            if not isinstance(cache_schema_version, int):
+                return set(), {}, False
+
+            # Without migration, the rejected files also need to be parsed again
+            if cache_schema_version > FontLoader.CACHE_SCHEMA_VERSION or any(
+                version not in FontLoader.CACHE_MIGRATIONS
+                for version in range(cache_schema_version, FontLoader.CACHE_SCHEMA_VERSION)
+            ):
+                return set(), {}, False
+
+            migrated_fonts = FontLoader.migrate_cached_fonts(cache_schema_version, cached_fonts)
+
+            # The files whose fonts have been dropped by the migration need to be parsed again,
+            # so they must not stay in the signatures, otherwise they would be considered as rejected files
+            dropped_paths = set(map(lambda font: font.filename, cached_fonts)).difference(
+                map(lambda font: font.filename, migrated_fonts)
+            )
+            files_signature = {
+                font_path: file_signature
+                for font_path, file_signature in files_signature.items()
+                if font_path not in dropped_paths
+            }
+
+            return migrated_fonts, files_signature, cache_schema_version == FontLoader.CACHE_SCHEMA_VERSION
+        raise FileExistsError(f'The file "{cache_file}" contain invalid data')
+
+    @staticmethod
+    def migrate_cached_fonts(cache_schema_version: int, cached_fonts: Set[Font]) -> Set[Font]:
+        """
+        Parameters:
+            cache_schema_version (int): Schema version of the cache that contained the fonts.
+            cached_fonts (Set[Font]): Cached fonts.
+        Returns:
+            The fonts upgraded to CACHE_SCHEMA_VERSION.
+            If there isn't any migration from the cache schema version (or if it is newer), an empty set.
+        """
+        if cache_schema_version > FontLoader.CACHE_SCHEMA_VERSION:
             return set()
-        elif isinstance(file_content, tuple) and len(file_content) == 2:
-            font_collector_cache_version, cached_fonts = file_content
 
-            if font_collector_cache_version != __version__:
-                os.remove(cache_file)
+        while cache_schema_version < FontLoader.CACHE_SCHEMA_VERSION:
+            migration = FontLoader.CACHE_MIGRATIONS.get(cache_schema_version)
+
+            if migration is None:
                 return set()
-            
-            return cached_fonts
-        raise FileExistsError(f'The file "{cache_file}" contain invalid data')
+
+            migrated_fonts: Set[Font] = set()
+            dropped_paths: Set[str] = set()
+            for font in cached_fonts:
+                migrated_font = migration(font)
+                if migrated_font is None:
+                    dropped_paths.add(font.filename)
+                else:
+                    migrated_fonts.add(migrated_font)
+
+            # Drop all the fonts of the file, so it is parsed again
+            cached_fonts = set(filter(lambda font: font.filename not in dropped_paths, migrated_fonts))
+            cache_schema_version += 1
+
+        return cached_fonts
+
+    @staticmethod
+    def save_font_cache_file(
+        cache_file: Path,
+        cache_fonts: Set[Font],
+        files_signature: Dict[str, FileSignature] = {},
+    ) -> None:
+        """
+        The cache is written in a temporary file, then renamed, so a reader never see a truncated cache.
+        If multiple process can update the same cache, hold the lock returned by get_cache_lock while reading and saving it.
+        """
+        FontLoader._save_pickle_file(cache_file, (FontLoader.CACHE_SCHEMA_VERSION, cache_fonts, files_signature))
+
+    @staticmethod
+    def _save_pickle_file(cache_file: Path, file_content) -> None:
+        file_descriptor, temporary_file = mkstemp(
+            prefix=f"{Path(cache_file).name}.", suffix=".tmp", dir=os.path.dirname(cache_file)
+        )
+
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                pickle.dump(file_content, file)
+            os.replace(temporary_file, cache_file)
+        except BaseException:
+            if os.path.isfile(temporary_file):
+                os.remove(temporary_file)
+            raise
+
+    @staticmethod
+    def get_cache_lock(cache_file: Path) -> FileLock:
+        """
+        Parameters:
+            cache_file (Path): Cache file path.
+        Returns:
+            The lock that protect the cache file. It must be held by a process (or a thread) that read, then update the cache.
+        """
+        return FileLock(Path(f"{cache_file}.lock"))
+
+    @staticmethod
+    def get_file_signature(file_path: str) -> FileSignature:
+        """
+        Parameters:
+            file_path (str): File path.
+        Returns:
+            The size, the modification time in nanoseconds and the inode of the file.
+            For an archive member, it is the signature of the archive.
+        """
+        stat = os.stat(FontFile.get_signature_path(file_path))
+        return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+    @staticmethod
+    def load_fonts_from_paths(
+        fonts_paths: Iterable[str], jobs: int = 1, parse_timeout: Optional[float] = None
+    ) -> List[Font]:
+        """
+        The quarantined files (see load_quarantined_files) are skipped until they are modified.
+
+        Parameters:
+            fonts_paths (Iterable[str]): Paths of the fonts to parse.
+            jobs (int): Number of worker process used to parse the fonts.
+                If 1 or less, the fonts are parsed in the current process.
+            parse_timeout (Optional[float]): If not None, the fonts are parsed in isolated worker processes, even if jobs is 1.
+                A file that take more than parse_timeout seconds to parse, or that crash the parser, is quarantined instead of stopping the loading.
+        Returns:
+            The fonts contained in the files. They are ordered like the sorted fonts_paths,
+            so the result does not depend on the number of jobs.
+        """
+        fonts: List[Font] = []
+        quarantined_files = FontLoader.load_quarantined_files()
+        sorted_fonts_paths = sorted(
+            font_path
+            for font_path in fonts_paths
+            if font_path not in quarantined_files
+            or quarantined_files[font_path][0] != FontLoader.get_file_signature(font_path)
+        )
+
+        if parse_timeout is not None:
+            fonts_by_path, failed_paths = FontLoader.load_fonts_from_paths_isolated(sorted_fonts_paths, jobs, parse_timeout)
+
+            for font_path in sorted_fonts_paths:
+                fonts.extend(fonts_by_path.get(font_path, []))
+
+            # A quarantined file that has been modified and can now be parsed leave the quarantine
+            released_paths = set(fonts_by_path).intersection(quarantined_files)
+            if len(failed_paths) > 0 or len(released_paths) > 0:
+                FontLoader.update_quarantined_files(failed_paths, released_paths)
+            return fonts
+
+        if jobs <= 1 or len(sorted_fonts_paths) <= 1:
+            for font_path in sorted_fonts_paths:
+                fonts.extend(Font.from_font_path(font_path))
+            return fonts
+
+        jobs = min(jobs, len(sorted_fonts_paths))
+        # Send multiple paths per task to reduce the IPC overhead, but keep enough tasks to balance the load between the workers
+        chunksize = max(1, ceil(len(sorted_fonts_paths) / (jobs * 4)))
+
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=FontLoader.get_multiprocessing_context()) as executor:
+            for fonts_in_file in executor.map(Font.from_font_path, sorted_fonts_paths, chunksize=chunksize):
+                fonts.extend(fonts_in_file)
+
+        return fonts
+
+    @staticmethod
+    def get_multiprocessing_context() -> BaseContext:
+        """
+        Returns:
+            The context used to start the worker processes.
+            The fonts can be loaded in a thread (ex: while the subtitles are parsed) and forking a process
+            that has other threads can deadlock, so the workers are started by a fork server, or spawned if it isn't available.
+        """
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            return multiprocessing.get_context("forkserver")
+        return multiprocessing.get_context("spawn")
+
+    @staticmethod
+    def load_fonts_from_paths_isolated(
+        fonts_paths: Iterable[str], jobs: int, parse_timeout: float
+    ) -> Tuple[Dict[str, List[Font]], Dict[str, str]]:
+        """
+        Parse each file in a worker process that can be killed.
+        A worker that take more than parse_timeout seconds to parse a file, or that crash, is replaced by a new one.
+        If a file raise an exception, it is raised like in load_fonts_from_paths.
+
+        Parameters:
+            fonts_paths (Iterable[str]): Paths of the fonts to parse.
+            jobs (int): Number of worker process. There is at least one.
+            parse_timeout (float): Maximum time, in seconds, to parse a file.
+        Returns:
+            The fonts of each parsed file and the reason why each of the other files could not be parsed.
+        """
+        pending_paths = deque(fonts_paths)
+        fonts_by_path: Dict[str, List[Font]] = {}
+        failed_paths: Dict[str, str] = {}
+        context = FontLoader.get_multiprocessing_context()
+        workers: List[_IsolatedWorker] = []
+
+        try:
+            while len(pending_paths) > 0 or any(worker.font_path is not None for worker in workers):
+                for worker in workers:
+                    if worker.font_path is None and len(pending_paths) > 0:
+                        worker.parse(pending_paths.popleft())
+                while len(workers) < max(1, jobs) and len(pending_paths) > 0:
+                    workers.append(_IsolatedWorker(context, parse_timeout))
+                    workers[-1].parse(pending_paths.popleft())
+
+                busy_workers = [worker for worker in workers if worker.font_path is not None]
+                deadline = min(worker.deadline for worker in busy_workers)
+                wait(
+                    [worker.connection for worker in busy_workers] + [worker.process.sentinel for worker in busy_workers],
+                    max(0, deadline - monotonic()) if deadline != float("inf") else None,
+                )
+
+                for worker in busy_workers:
+                    font_path = worker.font_path
+                    failure_reason = worker.get_result(fonts_by_path)
+
+                    if failure_reason is not None:
+                        _logger.warning(
+                            f'The font "{font_path}" has been quarantined: {failure_reason}. It will be skipped until it is modified.'
+                        )
+                        failed_paths[font_path] = failure_reason
+                        worker.close()
+                        workers.remove(worker)
+        finally:
+            for worker in workers:
+                worker.close()
+
+        return fonts_by_path, failed_paths
+
+    @staticmethod
+    def load_quarantined_files() -> Dict[str, Tuple[FileSignature, str]]:
+        """
+        Returns:
+            The files that timed out or crashed the parser, with their signature when it happened and the reason.
+            They are skipped until their signature change.
+        """
+        quarantine_file = FontLoader.get_quarantine_file_path()
+
+        if not os.path.isfile(quarantine_file):
+            return {}
+
+        with open(quarantine_file, "rb") as file:
+            file_content = pickle.load(file)
+
+        if not (isinstance(file_content, tuple) and len(file_content) == 2):
+            raise FileExistsError(f'The file "{quarantine_file}" contain invalid data')
+
+        cache_schema_version, quarantined_files = file_content
+        if cache_schema_version != FontLoader.CACHE_SCHEMA_VERSION:
+            return {}
+
+        return quarantined_files
+
+    @staticmethod
+    def update_quarantined_files(failed_paths: Dict[str, str], released_paths: Iterable[str] = []) -> None:
+        """
+        Parameters:
+            failed_paths (Dict[str, str]): The files to quarantine and the reason why they could not be parsed.
+            released_paths (Iterable[str]): The files to remove from the quarantine.
+        """
+        quarantine_file = FontLoader.get_quarantine_file_path()
+
+        with FontLoader.get_cache_lock(quarantine_file):
+            quarantined_files = FontLoader.load_quarantined_files()
+
+            for font_path in released_paths:
+                quarantined_files.pop(font_path, None)
+            for font_path, reason in failed_paths.items():
+                quarantined_files[font_path] = (FontLoader.get_file_signature(font_path), reason)
+
+            FontLoader._save_pickle_file(quarantine_file, (FontLoader.CACHE_SCHEMA_VERSION, quarantined_files))
+
+    @staticmethod
+    def load_index_builds() -> Dict[Tuple, Tuple[str, float, float]]:
+        """
+        Returns:
+            For each fonts sources (see save_index_build), the last action that built the cache,
+            when it has finished (a timestamp) and how long it took in seconds.
+        """
+        index_builds_file = FontLoader.get_index_builds_file_path()
+
+        if not os.path.isfile(index_builds_file):
+            return {}
+
+        with open(index_builds_file, "rb") as file:
+            file_content = pickle.load(file)
+
+        if not (isinstance(file_content, tuple) and len(file_content) == 2):
+            raise FileExistsError(f'The file "{index_builds_file}" contain invalid data')
+
+        cache_schema_version, index_builds = file_content
+        if cache_schema_version != FontLoader.CACHE_SCHEMA_VERSION:
+            return {}
+
+        return index_builds
+
+    @staticmethod
+    def save_index_build(sources: Tuple, action: Optional[str], timestamp: float = 0, duration: float = 0) -> None:
+        """
+        Parameters:
+            sources (Tuple): The fonts sources that have been built. It can be any hashable value that identify them.
+            action (Optional[str]): The action that built the cache (ex: "build", "refresh").
+                If None, the build of the sources is forgotten (ex: when their cache is deleted).
+            timestamp (float): When the build has finished.
+            duration (float): How long the build took in seconds.
+        """
+        index_builds_file = FontLoader.get_index_builds_file_path()
+
+        with FontLoader.get_cache_lock(index_builds_file):
+            index_builds = FontLoader.load_index_builds()
+
+            if action is None:
+                index_builds.pop(sources, None)
+            else:
+                index_builds[sources] = (action, timestamp, duration)
+
+            FontLoader._save_pickle_file(index_builds_file, (FontLoader.CACHE_SCHEMA_VERSION, index_builds))
 
     @staticmethod
-    def save_font_cache_file(cache_file: Path, cache_fonts: Set[Font]) -> None:
-        with open(cache_file, "wb") as file:
-            pickle.dump((__version__, cache_fonts), file)
+    def get_system_fonts_paths(force_enumeration: bool = False) -> Set[str]:
+        """
+        Enumerating the system fonts can be slow (ex: on a network filesystem), so the paths are cached with the modification time
+        of their directories. Adding or removing a font change the modification time of its directory, so the cached paths are used
+        until one of the directories change.
+        The standard fonts directories of the platform are also checked, even if they don't exist yet, so the first user font is detected.
+        A font installed in another new directory that isn't in any of the cached directories is not detected.
+        In this case, use force_enumeration.
+
+        Parameters:
+            force_enumeration (bool): If true, the system fonts are always enumerated and the cached paths are updated.
+        Returns:
+            The path of all the system fonts.
+        """
+        cache_file = FontLoader.get_system_font_directories_cache_file_path()
+
+        if not force_enumeration:
+            cached_content = FontLoader.load_font_directories_cache_file(cache_file)
+
+            if cached_content is not None:
+                fonts_paths, directories_mtime = cached_content
+
+                if all(
+                    FontLoader.get_directory_mtime(directory) == mtime
+                    for directory, mtime in directories_mtime.items()
+                ):
+                    return fonts_paths
+
+        fonts_paths = get_system_fonts_filename()
+        directories_mtime = {
+            directory: FontLoader.get_directory_mtime(directory)
+            for directory in FontLoader.get_fonts_directories(fonts_paths).union(FontLoader.get_standard_fonts_directories())
+        }
+
+        # Every process write the same content, so the cache does not need to be locked
+        FontLoader._save_pickle_file(cache_file, (FontLoader.CACHE_SCHEMA_VERSION, fonts_paths, directories_mtime))
+
+        return fonts_paths
 
     @staticmethod
-    def load_system_fonts() -> Set[Font]:
-        system_fonts: Set[Font] = set()
-        fonts_paths: Set[str] = get_system_fonts_filename()
-        system_font_cache_file = FontLoader.get_system_font_cache_file_path()
+    def load_font_directories_cache_file(cache_file: Path) -> Optional[Tuple[Set[str], Dict[str, Optional[int]]]]:
+        """
+        Parameters:
+            cache_file (Path): Cache file path.
+        Returns:
+            The cached fonts paths and the modification time of their directories.
+            If there isn't any cache or if it has another schema version, None.
+        """
+        if not os.path.isfile(cache_file):
+            return None
+
+        with open(cache_file, "rb") as file:
+            file_content = pickle.load(file)
 
-        if os.path.isfile(system_font_cache_file):
-            cached_fonts: Set[Font] = FontLoader.load_font_cache_file(system_font_cache_file)
-            cached_paths = set(map(lambda font: font.filename, cached_fonts))
+        if not (isinstance(file_content, tuple) and len(file_content) == 3):
+            raise FileExistsError(f'The file "{cache_file}" contain invalid data')
 
-            # Remove font that aren't anymore installed
-            removed = cached_paths.difference(fonts_paths)
-            system_fonts = set(
-                filter(lambda font: font.filename not in removed, cached_fonts)
+        cache_schema_version, fonts_paths, directories_mtime = file_content
+        if cache_schema_version != FontLoader.CACHE_SCHEMA_VERSION:
+            return None
+
+        return fonts_paths, directories_mtime
+
+    @staticmethod
+    def get_fonts_directories(fonts_paths: Iterable[str]) -> Set[str]:
+        """
+        Parameters:
+            fonts_paths (Iterable[str]): Fonts paths.
+        Returns:
+            The directories that contain the fonts and their parents, so a new subdirectory is also detected.
+            The root directory, the home directory and its parents are excluded since they change too often.
+        """
+        home_directory = os.path.expanduser("~")
+        excluded_directories: Set[str] = set()
+        directory = home_directory
+        while True:
+            excluded_directories.add(directory)
+            parent_directory = os.path.dirname(directory)
+            if parent_directory == directory:
+                break
+            directory = parent_directory
+
+        directories: Set[str] = set()
+        for font_path in fonts_paths:
+            directory = os.path.dirname(font_path)
+
+            while directory not in directories and directory not in excluded_directories:
+                parent_directory = os.path.dirname(directory)
+                # The root directory
+                if parent_directory == directory:
+                    break
+
+                directories.add(directory)
+                directory = parent_directory
+
+        return directories
+
+    @staticmethod
+    def get_standard_fonts_directories() -> Set[str]:
+        """
+        Returns:
+            The directories where the system and the user fonts are installed by default on the current platform.
+            They may not exist, for example before the first user font is installed.
+        """
+        home_directory = os.path.expanduser("~")
+
+        if os.name == "nt":
+            windows_directory = os.environ.get("WINDIR", "C:\\Windows")
+            local_app_data_directory = os.environ.get("LOCALAPPDATA", os.path.join(home_directory, "AppData", "Local"))
+            return {
+                os.path.join(windows_directory, "Fonts"),
+                os.path.join(local_app_data_directory, "Microsoft", "Windows", "Fonts"),
+            }
+
+        if sys.platform == "darwin":
+            return {
+                "/System/Library/Fonts",
+                "/Library/Fonts",
+                os.path.join(home_directory, "Library", "Fonts"),
+            }
+
+        if hasattr(sys, "getandroidapilevel"):
+            return {"/system/fonts"}
+
+        data_home_directory = os.environ.get("XDG_DATA_HOME") or os.path.join(home_directory, ".local", "share")
+        return {
+            "/usr/share/fonts",
+            "/usr/local/share/fonts",
+            os.path.join(data_home_directory, "fonts"),
+            os.path.join(home_directory, ".fonts"),
+        }
+
+    @staticmethod
+    def get_directory_mtime(directory: str) -> Optional[int]:
+        """
+        Parameters:
+            directory (str): Directory path.
+        Returns:
+            The modification time in nanoseconds of the directory. If it does not exist anymore, None.
+        """
+        try:
+            return os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def load_system_fonts(
+        jobs: int = 1, force_enumeration: bool = False, parse_timeout: Optional[float] = None
+    ) -> Set[Font]:
+        fonts_paths: Set[str] = FontLoader.get_system_fonts_paths(force_enumeration)
+
+        # Each font directory has its own cache, so installing a font only rewrite the cache of its directory
+        fonts_paths_by_directory: Dict[str, Set[str]] = {}
+        for font_path in fonts_paths:
+            fonts_paths_by_directory.setdefault(os.path.dirname(font_path), set()).add(font_path)
+
+        shards = {
+            FontLoader.get_system_font_cache_file_path(directory): directory_fonts_paths
+            for directory, directory_fonts_paths in fonts_paths_by_directory.items()
+        }
+
+        # A shard is only rewritten when its directory still contain fonts, so the shards of the other directories
+        # must be removed. Otherwise, read_system_font_cache would still return their fonts.
+        is_stale_cache_removed = False
+        for system_font_cache in FontLoader.get_system_font_cache_files_paths():
+            if system_font_cache in shards:
+                continue
+            with FontLoader.get_cache_lock(system_font_cache):
+                try:
+                    os.remove(system_font_cache)
+                    is_stale_cache_removed = True
+                except FileNotFoundError:
+                    # Another process already removed it
+                    pass
+        if is_stale_cache_removed:
+            FontLoader._increment_generation()
+
+        return FontLoader.load_sharded_cached_fonts(shards, jobs, parse_timeout)
+
+    @staticmethod
+    def load_cached_fonts(
+        cache_file: Path, fonts_paths: Set[str], jobs: int = 1, parse_timeout: Optional[float] = None
+    ) -> Set[Font]:
+        """
+        Load the fonts from the cache file. Only the fonts added or modified since the cache was saved are parsed.
+        If there is any change, the cache file is updated.
+        The signature of the files that does not contain any valid font is also saved, so they aren't parsed again until they change.
+
+        Parameters:
+            cache_file (Path): Cache file path.
+            fonts_paths (Set[str]): Paths of the fonts to load.
+            jobs (int): Number of worker process used to parse the fonts.
+            parse_timeout (Optional[float]): See load_fonts_from_paths
+        Returns:
+            The fonts contained in fonts_paths.
+        """
+        return FontLoader.load_sharded_cached_fonts({cache_file: fonts_paths}, jobs, parse_timeout)
+
+    @staticmethod
+    def load_sharded_cached_fonts(
+        shards: Dict[Path, Set[str]], jobs: int = 1, parse_timeout: Optional[float] = None
+    ) -> Set[Font]:
+        """
+        Same as load_cached_fonts, but the fonts are split between multiple cache files (the shards).
+        Only the shards that have changed are rewritten. The fonts to parse of all the shards are parsed together.
+
+        Parameters:
+            shards (Dict[Path, Set[str]]): The cache file path and the paths of the fonts it contains.
+            jobs (int): Number of worker process used to parse the fonts.
+            parse_timeout (Optional[float]): See load_fonts_from_paths
+        Returns:
+            The fonts contained in all the shards.
+        """
+        fonts: Set[Font] = set()
+        outdated_shards: List[Path] = []
+
+        for cache_file, fonts_paths in shards.items():
+            shard_fonts, _, _, is_cache_outdated = FontLoader._get_font_cache_state(cache_file, fonts_paths)
+
+            if is_cache_outdated:
+                outdated_shards.append(cache_file)
+            else:
+                fonts.update(shard_fonts)
+
+        if len(outdated_shards) == 0:
+            return fonts
+
+        # If another process is already updating a cache, we wait for it, then we only parse what it did not.
+        # The locks are always acquired in the same order to avoid a deadlock.
+        with ExitStack() as stack:
+            for cache_file in sorted(outdated_shards):
+                stack.enter_context(FontLoader.get_cache_lock(cache_file))
+
+            shards_state = {
+                cache_file: FontLoader._get_font_cache_state(cache_file, shards[cache_file])
+                for cache_file in outdated_shards
+            }
+
+            outdated_paths: Set[str] = set()
+            for _, shard_outdated_paths, _, _ in shards_state.values():
+                outdated_paths.update(shard_outdated_paths)
+
+            # The signature is taken before parsing, so a file modified during the parsing will be parsed again
+            outdated_files_signature = {
+                font_path: FontLoader.get_file_signature(font_path) for font_path in outdated_paths
+            }
+
+            parsed_fonts: Dict[str, List[Font]] = {}
+            # A quarantined file isn't parsed, so it is saved like a rejected file
+            for font in FontLoader.load_fonts_from_paths(outdated_paths, jobs, parse_timeout):
+                parsed_fonts.setdefault(font.filename, []).append(font)
+
+            for cache_file, (shard_fonts, shard_outdated_paths, files_signature, is_cache_outdated) in shards_state.items():
+                if is_cache_outdated:
+                    for font_path in shard_outdated_paths:
+                        files_signature[font_path] = outdated_files_signature[font_path]
+                        shard_fonts.update(parsed_fonts.get(font_path, []))
+
+                    FontLoader.save_font_cache_file(cache_file, shard_fonts, files_signature)
+
+                fonts.update(shard_fonts)
+
+        return fonts
+
+    @staticmethod
+    def _get_font_cache_state(
+        cache_file: Path, fonts_paths: Set[str]
+    ) -> Tuple[Set[Font], Set[str], Dict[str, FileSignature], bool]:
+        """
+        Parameters:
+            cache_file (Path): Cache file path.
+            fonts_paths (Set[str]): Paths of the fonts to load.
+        Returns:
+            - The cached fonts that are still in fonts_paths and have not been modified.
+            - The paths that need to be parsed: the fonts added or replaced since the cache was saved.
+            - The current signature of the cached files (including the rejected files) that are still in fonts_paths.
+            - If the cache need to be updated.
+        """
+        if not os.path.isfile(cache_file):
+            return set(), fonts_paths, {}, True
+
+        cached_fonts, cached_files_signature, is_current_schema = FontLoader._load_font_cache_file(cache_file)
+        # The files without any font are in the signatures, so a rejected file is only parsed again if it change
+        cached_paths = set(map(lambda font: font.filename, cached_fonts)).union(cached_files_signature)
+
+        # Remove font that aren't anymore installed
+        removed = cached_paths.difference(fonts_paths)
+
+        # Font that have been replaced since last execution
+        current_files_signature = {
+            font_path: FontLoader.get_file_signature(font_path)
+            for font_path in cached_paths.intersection(fonts_paths)
+        }
+        modified = set(
+            font_path
+            for font_path, file_signature in current_files_signature.items()
+            if cached_files_signature.get(font_path) != file_signature
+        )
+
+        # Add font that have been installed since last execution
+        added = fonts_paths.difference(cached_paths)
+
+        if len(added) == 0 and len(removed) == 0 and len(modified) == 0:
+            # A migrated cache is saved with the new schema version
+            return cached_fonts, set(), current_files_signature, not is_current_schema
+
+        fonts = set(
+            filter(lambda font: font.filename not in removed and font.filename not in modified, cached_fonts)
+        )
+        return fonts, added.union(modified), current_files_signature, True
+
+    @staticmethod
+    def load_system_font_index(
+        jobs: int = 1, force_enumeration: bool = False, parse_timeout: Optional[float] = None
+    ) -> FontIndex:
+        """
+        Update the system font index with the fonts installed or modified since the last execution.
+        Only the changed files are written in the index.
+
+        Parameters:
+            jobs (int): Number of worker process used to parse the fonts.
+            force_enumeration (bool): See FontLoader.get_system_fonts_paths
+            parse_timeout (Optional[float]): See FontLoader.load_fonts_from_paths
+        Returns:
+            The system font index
+        """
+        fonts_paths: Set[str] = FontLoader.get_system_fonts_paths(force_enumeration)
+        system_font_index_file = FontLoader.get_system_font_index_file_path()
+        font_index = FontIndex(system_font_index_file)
+
+        removed, changed, current_files_signature = FontLoader._get_system_font_index_changes(
+            font_index.files_signature, fonts_paths
+        )
+
+        if len(removed) == 0 and len(changed) == 0:
+            return font_index
+
+        # If another process is already updating the index, we wait for it, then we only parse what it did not.
+        with FontLoader.get_cache_lock(system_font_index_file):
+            removed, changed, current_files_signature = FontLoader._get_system_font_index_changes(
+                font_index.files_signature, fonts_paths
+            )
+
+            font_index.remove_files(removed)
+
+            if len(changed) > 0:
+                font_index.add_fonts(
+                    FontLoader.load_fonts_from_paths(changed, jobs, parse_timeout),
+                    {font_path: current_files_signature[font_path] for font_path in changed},
+                )
+
+        return font_index
+
+    @staticmethod
+    def load_system_mapped_font_index(
+        jobs: int = 1, force_enumeration: bool = False, parse_timeout: Optional[float] = None
+    ) -> MappedFontIndex:
+        """
+        Update the memory-mapped system font index with the fonts installed or modified since the last execution.
+        If nothing changed, the fonts aren't decoded. Else, the index is rebuilt.
+
+        Parameters:
+            jobs (int): Number of worker process used to parse the fonts.
+            force_enumeration (bool): See FontLoader.get_system_fonts_paths
+            parse_timeout (Optional[float]): See FontLoader.load_fonts_from_paths
+        Returns:
+            The system font index
+        """
+        fonts_paths: Set[str] = FontLoader.get_system_fonts_paths(force_enumeration)
+        system_font_index_file = FontLoader.get_system_mapped_font_index_file_path()
+        font_index = FontLoader._open_mapped_font_index(system_font_index_file)
+
+        if font_index is not None:
+            removed, changed, _ = FontLoader._get_system_font_index_changes(font_index.files_signature, fonts_paths)
+
+            if len(removed) == 0 and len(changed) == 0:
+                return font_index
+
+            font_index.close()
+
+        # If another process is already updating the index, we wait for it, then we only parse what it did not.
+        with FontLoader.get_cache_lock(system_font_index_file):
+            font_index = FontLoader._open_mapped_font_index(system_font_index_file)
+            cached_files_signature = font_index.files_signature if font_index is not None else {}
+
+            removed, changed, current_files_signature = FontLoader._get_system_font_index_changes(
+                cached_files_signature, fonts_paths
             )
 
-            # Add font that have been installed since last execution
-            added = fonts_paths.difference(cached_paths)
-            for font_path in added:
-                system_fonts.update(Font.from_font_path(font_path))
+            if font_index is not None and len(removed) == 0 and len(changed) == 0:
+                return font_index
 
-            # If there is a change, update the cache file
-            if len(added) > 0 or len(removed) > 0:
-                FontLoader.save_font_cache_file(system_font_cache_file, system_fonts)
+            fonts: List[Font] = []
+            if font_index is not None:
+                fonts.extend(font for font in font_index.fonts if font.filename not in removed and font.filename not in changed)
+                font_index.close()
+            fonts.extend(FontLoader.load_fonts_from_paths(changed, jobs, parse_timeout))
 
+            MappedFontIndex.build(system_font_index_file, fonts, current_files_signature)
+
+        return MappedFontIndex(system_font_index_file)
+
+    @staticmethod
+    def read_system_font_cache(
+        use_font_index: bool = False, font_index_format: str = "sqlite"
+    ) -> Tuple[Set[Font], Dict[str, FileSignature], List[Path]]:
+        """
+        Read the system font cache (or index) as it is. Unlike load_system_fonts, the system fonts aren't enumerated and the cache isn't updated.
+
+        Parameters:
+            use_font_index (bool): If true, read the index instead of the cache.
+            font_index_format (str): Format of the index. "sqlite" or "mmap".
+        Returns:
+            The cached fonts, the signature of the parsed files and the files that contain the cache.
+        """
+        fonts: Set[Font] = set()
+        files_signature: Dict[str, FileSignature] = {}
+
+        if not use_font_index:
+            cache_files = FontLoader.get_system_font_cache_files_paths()
+
+            for cache_file in cache_files:
+                cached_fonts, cached_files_signature = FontLoader.load_font_cache_file(cache_file)
+                fonts.update(cached_fonts)
+                files_signature.update(cached_files_signature)
+        elif font_index_format == "sqlite":
+            cache_files = [FontLoader.get_system_font_index_file_path()]
+
+            if os.path.isfile(cache_files[0]):
+                with FontIndex(cache_files[0]) as font_index:
+                    fonts, files_signature = font_index.fonts, font_index.files_signature
+            else:
+                cache_files = []
+        elif font_index_format == "mmap":
+            cache_files = [FontLoader.get_system_mapped_font_index_file_path()]
+            font_index = FontLoader._open_mapped_font_index(cache_files[0])
+
+            if font_index is not None:
+                with font_index:
+                    fonts, files_signature = font_index.fonts, font_index.files_signature
+            else:
+                cache_files = []
         else:
-            # Since there is no cache file, load the font
-            for font_path in fonts_paths:
-                system_fonts.update(Font.from_font_path(font_path))
+            raise ValueError(f'The font index format "{font_index_format}" is not supported. It need to be "sqlite" or "mmap"')
+
+        return fonts, files_signature, cache_files
+
+    @staticmethod
+    def _open_mapped_font_index(index_file: Path) -> Optional[MappedFontIndex]:
+        """
+        Returns:
+            The index. If it does not exist or if it has been created by an incompatible version, None.
+        """
+        if not os.path.isfile(index_file):
+            return None
+
+        try:
+            return MappedFontIndex(index_file)
+        except (FileExistsError, ValueError):
+            return None
+
+    @staticmethod
+    def _get_system_font_index_changes(
+        cached_files_signature: Dict[str, FileSignature], fonts_paths: Set[str]
+    ) -> Tuple[Set[str], Set[str], Dict[str, FileSignature]]:
+        """
+        Parameters:
+            cached_files_signature (Dict[str, FileSignature]): Signature of the indexed files.
+            fonts_paths (Set[str]): Paths of the installed fonts.
+        Returns:
+            - The indexed paths that aren't anymore installed.
+            - The paths that have been installed or replaced since last execution.
+            - The current signature of the installed fonts.
+        """
+        removed = set(cached_files_signature).difference(fonts_paths)
+
+        current_files_signature = {
+            font_path: FontLoader.get_file_signature(font_path)
+            for font_path in fonts_paths
+        }
+        changed = set(
+            font_path
+            for font_path, file_signature in current_files_signature.items()
+            if cached_files_signature.get(font_path) != file_signature
+        )
+
+        return removed, changed, current_files_signature
+
+    @staticmethod
+    def get_fonts_files_signature(
+        fonts: Set[Font],
+        known_files_signature: Dict[str, FileSignature] = {},
+    ) -> Dict[str, FileSignature]:
+        """
+        Parameters:
+            fonts (Set[Font]): Fonts
+            known_files_signature (Dict[str, FileSignature]): Signature that have already been computed. They won't be computed again.
+        Returns:
+            The signature of each file that contain at least one of the fonts.
+        """
+        files_signature: Dict[str, FileSignature] = {}
 
-            # Save the font into the cache file
-            FontLoader.save_font_cache_file(system_font_cache_file, system_fonts)
+        for font_path in set(map(lambda font: font.filename, fonts)):
+            if font_path in known_files_signature:
+                files_signature[font_path] = known_files_signature[font_path]
+            else:
+                files_signature[font_path] = FontLoader.get_file_signature(font_path)
 
-        return system_fonts
+        return files_signature
 
     @staticmethod
     def load_generated_fonts() -> Set[Font]:
@@ -124,49 +1227,289 @@ class FontLoader:
         generated_font_cache_file = FontLoader.get_generated_font_cache_file_path()
 
         if os.path.isfile(generated_font_cache_file):
-            cached_fonts: Set[Font] = FontLoader.load_font_cache_file(generated_font_cache_file)
+            cached_fonts, _ = FontLoader.load_font_cache_file(generated_font_cache_file)
             generated_fonts = set(filter(lambda font: os.path.isfile(font.filename), cached_fonts))
 
         return generated_fonts
 
     @staticmethod
-    def load_additional_fonts(additional_fonts_path: List[Path]) -> Set[Font]:
+    def load_additional_fonts(
+        additional_fonts_path: List[Path],
+        jobs: int = 1,
+        use_directory_cache: bool = True,
+        parse_timeout: Optional[float] = None,
+    ) -> Set[Font]:
+        """
+        Parameters:
+            additional_fonts_path (List[Path]): Font files, directories or .zip archives. The directories are walked recursively.
+                The fonts of an archive are read without extracting them.
+            jobs (int): Number of worker process used to parse the fonts.
+            use_directory_cache (bool):
+                If true, the fonts of each directory (or archive) are cached, so only the fonts added or modified since the last execution are parsed.
+                If false, all the fonts are parsed.
+            parse_timeout (Optional[float]): See load_fonts_from_paths
+        Returns:
+            The fonts
+        """
         additional_fonts: Set[Font] = set()
+        fonts_paths: Set[str] = set()
 
         for font_path in additional_fonts_path:
-            if os.path.isfile(font_path):
-                additional_fonts.update(Font.from_font_path(font_path))
-            elif os.path.isdir(font_path):
-                for file in os.listdir(font_path):
-                    if Path(file).suffix.lstrip(".").strip().lower() in ["ttf", "otf", "ttc", "otc"]:
-                        additional_fonts.update(Font.from_font_path(os.path.join(font_path, file)))
+            if os.path.isdir(font_path):
+                directory_fonts_paths = FontLoader.get_fonts_paths_in_directory(font_path)
+            elif FontFile.is_archive(str(font_path)):
+                directory_fonts_paths = FontFile.get_fonts_paths_in_archive(str(font_path))
+            elif os.path.isfile(font_path):
+                fonts_paths.add(str(font_path))
+                continue
             else:
                 raise FileNotFoundError(f"The file {font_path} is not reachable")
+
+            if use_directory_cache:
+                additional_fonts.update(
+                    FontLoader.load_cached_fonts(
+                        FontLoader.get_additional_font_cache_file_path(font_path), directory_fonts_paths, jobs, parse_timeout
+                    )
+                )
+            else:
+                fonts_paths.update(directory_fonts_paths)
+
+        additional_fonts.update(FontLoader.load_fonts_from_paths(fonts_paths, jobs, parse_timeout))
         return additional_fonts
 
+    @staticmethod
+    def get_fonts_paths_in_directory(directory: Path) -> Set[str]:
+        """
+        Parameters:
+            directory (Path): Directory
+        Returns:
+            The path of all the .ttf, .otf, .ttc and .otc files in the directory and its subdirectories.
+            The subdirectories that can't be read are skipped.
+        """
+        fonts_paths: Set[str] = set()
+        directories: List[str] = [str(directory)]
+        # Avoid infinite loop with symbolic links
+        visited_directories: Set[str] = set()
+
+        while directories:
+            current_directory = directories.pop()
+            real_path = os.path.realpath(current_directory)
+            if real_path in visited_directories:
+                continue
+            visited_directories.add(real_path)
+
+            try:
+                entries = os.scandir(current_directory)
+            except OSError as e:
+                # One unreadable subdirectory must not stop the loading of the whole directory
+                if current_directory == str(directory):
+                    raise
+                _logger.warning(f'The directory "{current_directory}" has been skipped because it could not be read: {e}')
+                continue
+
+            with entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        directories.append(entry.path)
+                    elif os.path.splitext(entry.name)[1].strip().lower() in FONT_FILE_EXTENSIONS:
+                        fonts_paths.add(entry.path)
+
+        return fonts_paths
+
     @staticmethod
     def save_generated_fonts(generated_fonts: Set[Font]):
         generated_font_cache_file = FontLoader.get_generated_font_cache_file_path()
         FontLoader.save_font_cache_file(generated_font_cache_file, generated_fonts)
+        FontLoader._increment_generation()
+
+    @staticmethod
+    def _increment_generation():
+        # "+=" is not atomic, so two threads could increment it only once
+        with FontLoader._generation_lock:
+            FontLoader.generation += 1
 
     @staticmethod
     def discard_system_font_cache():
-        system_font_cache = FontLoader.get_system_font_cache_file_path()
-        if os.path.isfile(system_font_cache):
-            os.remove(system_font_cache)
+        # Remove the cache of every font directory, even the ones that don't contain any font anymore
+        system_font_caches = FontLoader.get_system_font_cache_files_paths()
+        # previous version to 2.1.4 (included) was saving all the system fonts in a single cache
+        system_font_caches.append(Path(os.path.join(gettempdir(), "FontCollector_SystemFont.bin")))
+
+        system_font_caches.append(FontLoader.get_system_font_directories_cache_file_path())
+
+        for system_font_cache in system_font_caches:
+            if os.path.isfile(system_font_cache):
+                os.remove(system_font_cache)
+        FontLoader._increment_generation()
+
+    @staticmethod
+    def discard_system_font_index():
+        system_font_index = FontLoader.get_system_font_index_file_path()
+        if os.path.isfile(system_font_index):
+            os.remove(system_font_index)
+        FontLoader._increment_generation()
+
+    @staticmethod
+    def discard_additional_font_cache(directory: Path):
+        additional_font_cache = FontLoader.get_additional_font_cache_file_path(directory)
+        if os.path.isfile(additional_font_cache):
+            os.remove(additional_font_cache)
+        FontLoader._increment_generation()
+
+    @staticmethod
+    def discard_system_mapped_font_index():
+        system_mapped_font_index = FontLoader.get_system_mapped_font_index_file_path()
+        if os.path.isfile(system_mapped_font_index):
+            os.remove(system_mapped_font_index)
+        FontLoader._increment_generation()
+
+    @staticmethod
+    def discard_quarantined_files():
+        quarantine_file = FontLoader.get_quarantine_file_path()
+        if os.path.isfile(quarantine_file):
+            os.remove(quarantine_file)
 
     @staticmethod
     def discard_generated_font_cache():
         generated_font_cache = FontLoader.get_generated_font_cache_file_path()
         if os.path.isfile(generated_font_cache):
             os.remove(generated_font_cache)
+        FontLoader._increment_generation()
+
+    @staticmethod
+    def get_system_font_cache_file_path(directory: str) -> Path:
+        tempDir = gettempdir()
+        # Each font directory has its own cache. The name only need to be unique.
+        directory_hash = sha1(os.path.abspath(directory).encode("utf-8", "surrogatepass")).hexdigest()
+        return Path(os.path.join(tempDir, f"FontCollector_SystemFont_{directory_hash}.bin"))
+
+    @staticmethod
+    def get_system_font_cache_files_paths() -> List[Path]:
+        """
+        Returns:
+            The cache of every font directory that exist.
+        """
+        tempDir = gettempdir()
+        return [Path(path) for path in sorted(glob(os.path.join(tempDir, "FontCollector_SystemFont_*.bin")))]
+
+    @staticmethod
+    def get_system_font_directories_cache_file_path() -> Path:
+        tempDir = gettempdir()
+        return Path(os.path.join(tempDir, "FontCollector_SystemFontDirectories.bin"))
+
+    @staticmethod
+    def get_system_font_index_file_path() -> Path:
+        tempDir = gettempdir()
+        return Path(os.path.join(tempDir, "FontCollector_SystemFont.db"))
+
+    @staticmethod
+    def get_system_mapped_font_index_file_path() -> Path:
+        tempDir = gettempdir()
+        return Path(os.path.join(tempDir, "FontCollector_SystemFont.idx"))
 
     @staticmethod
-    def get_system_font_cache_file_path() -> Path:
+    def get_additional_font_cache_file_path(directory: Path) -> Path:
         tempDir = gettempdir()
-        return Path(os.path.join(tempDir, "FontCollector_SystemFont.bin"))
+        # Each directory has its own cache. The name only need to be unique.
+        directory_hash = sha1(os.path.abspath(directory).encode("utf-8", "surrogatepass")).hexdigest()
+        return Path(os.path.join(tempDir, f"FontCollector_AdditionalFont_{directory_hash}.bin"))
 
     @staticmethod
     def get_generated_font_cache_file_path() -> Path:
         tempDir = gettempdir()
         return Path(os.path.join(tempDir, "FontCollector_GeneratedFont.bin"))
+
+    @staticmethod
+    def get_quarantine_file_path() -> Path:
+        tempDir = gettempdir()
+        return Path(os.path.join(tempDir, "FontCollector_Quarantine.bin"))
+
+    @staticmethod
+    def get_index_builds_file_path() -> Path:
+        tempDir = gettempdir()
+        return Path(os.path.join(tempDir, "FontCollector_IndexBuilds.bin"))
+
+
+class _IsolatedWorker:
+    """
+    Worker process of FontLoader.load_fonts_from_paths_isolated. It parse one file at a time.
+    """
+
+    def __init__(self, context, parse_timeout: float):
+        self.parse_timeout = parse_timeout
+        self.connection, worker_connection = context.Pipe()
+        # The parser is sent by reference, like with ProcessPoolExecutor.map, so the worker use the same one even if it is spawned
+        self.process = context.Process(target=_parse_fonts_in_worker, args=(worker_connection, Font.from_font_path), daemon=True)
+        self.process.start()
+        worker_connection.close()
+        # The time to start the worker doesn't count, so the deadline is only set when the worker is ready
+        self.is_ready = False
+        self.font_path: Optional[str] = None
+        self.deadline = float("inf")
+
+    def parse(self, font_path: str) -> None:
+        self.font_path = font_path
+        if self.is_ready:
+            self.deadline = monotonic() + self.parse_timeout
+        self.connection.send(font_path)
+
+    def get_result(self, fonts_by_path: Dict[str, List[Font]]) -> Optional[str]:
+        """
+        Parameters:
+            fonts_by_path (Dict[str, List[Font]]): If the file has been parsed, its fonts are added to it.
+        Returns:
+            If the worker crashed or took too much time, the reason. Else, None.
+        """
+        try:
+            while self.font_path is not None and self.connection.poll():
+                message = self.connection.recv()
+
+                if message is None:
+                    self.is_ready = True
+                    self.deadline = monotonic() + self.parse_timeout
+                    continue
+
+                font_path, fonts, exception = message
+                if exception is not None:
+                    raise exception
+                fonts_by_path[font_path] = fonts
+                self.font_path = None
+                self.deadline = float("inf")
+        except EOFError:
+            pass
+
+        if self.font_path is None:
+            return None
+        if not self.process.is_alive():
+            return f"the parser crashed (exit code {self.process.exitcode})"
+        if monotonic() >= self.deadline:
+            return f"the parsing took more than {self.parse_timeout} seconds"
+        return None
+
+    def close(self) -> None:
+        if self.process.is_alive() and self.font_path is None:
+            try:
+                self.connection.send(None)
+                self.process.join(1)
+            except OSError:
+                pass
+
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+def _parse_fonts_in_worker(connection: Connection, from_font_path: Callable[[str], List[Font]]) -> None:
+    # Tell that the worker is ready, then parse the files until None is received
+    connection.send(None)
+
+    while True:
+        font_path = connection.recv()
+        if font_path is None:
+            break
+
+        try:
+            connection.send((font_path, from_font_path(font_path), None))
+        except Exception as exception:
+            connection.send((font_path, None, exception))
@@ -1,15 +1,16 @@
 import freetype
 import logging
 from .exceptions import NameNotFoundException
+from .font_file import FontFileReader
 from ctypes import byref, c_uint, create_string_buffer
 from enum import IntEnum
+from functools import lru_cache
 from io import BufferedReader
-from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple
 from fontTools.ttLib.ttFont import TTFont
 from fontTools.ttLib.tables._n_a_m_e import NameRecord
 from fontTools.varLib.instancer.names import ELIDABLE_AXIS_VALUE_NAME
-from freetype import FT_Face, FT_Get_Glyph_Name
+from freetype import FT_Charmap, FT_Exception, FT_Face, FT_Get_CMap_Format, FT_Get_Glyph_Name, FT_Get_Postscript_Name
 from struct import error as struct_error
 
 _logger = logging.getLogger(__name__)
@@ -431,20 +432,26 @@ class FontParser:
         return name_to_decode.decode(encoding)
 
     @staticmethod
-    def get_font_postscript_property(font_path: str, font_index: int) -> Optional[str]:
+    def get_font_postscript_property(
+        font_path: str, font_index: int, font_file_reader: Optional[FontFileReader] = None
+    ) -> Optional[str]:
         """
         Parameters:
             font_path (str): Font path.
             font_index (int): Font index.
+            font_file_reader (FontFileReader): The reader of the font file. If None, the file is read again.
         Returns:
             The postscript name
         """
+        if font_file_reader is None:
+            with FontFileReader(font_path) as font_file_reader:
+                return FontParser.get_font_postscript_property(font_path, font_index, font_file_reader)
+
+        postscriptNameByte = None
         try:
             # Like libass, we use freetype: https://github.com/libass/libass/blob/a2b39cde4ecb74d5e6fccab4a5f7d8ad52b2b1a4/libass/ass_fontselect.c#L326
-            postscriptNameByte = freetype.Face(
-                Path(font_path).open("rb"), font_index
-            ).postscript_name
-        except OSError:
+            postscriptNameByte = FT_Get_Postscript_Name(font_file_reader.get_face(font_index))
+        except FT_Exception:
             _logger.warning(
                 f'Error: Please report this error on github. Attach this font "{font_path}" in your issue and say that the postscript has not been correctly decoded'
             )
@@ -464,13 +471,14 @@ class FontParser:
 
     @staticmethod
     def get_font_italic_bold_property(
-        font: TTFont, font_path: str, font_index: int
+        font: TTFont, font_path: str, font_index: int, font_file_reader: Optional[FontFileReader] = None
     ) -> Tuple[bool, int]:
         """
         Parameters:
             font (TTFont): An fontTools object
             font_path (str): Font path.
             font_index (int): Font index.
+            font_file_reader (FontFileReader): The reader of the font file. If None and freetype is needed, the file is read again.
         Returns:
             is_italic, weight
         """
@@ -478,16 +486,21 @@ class FontParser:
         def get_font_italic_bold_property_with_freetype(
             font_path: str, font_index: int
         ) -> Tuple[bool, int]:
-            font = freetype.Face(Path(font_path).open("rb"), font_index)
+            if font_file_reader is None:
+                with FontFileReader(font_path) as reader:
+                    style_flags = reader.get_face(font_index).contents.style_flags
+            else:
+                style_flags = font_file_reader.get_face(font_index).contents.style_flags
+
             # From: https://github.com/libass/libass/blob/a2b39cde4ecb74d5e6fccab4a5f7d8ad52b2b1a4/libass/ass_fontselect.c#L318
             is_italic = bool(
-                font.style_flags & freetype.ft_enums.ft_style_flags.FT_STYLE_FLAG_ITALIC
+                style_flags & freetype.ft_enums.ft_style_flags.FT_STYLE_FLAG_ITALIC
             )
             # From: https://github.com/libass/libass/blob/a2b39cde4ecb74d5e6fccab4a5f7d8ad52b2b1a4/libass/ass_font.c#L523
             weight = (
                 700
                 if bool(
-                    font.style_flags
+                    style_flags
                     & freetype.ft_enums.ft_style_flags.FT_STYLE_FLAG_BOLD
                 )
                 else 400
@@ -618,6 +631,46 @@ class FontParser:
         """
         return FontParser.CMAP_ENCODING_MAP.get(platform_id, {}).get(encoding_id, None)
 
+    @staticmethod
+    def get_supported_charmaps(face: FT_Face) -> List[FT_Charmap]:
+        """
+        Parameters:
+            face (FT_Face): An Font face
+        Returns:
+            The charmaps that GDI use to find the glyph of a character.
+        """
+        charmaps = [face.contents.charmaps[i] for i in range(face.contents.num_charmaps) if FT_Get_CMap_Format(face.contents.charmaps[i]) != -1]
+
+        supported_charmaps = [charmap for charmap in charmaps if charmap.contents.platform_id == 3]
+
+        # GDI seems to take apple cmap if there isn't any microsoft cmap: https://github.com/libass/libass/issues/679
+        if len(supported_charmaps) == 0:
+            supported_charmaps = [charmap for charmap in charmaps if charmap.contents.platform_id == 1 and charmap.contents.encoding_id == 0]
+
+        return supported_charmaps
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_cmap_encoding_table(cmap_encoding: str) -> Dict[str, int]:
+        """
+        Parameters:
+            cmap_encoding (str): A cmap codepoint encoding other than "unicode" and "unknown". See get_cmap_encoding and get_symbol_cmap_encoding.
+        Returns:
+            The codepoint of each character that the encoding can encode, like int.from_bytes(char.encode(cmap_encoding), "big").
+            The table is built once per encoding.
+        """
+        table: Dict[str, int] = {}
+
+        # The code pages used by the cmaps can only encode characters of the BMP
+        for codepoint in range(0x10000):
+            char = chr(codepoint)
+            try:
+                table[char] = int.from_bytes(char.encode(cmap_encoding), "big")
+            except UnicodeEncodeError:
+                continue
+
+        return table
+
     @staticmethod
     def get_name_encoding(name: NameRecord) -> Optional[str]:
         """
@@ -0,0 +1,458 @@
+import base64
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import struct
+from ._version import __version__
+from .ass_document import AssDocument
+from .ass_style import AssStyle
+from .font import Font
+from .font_loader import FontLoader
+from .font_result import FontResult
+from .glyph_coverage import GlyphCoverage
+from .helpers import Helpers
+from pathlib import Path
+from tempfile import gettempdir
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+_logger = logging.getLogger(__name__)
+
+
+def _font_to_json(font: Font) -> Dict[str, Any]:
+    return {
+        "filename": str(font.filename),
+        "font_index": font.font_index,
+        "family_names": sorted(font.family_names),
+        "weight": font.weight,
+        "italic": font.italic,
+        "exact_names": sorted(font.exact_names),
+        "named_instance_coordinates": font.named_instance_coordinates,
+        # Without it, the server would need to open the font file to find the missing glyphs
+        "coverage": None if font.coverage is None else base64.b64encode(font.coverage.to_bytes()).decode("ascii"),
+    }
+
+
+def _font_from_json(font: Dict[str, Any]) -> Font:
+    return Font(
+        font["filename"],
+        font["font_index"],
+        font["family_names"],
+        font["weight"],
+        font["italic"],
+        font["exact_names"],
+        font["named_instance_coordinates"],
+        None if font.get("coverage") is None else GlyphCoverage.from_bytes(base64.b64decode(font["coverage"])),
+    )
+
+
+def _font_result_to_json(font_result: Optional[FontResult]) -> Optional[Dict[str, Any]]:
+    if font_result is None:
+        return None
+
+    return {
+        "font": _font_to_json(font_result.font),
+        "mismatch_bold": font_result.mismatch_bold,
+        "mismatch_italic": font_result.mismatch_italic,
+    }
+
+
+def _font_result_from_json(font_result: Optional[Dict[str, Any]]) -> Optional[FontResult]:
+    if font_result is None:
+        return None
+
+    return FontResult(
+        _font_from_json(font_result["font"]),
+        font_result["mismatch_bold"],
+        font_result["mismatch_italic"],
+    )
+
+
+def _get_peer_uid(connection: socket.socket) -> Optional[int]:
+    """
+    Returns:
+        The user id of the process at the other end of the connection. If the platform can't give it, None.
+    """
+    if hasattr(socket, "SO_PEERCRED"):
+        # struct ucred: pid, uid, gid
+        credentials = connection.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("iII"))
+        return struct.unpack("iII", credentials)[1]
+    if hasattr(socket, "LOCAL_PEERCRED"):
+        # struct xucred: version, uid, ngroups, groups[16]. The level is SOL_LOCAL, which is 0.
+        credentials = connection.getsockopt(0, socket.LOCAL_PEERCRED, struct.calcsize("IIh16I"))
+        return struct.unpack_from("II", credentials)[1]
+    return None
+
+
+def _is_owned_by_current_user(socket_path: Path) -> bool:
+    """
+    Returns:
+        True if socket_path is a socket owned by the current user.
+    """
+    try:
+        socket_stat = os.lstat(socket_path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(socket_stat.st_mode) and socket_stat.st_uid == os.getuid()
+
+
+def _style_to_json(style: AssStyle) -> Dict[str, Any]:
+    return {"fontname": style.fontname, "weight": style.weight, "italic": style.italic}
+
+
+def _style_from_json(style: Dict[str, Any]) -> AssStyle:
+    return AssStyle(style["fontname"], style["weight"], style["italic"])
+
+
+class _FontRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Each request and each response is a JSON object on a single line. See FontServer for the commands.
+    """
+
+    server: "FontServer"
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                response = self.server.process_command(request)
+            except Exception as e:
+                _logger.exception("The request could not be handled")
+                response = {"error": f"{type(e).__name__}: {e}"}
+
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class FontServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Keep a FontLoader in memory and answer the requests of the FontClient over a Unix domain socket.
+    Each connection has its own thread. The requests of different connections are handled concurrently, since the FontLoader can be shared between threads.
+
+    The server read the files that a client ask for and the client copy the fonts that the server return,
+    so both only trust a process of the same user: the socket is only accessible by its owner (see get_socket_directory)
+    and the user of the other end of the connection is verified.
+
+    Commands:
+        ping: {"command": "ping"}
+            Returns {"version": str, "config": {"additional_fonts": [str], "use_system_font": bool, "lazy_system_font": bool}}
+        resolve_styles: {"command": "resolve_styles", "styles": [{"fontname": str, "weight": int, "italic": bool}]}
+            Returns {"results": [FontResult or null]}. The results are in the same order than the styles.
+        missing_glyphs: {"command": "missing_glyphs", "font": Font, "text": str, "support_only_ascii_char_for_symbol_font": bool}
+            Returns {"missing_glyphs": [str]}
+        analyze: {"command": "analyze", "ass_path": str, "collect_draw_fonts": bool}
+            Returns {"styles": [{"style": AssStyle, "lines": [int], "font_result": FontResult or null, "missing_glyphs": [str]}]}
+    If the request fail, the response is {"error": str}.
+    """
+
+    daemon_threads = True
+
+    font_loader: FontLoader
+    config: Dict[str, Any]
+
+    def __init__(
+        self,
+        font_loader: FontLoader,
+        config: Dict[str, Any],
+        socket_path: Optional[Path] = None,
+    ):
+        """
+        Parameters:
+            font_loader (FontLoader): The FontLoader used to answer the requests.
+            config (Dict[str, Any]): The options used to create the font_loader. See FontServer.get_config.
+                A FontClient only use the server if it has been started with the same config.
+            socket_path (Path): Path of the Unix domain socket. By default, it is FontServer.get_socket_path().
+        """
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("The font server need Unix domain socket, but they aren't supported on this platform")
+
+        if socket_path is None:
+            socket_path = FontServer.get_socket_path()
+
+        # A socket file may remain if the previous server has been killed
+        if os.path.lexists(socket_path):
+            font_client = FontClient.connect(socket_path)
+            if font_client is not None:
+                font_client.close()
+                raise FileExistsError(f'A FontCollector server is already running on "{socket_path}"')
+            # Only a socket of the current user can be a remaining one, any other file is kept
+            if not _is_owned_by_current_user(socket_path):
+                raise FileExistsError(f'The file "{socket_path}" already exist and it is not a socket of the current user')
+            os.remove(socket_path)
+
+        self.font_loader = font_loader
+        self.config = config
+        super().__init__(str(socket_path), _FontRequestHandler)
+
+    def server_bind(self):
+        super().server_bind()
+        os.chmod(self.server_address, 0o600)
+
+    def verify_request(self, request: socket.socket, client_address) -> bool:
+        if _get_peer_uid(request) != os.getuid():
+            _logger.warning("A connection from another user has been refused")
+            return False
+        return True
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+    def process_command(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Parameters:
+            request (Dict[str, Any]): A request of the protocol.
+        Returns:
+            The response.
+        """
+        command = request.get("command")
+
+        if command == "ping":
+            return {"version": __version__, "config": self.config}
+        elif command == "resolve_styles":
+            return {
+                "results": [
+                    _font_result_to_json(Helpers.get_used_font_by_style(self.font_loader, _style_from_json(style)))
+                    for style in request["styles"]
+                ]
+            }
+        elif command == "missing_glyphs":
+            font = _font_from_json(request["font"])
+            missing_glyphs = font.get_missing_glyphs(
+                request["text"], request.get("support_only_ascii_char_for_symbol_font", False)
+            )
+            return {"missing_glyphs": sorted(missing_glyphs)}
+        elif command == "analyze":
+            subtitle = AssDocument.from_file(request["ass_path"])
+            styles = subtitle.get_used_style(request.get("collect_draw_fonts", False))
+
+            analyzed_styles: List[Dict[str, Any]] = []
+            for style, usage_data in styles.items():
+                font_result = Helpers.get_used_font_by_style(self.font_loader, style)
+                missing_glyphs: Set[str] = set()
+                if font_result is not None:
+                    missing_glyphs = font_result.font.get_missing_glyphs(usage_data.characters_used)
+
+                analyzed_styles.append(
+                    {
+                        "style": _style_to_json(style),
+                        "lines": usage_data.ordered_lines,
+                        "font_result": _font_result_to_json(font_result),
+                        "missing_glyphs": sorted(missing_glyphs),
+                    }
+                )
+            return {"styles": analyzed_styles}
+
+        raise ValueError(f'The command "{command}" is not supported')
+
+    @staticmethod
+    def get_config(
+        additional_fonts_path: Sequence[Path], use_system_font: bool, lazy_system_font: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Parameters:
+            additional_fonts_path (Sequence[Path]): Additional fonts given to the FontLoader.
+            use_system_font (bool): If the FontLoader use the system fonts.
+            lazy_system_font (bool): If the additional fonts take precedence over the system fonts.
+        Returns:
+            The options of a FontLoader that change the fonts it can find.
+        """
+        return {
+            "additional_fonts": sorted(os.path.abspath(path) for path in additional_fonts_path),
+            "use_system_font": use_system_font,
+            "lazy_system_font": lazy_system_font,
+        }
+
+    @staticmethod
+    def get_socket_path(create_directory: bool = True) -> Path:
+        """
+        Parameters:
+            create_directory (bool): See get_socket_directory.
+        Returns:
+            The path of the default socket.
+        """
+        return FontServer.get_socket_directory(create_directory) / "FontCollector.sock"
+
+    @staticmethod
+    def get_socket_directory(create_directory: bool = True) -> Path:
+        """
+        Parameters:
+            create_directory (bool): If true, the directory is created if it doesn't exist.
+                If false (ex: to connect to a server), it may not exist.
+        Returns:
+            The directory of the default socket. Only the current user can access it.
+            It is in $XDG_RUNTIME_DIR if it is set, else in the temporary directory.
+        """
+        runtime_directory = os.environ.get("XDG_RUNTIME_DIR")
+        if runtime_directory and os.path.isdir(runtime_directory):
+            socket_directory = os.path.join(runtime_directory, "FontCollector")
+        else:
+            # The temporary directory is shared by all the users, so each user has its own directory
+            socket_directory = os.path.join(gettempdir(), f"FontCollector-{os.getuid()}")
+
+        if create_directory:
+            os.makedirs(socket_directory, mode=0o700, exist_ok=True)
+        elif not os.path.lexists(socket_directory):
+            return Path(socket_directory)
+
+        # Another user could have created the directory first
+        directory_stat = os.lstat(socket_directory)
+        if (
+            not stat.S_ISDIR(directory_stat.st_mode)
+            or directory_stat.st_uid != os.getuid()
+            or directory_stat.st_mode & 0o077
+        ):
+            raise PermissionError(
+                f'The directory "{socket_directory}" need to be a directory owned by the current user that only this user can access'
+            )
+
+        return Path(socket_directory)
+
+
+class FontClient:
+    """
+    Send the requests to a running FontServer. See FontServer for the protocol.
+    """
+
+    socket_path: Path
+
+    def __init__(self, connection: socket.socket, socket_path: Path):
+        self._connection = connection
+        self._file = connection.makefile("rwb")
+        self.socket_path = socket_path
+
+    @staticmethod
+    def connect(socket_path: Optional[Path] = None) -> Optional["FontClient"]:
+        """
+        Parameters:
+            socket_path (Path): Path of the Unix domain socket. By default, it is FontServer.get_socket_path().
+        Returns:
+            A client connected to the server. If there isn't any server running, None.
+            If the server is run by another user, it isn't trusted, so None.
+        """
+        if not hasattr(socket, "AF_UNIX"):
+            return None
+
+        if socket_path is None:
+            try:
+                # Connecting must not create the directory when there isn't any server
+                socket_path = FontServer.get_socket_path(create_directory=False)
+            except PermissionError as e:
+                _logger.warning(f"{e}. The FontCollector server won't be used.")
+                return None
+
+        if not os.path.exists(socket_path):
+            return None
+
+        if not _is_owned_by_current_user(socket_path):
+            _logger.warning(f'The socket "{socket_path}" is not owned by the current user. The FontCollector server won\'t be used.')
+            return None
+
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            connection.connect(str(socket_path))
+        except OSError:
+            connection.close()
+            return None
+
+        if _get_peer_uid(connection) != os.getuid():
+            _logger.warning(f'The FontCollector server "{socket_path}" is run by another user. It won\'t be used.')
+            connection.close()
+            return None
+
+        return FontClient(connection, socket_path)
+
+    def close(self) -> None:
+        self._file.close()
+        self._connection.close()
+
+    def __enter__(self) -> "FontClient":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _send(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self._file.write(json.dumps(request).encode("utf-8") + b"\n")
+        self._file.flush()
+
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError(f'The FontCollector server "{self.socket_path}" closed the connection')
+
+        response = json.loads(line)
+        if "error" in response:
+            raise RuntimeError(f"The FontCollector server reported an error: {response['error']}")
+        return response
+
+    def ping(self) -> Dict[str, Any]:
+        """
+        Returns:
+            The version and the config of the server.
+        """
+        return self._send({"command": "ping"})
+
+    def get_used_fonts_by_style(self, styles: Sequence[AssStyle]) -> List[Optional[FontResult]]:
+        """
+        Parameters:
+            styles (Sequence[AssStyle]): Styles
+        Returns:
+            The result of Helpers.get_used_font_by_style for each style.
+        """
+        response = self._send({"command": "resolve_styles", "styles": [_style_to_json(style) for style in styles]})
+        font_results = [_font_result_from_json(font_result) for font_result in response["results"]]
+
+        for style, font_result in zip(styles, font_results):
+            if font_result is None:
+                _logger.error(f"Could not find font '{style.fontname}'")
+            else:
+                _logger.info(f"Found '{style.fontname}' at '{font_result.font.filename}'")
+
+        return font_results
+
+    def get_missing_glyphs(
+        self, font: Font, text: Sequence[str], support_only_ascii_char_for_symbol_font: bool = False
+    ) -> Set[str]:
+        """
+        Parameters:
+            font (Font): Font
+            text (Sequence[str]): Text
+            support_only_ascii_char_for_symbol_font (bool): See Font.get_missing_glyphs
+        Returns:
+            A set of all the character that the font cannot display.
+        """
+        response = self._send(
+            {
+                "command": "missing_glyphs",
+                "font": _font_to_json(font),
+                "text": "".join(text),
+                "support_only_ascii_char_for_symbol_font": support_only_ascii_char_for_symbol_font,
+            }
+        )
+        return set(response["missing_glyphs"])
+
+    def analyze(self, ass_path: Path, collect_draw_fonts: bool = False) -> List[Dict[str, Any]]:
+        """
+        Parameters:
+            ass_path (Path): Path of the .ass file. The server need to be able to read it.
+            collect_draw_fonts (bool): See AssDocument.get_used_style
+        Returns:
+            For each used style, a dict with the style (AssStyle), the lines where it is used,
+            the font_result (FontResult or None) and the missing_glyphs.
+        """
+        response = self._send(
+            {"command": "analyze", "ass_path": os.path.abspath(ass_path), "collect_draw_fonts": collect_draw_fonts}
+        )
+
+        return [
+            {
+                "style": _style_from_json(analyzed_style["style"]),
+                "lines": analyzed_style["lines"],
+                "font_result": _font_result_from_json(analyzed_style["font_result"]),
+                "missing_glyphs": set(analyzed_style["missing_glyphs"]),
+            }
+            for analyzed_style in response["styles"]
+        ]
@@ -0,0 +1,201 @@
+import struct
+import sys
+from .font_parser import FontParser
+from array import array
+from bisect import bisect_right
+from ctypes import byref
+from freetype import (
+    FT_Exception,
+    FT_Face,
+    FT_Get_First_Char,
+    FT_Get_Next_Char,
+    FT_Set_Charmap,
+    FT_UInt,
+    FT_ULong,
+)
+from typing import Iterable, Iterator, Sequence, Set
+
+# Number of boundaries of the ranges reachable without the symbol cmap. It is followed by the boundaries of both ranges.
+_HEADER = struct.Struct("<I")
+
+
+class GlyphCoverage:
+    """
+    The characters that a font face can display, with the same charmap rules as Font.get_missing_glyphs.
+    It is computed once when the font is parsed, so the missing glyphs can be found without opening the font file.
+
+    The codepoints are stored as sorted ranges in an array: [start_0, end_0, start_1, end_1, ...] where the end is excluded.
+    A codepoint is covered if the number of boundaries lower or equal to it is odd.
+    The characters that are only reachable with the Microsoft symbol cmap are stored apart,
+    since libass only support the ascii characters for this cmap.
+    """
+
+    __slots__ = ("_ranges", "_symbol_ranges")
+
+    _ranges: array
+    _symbol_ranges: array
+
+    def __init__(self, codepoints: Iterable[int], symbol_codepoints: Iterable[int] = ()):
+        """
+        Parameters:
+            codepoints (Iterable[int]): The codepoints that have a glyph.
+            symbol_codepoints (Iterable[int]): The codepoints that have a glyph in the Microsoft symbol cmap.
+        """
+        self._ranges = GlyphCoverage._to_ranges(codepoints)
+        self._symbol_ranges = GlyphCoverage._to_ranges(symbol_codepoints)
+
+    @staticmethod
+    def _to_ranges(codepoints: Iterable[int]) -> array:
+        ranges = array("I")
+        for codepoint in sorted(set(codepoints)):
+            if len(ranges) > 0 and ranges[-1] == codepoint:
+                ranges[-1] = codepoint + 1
+            else:
+                ranges.append(codepoint)
+                ranges.append(codepoint + 1)
+        return ranges
+
+    @staticmethod
+    def _is_in_ranges(ranges: array, codepoint: int) -> bool:
+        return bisect_right(ranges, codepoint) % 2 == 1
+
+    @staticmethod
+    def from_face(face: FT_Face) -> "GlyphCoverage":
+        """
+        Parameters:
+            face (FT_Face): An Font face
+        Returns:
+            The coverage of the face. It follow the GDI/libass charmap rules, see Font.get_missing_glyphs.
+        """
+        codepoints: Set[int] = set()
+        symbol_codepoints: Set[int] = set()
+
+        for charmap in FontParser.get_supported_charmaps(face):
+            error = FT_Set_Charmap(face, charmap)
+            if error: raise FT_Exception(error)
+
+            platform_id = charmap.contents.platform_id
+            encoding_id = charmap.contents.encoding_id
+
+            cmap_encoding = FontParser.get_cmap_encoding(platform_id, encoding_id)
+
+            # cmap not supported
+            if cmap_encoding is None:
+                continue
+
+            if cmap_encoding == "unicode":
+                codepoints.update(GlyphCoverage._get_charmap_codes(face))
+                continue
+
+            is_symbol_cmap = platform_id == 3 and encoding_id == 0
+            if cmap_encoding == "unknown":
+                if not is_symbol_cmap:
+                    # cmap not supported
+                    continue
+
+                cmap_encoding = FontParser.get_symbol_cmap_encoding(face)
+                if cmap_encoding is None:
+                    # Fallback if guess fails
+                    cmap_encoding = "cp1252"
+
+            charmap_codes = set(GlyphCoverage._get_charmap_codes(face))
+
+            if is_symbol_cmap:
+                # GDI/Libass modify the codepoint for microsoft symbol cmap: https://github.com/libass/libass/blob/04a208d5d200360d2ac75f8f6cfc43dd58dd9225/libass/ass_font.c#L249-L250
+                symbol_codepoints.update(
+                    ord(char) for char, codepoint in FontParser.get_cmap_encoding_table(cmap_encoding).items() if 0xF000 | codepoint in charmap_codes
+                )
+            else:
+                codepoints.update(
+                    ord(char) for char, codepoint in FontParser.get_cmap_encoding_table(cmap_encoding).items() if codepoint in charmap_codes
+                )
+
+        return GlyphCoverage(codepoints, symbol_codepoints)
+
+    @staticmethod
+    def _get_charmap_codes(face: FT_Face) -> Iterator[int]:
+        """
+        Returns:
+            The character codes of the selected charmap that have a glyph.
+        """
+        glyph_index = FT_UInt()
+        charcode = FT_Get_First_Char(face, byref(glyph_index))
+        while glyph_index.value:
+            yield charcode
+            charcode = FT_Get_Next_Char(face, FT_ULong(charcode), byref(glyph_index))
+
+    def get_missing_glyphs(
+        self,
+        text: Sequence[str],
+        support_only_ascii_char_for_symbol_font: bool = False
+    ) -> Set[str]:
+        """
+        Parameters:
+            text (Sequence[str]): Text
+            support_only_ascii_char_for_symbol_font (bool): See Font.get_missing_glyphs
+        Returns:
+            A set of all the character that the font cannot display.
+        """
+        char_not_found: Set[str] = set()
+
+        for char in set(text):
+            codepoint = ord(char)
+
+            if GlyphCoverage._is_in_ranges(self._ranges, codepoint):
+                continue
+
+            if (not support_only_ascii_char_for_symbol_font or char.isascii()) and GlyphCoverage._is_in_ranges(self._symbol_ranges, codepoint):
+                continue
+
+            char_not_found.add(char)
+
+        return char_not_found
+
+    def to_bytes(self) -> bytes:
+        """
+        Returns:
+            The coverage in a compact form. See from_bytes.
+        """
+        ranges = array("I", self._ranges)
+        ranges.extend(self._symbol_ranges)
+        # The bytes are always little endian, like the other binary files of FontCollector
+        if sys.byteorder == "big":
+            ranges.byteswap()
+        return _HEADER.pack(len(self._ranges)) + ranges.tobytes()
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "GlyphCoverage":
+        """
+        Parameters:
+            data (bytes): A coverage created by to_bytes.
+        Returns:
+            The coverage.
+        """
+        (ranges_length,) = _HEADER.unpack_from(data)
+
+        ranges = array("I")
+        ranges.frombytes(data[_HEADER.size :])
+        if sys.byteorder == "big":
+            ranges.byteswap()
+
+        if ranges_length > len(ranges) or ranges_length % 2 != 0 or len(ranges) % 2 != 0:
+            raise ValueError("The data isn't a valid glyph coverage")
+
+        coverage = GlyphCoverage.__new__(GlyphCoverage)
+        coverage._ranges = ranges[:ranges_length]
+        coverage._symbol_ranges = ranges[ranges_length:]
+        return coverage
+
+    def __reduce__(self):
+        return (GlyphCoverage.from_bytes, (self.to_bytes(),))
+
+    def __eq__(self, other: "GlyphCoverage"):
+        if not isinstance(other, GlyphCoverage):
+            return NotImplemented
+        return (self._ranges, self._symbol_ranges) == (other._ranges, other._symbol_ranges)
+
+    def __hash__(self):
+        return hash((self._ranges.tobytes(), self._symbol_ranges.tobytes()))
+
+    def __repr__(self):
+        return f'Ranges: "{len(self._ranges) // 2}", Symbol_ranges: "{len(self._symbol_ranges) // 2}"'
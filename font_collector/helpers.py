@@ -1,10 +1,12 @@
 import logging
 import os
-import shutil
 from .ass_style import AssStyle
+from .font_file import FontFile
 from .font_parser import FontParser, NameID
 from .font import Font
+from .font_index import FontIndex
 from .font_loader import FontLoader
+from .mapped_font_index import MappedFontIndex
 from .font_result import FontResult
 from ._version import __version__
 from datetime import date
@@ -12,7 +14,7 @@ from fontTools.ttLib.ttFont import TTFont
 from fontTools.ttLib.ttCollection import TTCollection
 from fontTools.varLib import instancer
 from pathlib import Path
-from typing import List, Sequence, Set, Tuple, Union
+from typing import Iterable, List, Optional, Sequence, Set, Tuple, Union
 
 _logger = logging.getLogger(__name__)
 
@@ -20,11 +22,16 @@ _logger = logging.getLogger(__name__)
 class Helpers:
     @staticmethod
     def get_used_font_by_style(
-        font_collection: Set[Font], style: AssStyle, search_by_family_name: bool = True
+        font_collection: Union[Set[Font], FontLoader, FontIndex, MappedFontIndex],
+        style: AssStyle,
+        search_by_family_name: bool = True,
     ) -> Union[FontResult, None]:
         """
         Parameters:
-            font_collection (Set[Font]): Font collection
+            font_collection (Set[Font], FontLoader, FontIndex or MappedFontIndex): Font collection
+                If it is not a set, the fonts are looked up by their name instead of iterating over all the fonts.
+                If it is a FontLoader, its tiers are searched one after the other, first by family name, then by exact name.
+                See FontLoader.get_font_tiers.
             style (AssStyle): An AssStyle
             search_by_family_name (bool):
                 If true, it will search the font by it's family name.
@@ -32,24 +39,50 @@ class Helpers:
         Returns:
             Ordered list of the font that match the best to the AssStyle
         """
-        fonts_match: List[Tuple[int, Font]] = []
+        # Like without tiers, a font with the family name is preferred to a font with the exact name, whatever its tier
+        for by_family_name in ([True, False] if search_by_family_name else [False]):
+            if isinstance(font_collection, FontLoader):
+                font_tiers = font_collection.get_font_tiers()
+            else:
+                font_tiers = [font_collection]
+
+            # The system fonts of a lazy FontLoader are only loaded if the font isn't in the first tier
+            for font_tier in font_tiers:
+                font_result = Helpers._get_used_font_by_style(
+                    font_tier,
+                    style,
+                    by_family_name,
+                    font_collection if isinstance(font_collection, FontLoader) else None,
+                )
+
+                if font_result is not None:
+                    _logger.info(f"Found '{style.fontname}' at '{font_result.font.filename}'")
+                    return font_result
+
+        _logger.error(f"Could not find font '{style.fontname}'")
+        return None
 
-        for font in font_collection:
-            if (search_by_family_name and style.fontname in font.family_names) or (
-                not search_by_family_name and style.fontname in font.exact_names
-            ):
+    @staticmethod
+    def _get_used_font_by_style(
+        font_collection: Union[Set[Font], FontLoader, FontIndex, MappedFontIndex],
+        style: AssStyle,
+        search_by_family_name: bool = True,
+        font_loader: Optional[FontLoader] = None,
+    ) -> Union[FontResult, None]:
+        fonts_match: List[Tuple[int, Font]] = []
 
-                weight_compare = abs(style.weight - font.weight)
+        for font in Helpers.get_fonts_by_name(font_collection, style.fontname, search_by_family_name):
+            weight_compare = abs(style.weight - font.weight)
 
-                if (style.weight - font.weight) > 150:
-                    weight_compare -= 120
+            if (style.weight - font.weight) > 150:
+                weight_compare -= 120
 
-                # Thanks to rcombs@github: https://github.com/libass/libass/issues/613#issuecomment-1102994528
-                weight_compare = (
-                    ((((weight_compare << 3) + weight_compare) << 3)) + weight_compare
-                ) >> 8
+            # Thanks to rcombs@github: https://github.com/libass/libass/issues/613#issuecomment-1102994528
+            weight_compare = (
+                ((((weight_compare << 3) + weight_compare) << 3)) + weight_compare
+            ) >> 8
 
-                fonts_match.append((weight_compare, font))
+            fonts_match.append((weight_compare, font))
 
         # The last sort parameter (font.weight) is totally optional.
         # In VSFilter, when the weight_compare is the same between 2 fonts, it will take the first one, so the order is random.
@@ -64,22 +97,45 @@ class Helpers:
             )
         )
 
-        if len(fonts_match) > 0:
-            match = fonts_match[0][1]
+        # Only the file of the font that will be used is checked. See FontLoader.is_font_deleted.
+        match = next(
+            (font for _, font in fonts_match if font_loader is None or not font_loader.is_font_deleted(font)),
+            None,
+        )
+
+        if match is not None:
             mismatch_italic = not (match.italic == style.italic)
             mismatch_bold = not (-150 < match.weight - style.weight < 150)
 
-            font_result = FontResult(match, mismatch_bold, mismatch_italic)
-            _logger.info(f"Found '{style.fontname}' at '{font_result.font.filename}'")
-            return font_result
-        elif search_by_family_name:
-            return Helpers.get_used_font_by_style(
-                font_collection, style, search_by_family_name=False
-            )
+            return FontResult(match, mismatch_bold, mismatch_italic)
         else:
-            _logger.error(f"Could not find font '{style.fontname}'")
             return None
 
+    @staticmethod
+    def get_fonts_by_name(
+        font_collection: Union[Set[Font], FontLoader, FontIndex, MappedFontIndex],
+        fontname: str,
+        search_by_family_name: bool = True,
+    ) -> Iterable[Font]:
+        """
+        Parameters:
+            font_collection (Set[Font], FontLoader, FontIndex or MappedFontIndex): Font collection
+            fontname (str): The font name. It need to be lowercase.
+            search_by_family_name (bool):
+                If true, it will search the font by it's family name.
+                If false, it will search the font by it's exact_name (fullname or postscript name).
+        Returns:
+            The fonts that have this name
+        """
+        if isinstance(font_collection, (FontLoader, FontIndex, MappedFontIndex)):
+            if search_by_family_name:
+                return font_collection.get_fonts_by_family_name(fontname)
+            return font_collection.get_fonts_by_exact_name(fontname)
+
+        if search_by_family_name:
+            return [font for font in font_collection if fontname in font.family_names]
+        return [font for font in font_collection if fontname in font.exact_names]
+
     @staticmethod
     def copy_font_to_directory(
         font_collection: Sequence[Font],
@@ -113,10 +169,10 @@ class Helpers:
                 )[0]
 
             # Don't overwrite fonts
-            if not os.path.isfile(
-                os.path.join(output_directory, Path(font.filename).name)
-            ):
-                shutil.copy(font.filename, output_directory)
+            font_destination = os.path.join(output_directory, FontFile.get_name(font.filename))
+            if not os.path.isfile(font_destination):
+                # The members of an archive are streamed to the destination
+                FontFile.copy(font.filename, font_destination)
 
     @staticmethod
     def variable_font_to_collection(
@@ -124,7 +180,7 @@ class Helpers:
     ) -> List[Font]:
         """
         Parameters:
-            fontpath (str): The path to the variable font that need to be converted
+            fontpath (str): The path to the variable font that need to be converted. It can be a member of a .zip archive.
             output_directory (str): Path where to save the generated font
             cache_generated_font (bool):  Converting an variable font into an collection font is a slow process. Caching the result boost the performance.
                 If true, then the generated font will be cached.
@@ -133,7 +189,7 @@ class Helpers:
             List of Font that represent the truetype collection font generated
         """
         font_collection = TTCollection()
-        ttFont = TTFont(fontpath)
+        ttFont = TTFont(FontFile.open(fontpath) if FontFile.is_archive_member(fontpath) else fontpath)
         fonts = Font.from_font_path(fontpath)
 
         for font in fonts:
@@ -172,7 +228,6 @@ class Helpers:
 
         generated_fonts = Font.from_font_path(savepath)
         if cache_generated_font:
-            for font in generated_fonts:
-                FontLoader.add_generated_font(font)
+            FontLoader.add_generated_fonts(generated_fonts)
 
         return generated_fonts
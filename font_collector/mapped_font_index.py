@@ -0,0 +1,340 @@
+import json
+import mmap
+import os
+import struct
+import zlib
+from .font import Font
+from .font_index import FileSignature
+from .glyph_coverage import GlyphCoverage
+from pathlib import Path
+from tempfile import mkstemp
+from typing import Dict, Iterable, List, Set, Tuple
+
+# The file starts with the header. All the integers are little endian.
+# magic, schema_version,
+# files_count, records_count, name_refs_count, family_buckets_count, family_entries_count, exact_buckets_count, exact_entries_count,
+# strings_offset, files_offset, records_offset, name_refs_offset, family_buckets_offset, family_entries_offset, exact_buckets_offset, exact_entries_offset
+_HEADER = struct.Struct("<4sI7I8Q")
+# path_offset, path_length, size, mtime_ns, inode
+_FILE = struct.Struct("<IIQqQ")
+# file_index, font_index, weight, italic, coordinates_offset, coordinates_length, family_names_start, family_names_count, exact_names_start, exact_names_count,
+# coverage_offset, coverage_length
+_RECORD = struct.Struct("<IIHBxIIIIIIII")
+# string_offset, string_length
+_NAME_REF = struct.Struct("<II")
+# entries_start, entries_count
+_BUCKET = struct.Struct("<II")
+# name_offset, name_length, record_index
+_ENTRY = struct.Struct("<III")
+
+
+class MappedFontIndex:
+    """
+    Read-only binary index of fonts that is memory-mapped.
+    Opening it does not depend on the number of fonts. A lookup only decode the fonts that match.
+
+    The file contains:
+        - A string table: every string (path, name, named instance coordinates) is stored once in UTF-8.
+          The coverages (see GlyphCoverage.to_bytes) are also stored once in it. A font without coverage has a length of 0.
+        - A table of the indexed files with their signature.
+        - A fixed-size record for each font: file, font index, weight, italic, coordinates, its names and its coverage.
+        - Two hash tables (family names and exact names) that give the records that have a name.
+    Since it is read-only, an index is updated by building a new file with MappedFontIndex.build.
+    """
+
+    MAGIC = b"FCMI"
+    SCHEMA_VERSION: int = 2
+
+    index_path: Path
+
+    def __init__(self, index_path: Path):
+        """
+        Parameters:
+            index_path (Path): Path of an index created by MappedFontIndex.build.
+        """
+        self.index_path = index_path
+
+        with open(index_path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < _HEADER.size:
+            self._mmap.close()
+            raise FileExistsError(f'The file "{index_path}" contain invalid data')
+
+        (
+            magic,
+            schema_version,
+            self._files_count,
+            self._records_count,
+            _,
+            self._family_buckets_count,
+            _,
+            self._exact_buckets_count,
+            _,
+            self._strings_offset,
+            self._files_offset,
+            self._records_offset,
+            self._name_refs_offset,
+            self._family_buckets_offset,
+            self._family_entries_offset,
+            self._exact_buckets_offset,
+            self._exact_entries_offset,
+        ) = _HEADER.unpack_from(self._mmap, 0)
+
+        if magic != MappedFontIndex.MAGIC or schema_version != MappedFontIndex.SCHEMA_VERSION:
+            self._mmap.close()
+            raise FileExistsError(f'The file "{index_path}" contain invalid data')
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def __enter__(self) -> "MappedFontIndex":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._records_count
+
+    def __reduce__(self):
+        # The mapping can't be pickled. The process that unpickle the index map the same file, so it can be sent to a worker process.
+        return (MappedFontIndex, (self.index_path,))
+
+    @property
+    def files_signature(self) -> Dict[str, FileSignature]:
+        """
+        Returns:
+            The signature of every indexed file.
+        """
+        files_signature: Dict[str, FileSignature] = {}
+
+        for file_index in range(self._files_count):
+            path_offset, path_length, size, mtime_ns, inode = _FILE.unpack_from(
+                self._mmap, self._files_offset + file_index * _FILE.size
+            )
+            files_signature[self._get_string(path_offset, path_length)] = (size, mtime_ns, inode)
+
+        return files_signature
+
+    @property
+    def fonts(self) -> Set[Font]:
+        """
+        Get all the fonts. It decode the whole index, so prefer get_fonts_by_family_name and get_fonts_by_exact_name.
+        """
+        return set(self._get_font(record_index) for record_index in range(self._records_count))
+
+    def get_fonts_by_family_name(self, family_name: str) -> List[Font]:
+        """
+        Parameters:
+            family_name (str): Family name. It need to be lowercase.
+        Returns:
+            All the fonts that have this family name.
+        """
+        return self._get_fonts_by_name(
+            family_name, self._family_buckets_count, self._family_buckets_offset, self._family_entries_offset
+        )
+
+    def get_fonts_by_exact_name(self, exact_name: str) -> List[Font]:
+        """
+        Parameters:
+            exact_name (str): Exact name (fullname or postscript name). It need to be lowercase.
+        Returns:
+            All the fonts that have this exact name.
+        """
+        return self._get_fonts_by_name(
+            exact_name, self._exact_buckets_count, self._exact_buckets_offset, self._exact_entries_offset
+        )
+
+    def _get_fonts_by_name(self, name: str, buckets_count: int, buckets_offset: int, entries_offset: int) -> List[Font]:
+        if buckets_count == 0:
+            return []
+
+        encoded_name = name.encode("utf-8", "surrogatepass")
+        bucket_index = MappedFontIndex._hash_name(encoded_name) & (buckets_count - 1)
+        entries_start, entries_count = _BUCKET.unpack_from(self._mmap, buckets_offset + bucket_index * _BUCKET.size)
+
+        fonts: List[Font] = []
+        for entry_index in range(entries_start, entries_start + entries_count):
+            name_offset, name_length, record_index = _ENTRY.unpack_from(self._mmap, entries_offset + entry_index * _ENTRY.size)
+
+            if self._get_bytes(name_offset, name_length) == encoded_name:
+                fonts.append(self._get_font(record_index))
+
+        return fonts
+
+    def _get_font(self, record_index: int) -> Font:
+        (
+            file_index,
+            font_index,
+            weight,
+            italic,
+            coordinates_offset,
+            coordinates_length,
+            family_names_start,
+            family_names_count,
+            exact_names_start,
+            exact_names_count,
+            coverage_offset,
+            coverage_length,
+        ) = _RECORD.unpack_from(self._mmap, self._records_offset + record_index * _RECORD.size)
+
+        path_offset, path_length = _FILE.unpack_from(self._mmap, self._files_offset + file_index * _FILE.size)[:2]
+
+        return Font(
+            self._get_string(path_offset, path_length),
+            font_index,
+            self._get_names(family_names_start, family_names_count),
+            weight,
+            bool(italic),
+            self._get_names(exact_names_start, exact_names_count),
+            json.loads(self._get_string(coordinates_offset, coordinates_length)),
+            GlyphCoverage.from_bytes(self._get_bytes(coverage_offset, coverage_length)) if coverage_length > 0 else None,
+        )
+
+    def _get_names(self, start: int, count: int) -> List[str]:
+        return [
+            self._get_string(*_NAME_REF.unpack_from(self._mmap, self._name_refs_offset + name_ref_index * _NAME_REF.size))
+            for name_ref_index in range(start, start + count)
+        ]
+
+    def _get_bytes(self, offset: int, length: int) -> bytes:
+        start = self._strings_offset + offset
+        return self._mmap[start : start + length]
+
+    def _get_string(self, offset: int, length: int) -> str:
+        return self._get_bytes(offset, length).decode("utf-8", "surrogatepass")
+
+    @staticmethod
+    def _hash_name(encoded_name: bytes) -> int:
+        # The hash need to be the same between each execution, so we can't use hash()
+        return zlib.crc32(encoded_name)
+
+    @staticmethod
+    def build(index_path: Path, fonts: Iterable[Font], files_signature: Dict[str, FileSignature]) -> None:
+        """
+        Write a new index. The file is replaced atomically, so the process that have mapped the old index aren't affected.
+
+        Parameters:
+            index_path (Path): Path of the index.
+            fonts (Iterable[Font]): Fonts to index. Their filename need to be in files_signature.
+            files_signature (Dict[str, FileSignature]): Signature of the indexed files.
+                A file can be indexed without any font, so it is not parsed again until it change.
+        """
+        strings = bytearray()
+        strings_offset: Dict[bytes, Tuple[int, int]] = {}
+
+        def add_bytes(data: bytes) -> Tuple[int, int]:
+            if data not in strings_offset:
+                strings_offset[data] = (len(strings), len(data))
+                strings.extend(data)
+            return strings_offset[data]
+
+        def add_string(string: str) -> Tuple[int, int]:
+            return add_bytes(string.encode("utf-8", "surrogatepass"))
+
+        files_index: Dict[str, int] = {}
+        files = bytearray()
+        for filename, (size, mtime_ns, inode) in sorted(files_signature.items()):
+            files_index[filename] = len(files_index)
+            files.extend(_FILE.pack(*add_string(filename), size, mtime_ns, inode))
+
+        records = bytearray()
+        name_refs = bytearray()
+        name_refs_count = 0
+        family_entries: List[Tuple[str, int]] = []
+        exact_entries: List[Tuple[str, int]] = []
+
+        sorted_fonts = sorted(fonts, key=lambda font: (font.filename, font.font_index, sorted(font.named_instance_coordinates.items())))
+        for record_index, font in enumerate(sorted_fonts):
+            family_names = sorted(font.family_names)
+            exact_names = sorted(font.exact_names)
+
+            records.extend(
+                _RECORD.pack(
+                    files_index[font.filename],
+                    font.font_index,
+                    font.weight,
+                    font.italic,
+                    *add_string(json.dumps(font.named_instance_coordinates, sort_keys=True)),
+                    name_refs_count,
+                    len(family_names),
+                    name_refs_count + len(family_names),
+                    len(exact_names),
+                    *(add_bytes(font.coverage.to_bytes()) if font.coverage is not None else (0, 0)),
+                )
+            )
+
+            for name in family_names + exact_names:
+                name_refs.extend(_NAME_REF.pack(*add_string(name)))
+            name_refs_count += len(family_names) + len(exact_names)
+
+            family_entries.extend((name, record_index) for name in family_names)
+            exact_entries.extend((name, record_index) for name in exact_names)
+
+        family_buckets, family_entries_data, family_buckets_count = MappedFontIndex._build_hash_table(family_entries, add_string)
+        exact_buckets, exact_entries_data, exact_buckets_count = MappedFontIndex._build_hash_table(exact_entries, add_string)
+
+        sections = [strings, files, records, name_refs, family_buckets, family_entries_data, exact_buckets, exact_entries_data]
+        sections_offset: List[int] = []
+        offset = _HEADER.size
+        for section in sections:
+            sections_offset.append(offset)
+            offset += len(section)
+
+        header = _HEADER.pack(
+            MappedFontIndex.MAGIC,
+            MappedFontIndex.SCHEMA_VERSION,
+            len(files_index),
+            len(sorted_fonts),
+            name_refs_count,
+            family_buckets_count,
+            len(family_entries),
+            exact_buckets_count,
+            len(exact_entries),
+            *sections_offset,
+        )
+
+        file_descriptor, temporary_file = mkstemp(
+            prefix=f"{Path(index_path).name}.", suffix=".tmp", dir=os.path.dirname(index_path)
+        )
+
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(header)
+                for section in sections:
+                    file.write(section)
+            os.replace(temporary_file, index_path)
+        except BaseException:
+            if os.path.isfile(temporary_file):
+                os.remove(temporary_file)
+            raise
+
+    @staticmethod
+    def _build_hash_table(entries: List[Tuple[str, int]], add_string) -> Tuple[bytearray, bytearray, int]:
+        """
+        Parameters:
+            entries (List[Tuple[str, int]]): The name and the record index of each entry.
+            add_string: Function that add a string to the string table and return its offset and its length.
+        Returns:
+            The buckets, the entries sorted by bucket and the number of buckets.
+        """
+        buckets_count = 1
+        while buckets_count < len(entries):
+            buckets_count <<= 1
+
+        entries_by_bucket: List[List[Tuple[str, int]]] = [[] for _ in range(buckets_count)]
+        for name, record_index in entries:
+            bucket_index = MappedFontIndex._hash_name(name.encode("utf-8", "surrogatepass")) & (buckets_count - 1)
+            entries_by_bucket[bucket_index].append((name, record_index))
+
+        buckets = bytearray()
+        entries_data = bytearray()
+        entries_start = 0
+        for bucket_entries in entries_by_bucket:
+            buckets.extend(_BUCKET.pack(entries_start, len(bucket_entries)))
+            for name, record_index in bucket_entries:
+                entries_data.extend(_ENTRY.pack(*add_string(name), record_index))
+            entries_start += len(bucket_entries)
+
+        return buckets, entries_data, buckets_count
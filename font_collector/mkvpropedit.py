@@ -2,10 +2,12 @@ import logging
 import shutil
 import subprocess
 from .font import Font
+from .font_file import FontFile
 from .helpers import Helpers
-from os import getcwd, path
+from os import getcwd, makedirs, path
 from pathlib import Path
-from typing import Sequence
+from tempfile import TemporaryDirectory
+from typing import Dict, Sequence
 
 _logger = logging.getLogger(__name__)
 
@@ -111,18 +113,32 @@ class Mkvpropedit:
             f'"{mkv_filename}"',
         ]
 
-        font_paths = set()
-        for font in font_collection:
-            if font.is_var and convert_variable_font_into_truetype_collection:
-                # We take the first result, but it doesn't matter
-                font = Helpers.variable_font_to_collection(font.filename, getcwd())[0]
-
-            font_paths.add(f'--add-attachment "{font.filename}"')
-        mkvpropedit_args.extend(font_paths)
-
-        output = subprocess.run(
-            " ".join(mkvpropedit_args), capture_output=True, text=True
-        )
+        # mkvpropedit can only attach files, so the members of an archive are streamed to a temporary directory
+        with TemporaryDirectory() as archive_members_directory:
+            font_paths = set()
+            archive_members_paths: Dict[str, str] = {}
+            for font in font_collection:
+                if font.is_var and convert_variable_font_into_truetype_collection:
+                    # We take the first result, but it doesn't matter
+                    font = Helpers.variable_font_to_collection(font.filename, getcwd())[0]
+
+                font_path = font.filename
+                if FontFile.is_archive_member(font_path):
+                    if font.filename not in archive_members_paths:
+                        # Each member has its own directory, so the members with the same name don't overwrite each other
+                        # and they keep their name in the mkv
+                        member_directory = path.join(archive_members_directory, str(len(archive_members_paths)))
+                        makedirs(member_directory)
+                        archive_members_paths[font.filename] = path.join(member_directory, FontFile.get_name(font.filename))
+                        FontFile.copy(font.filename, archive_members_paths[font.filename])
+                    font_path = archive_members_paths[font.filename]
+
+                font_paths.add(f'--add-attachment "{font_path}"')
+            mkvpropedit_args.extend(font_paths)
+
+            output = subprocess.run(
+                " ".join(mkvpropedit_args), capture_output=True, text=True
+            )
 
         if len(output.stderr) == 0:
             _logger.info(f'Successfully merging fonts into mkv "{mkv_filename}')
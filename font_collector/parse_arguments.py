@@ -4,7 +4,7 @@ from .font_loader import FontLoader
 from .mkvpropedit import Mkvpropedit
 from argparse import ArgumentParser
 from pathlib import Path
-from typing import List, Set, Tuple, Union
+from typing import List, Optional, Set, Tuple, Union
 
 
 def _parse_input_file(ass_input: List[Path]) -> List[Path]:
@@ -31,6 +31,72 @@ def _parse_input_file(ass_input: List[Path]) -> List[Path]:
     return ass_files_path
 
 
+def _add_font_loader_arguments(parser: ArgumentParser) -> None:
+    """
+    Add the arguments used to create the FontLoader.
+    """
+    parser.add_argument(
+        "--additional-fonts",
+        nargs="+",
+        type=Path,
+        help="""
+    May be a directory containing font files, a .zip archive containing font files or a single font file. The subdirectories are also searched and the fonts of each directory or archive are cached. The archives don't need to be extracted. You can specify more than one additional-fonts.
+    """,
+    )
+    parser.add_argument(
+        "--exclude-system-fonts",
+        action="store_false",
+        help="""
+    If specified, FontCollector won't use the system font to find the font used by an .ass file.
+    """,
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="""
+    Number of process used to parse the fonts that aren't in the cache. By default, it is the number of CPU. If 1, the fonts are parsed in the main process.
+    """,
+    )
+    parser.add_argument(
+        "--use-font-index",
+        action="store_true",
+        help="""
+    If specified, the system fonts are cached in an index instead of being all loaded in memory. It is faster when a lot of fonts are installed.
+    """,
+    )
+    parser.add_argument(
+        "--font-index-format",
+        choices=["sqlite", "mmap"],
+        default="sqlite",
+        help="""
+    Format of the index used by --use-font-index. "sqlite" is updated incrementally. "mmap" is a read-only file that is memory-mapped, so the startup does not depend on the number of fonts, but it is rebuilt when a font is installed.
+    """,
+    )
+    parser.add_argument(
+        "--rescan-system-fonts",
+        action="store_true",
+        help="""
+    If specified, FontCollector will search the system fonts even if their directories have not changed since the last execution. Use it if a font has been installed in a new directory that is not one of the standard fonts directories of your platform.
+    """,
+    )
+    parser.add_argument(
+        "--lazy-system-fonts",
+        action="store_true",
+        help="""
+    If specified, the fonts are first searched in the additional fonts and the system fonts are only loaded if a font can't be found by its family name. An additional font is then used even if a system font has a closer weight or italic, but a font found by its family name is still preferred to a font found by its exact name.
+    """,
+    )
+    parser.add_argument(
+        "--parse-timeout",
+        type=float,
+        help="""
+    Maximum time, in seconds, to parse a font file. If specified, the fonts are parsed in separate processes, so a font that take too much time or that crash the parser does not stop FontCollector. These fonts are quarantined: they are skipped until they are modified. See "fontcollector index stats".
+    """,
+    )
+
+
 def parse_arguments() -> Tuple[
     List[Path],
     Path,
@@ -38,11 +104,19 @@ def parse_arguments() -> Tuple[
     bool,
     Set[Path],
     bool,
+    bool,
+    int,
+    bool,
+    str,
+    bool,
+    bool,
+    Optional[float],
+    Union[Path, None],
     bool
 ]:
     """
     Returns:
-        ass_files_path, output_directory, mkv_path, delete_fonts, additional_fonts, use_system_fonts
+        ass_files_path, output_directory, mkv_path, delete_fonts, additional_fonts, use_system_fonts, collect_draw_fonts, jobs, use_font_index, font_index_format, rescan_system_fonts, lazy_system_fonts, parse_timeout, socket_path, use_server
     """
     parser = ArgumentParser(
         description="FontCollector for Advanced SubStation Alpha file."
@@ -88,26 +162,26 @@ def parse_arguments() -> Tuple[
     If -d is specified, it will delete the font attached to the mkv before merging the new needed font. If -mkv is not specified, it will do nothing.
     """,
     )
+    _add_font_loader_arguments(parser)
     parser.add_argument(
-        "--additional-fonts",
-        nargs="+",
-        type=Path,
+        "--collect-draw-fonts",
+        action="store_true",
         help="""
-    May be a directory containing font files or a single font file. You can specify more than one additional-fonts.
+    If specified, FontCollector will collect the font used by the draw. For more detail when this is usefull, see: https://github.com/libass/libass/issues/617
     """,
     )
     parser.add_argument(
-        "--exclude-system-fonts",
-        action="store_false",
+        "--socket",
+        type=Path,
         help="""
-    If specified, FontCollector won't use the system font to find the font used by an .ass file.
+    Path of the Unix domain socket of the FontCollector server. If the server is running (see "fontcollector serve --help") and has been started with the same --additional-fonts, --exclude-system-fonts and --lazy-system-fonts, the fonts are resolved by the server.
     """,
     )
     parser.add_argument(
-        "--collect-draw-fonts",
+        "--no-server",
         action="store_true",
         help="""
-    If specified, FontCollector will collect the font used by the draw. For more detail when this is usefull, see: https://github.com/libass/libass/issues/617
+    If specified, FontCollector won't use the FontCollector server even if it is running.
     """,
     )
 
@@ -132,6 +206,14 @@ def parse_arguments() -> Tuple[
 
     use_system_fonts = args.exclude_system_fonts
     collect_draw_fonts = args.collect_draw_fonts
+    jobs = args.jobs
+    use_font_index = args.use_font_index
+    font_index_format = args.font_index_format
+    rescan_system_fonts = args.rescan_system_fonts
+    lazy_system_fonts = args.lazy_system_fonts
+    parse_timeout = args.parse_timeout
+    socket_path = args.socket
+    use_server = not args.no_server
 
     return (
         ass_files_path,
@@ -140,5 +222,158 @@ def parse_arguments() -> Tuple[
         delete_fonts,
         additional_fonts,
         use_system_fonts,
-        collect_draw_fonts
+        collect_draw_fonts,
+        jobs,
+        use_font_index,
+        font_index_format,
+        rescan_system_fonts,
+        lazy_system_fonts,
+        parse_timeout,
+        socket_path,
+        use_server
+    )
+
+
+def parse_serve_arguments(arguments: List[str]) -> Tuple[
+    Set[Path],
+    bool,
+    int,
+    bool,
+    str,
+    bool,
+    bool,
+    Optional[float],
+    Union[Path, None]
+]:
+    """
+    Parameters:
+        arguments (List[str]): The arguments after "serve"
+    Returns:
+        additional_fonts, use_system_fonts, jobs, use_font_index, font_index_format, rescan_system_fonts, lazy_system_fonts, parse_timeout, socket_path
+    """
+    parser = ArgumentParser(
+        prog="fontcollector serve",
+        description="Keep the fonts loaded in memory and resolve the fonts for the fontcollector command.",
+    )
+    _add_font_loader_arguments(parser)
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        help="""
+    Path of the Unix domain socket where the server will listen. By default, it is in a directory that only the current user can access, in $XDG_RUNTIME_DIR or in the temporary directory.
+    """,
+    )
+
+    args = parser.parse_args(arguments)
+
+    if args.additional_fonts is not None:
+        additional_fonts = args.additional_fonts
+    else:
+        additional_fonts = set()
+
+    return (
+        additional_fonts,
+        args.exclude_system_fonts,
+        args.jobs,
+        args.use_font_index,
+        args.font_index_format,
+        args.rescan_system_fonts,
+        args.lazy_system_fonts,
+        args.parse_timeout,
+        args.socket
+    )
+
+
+def parse_index_arguments(arguments: List[str]) -> Tuple[
+    str,
+    Set[Path],
+    bool,
+    int,
+    bool,
+    str,
+    Optional[float]
+]:
+    """
+    Parameters:
+        arguments (List[str]): The arguments after "index"
+    Returns:
+        action, additional_fonts, use_system_fonts, jobs, use_font_index, font_index_format, parse_timeout
+    """
+    parser = ArgumentParser(
+        prog="fontcollector index",
+        description="Manage the cache of the fonts.",
+    )
+    parser.add_argument(
+        "action",
+        choices=["build", "refresh", "stats", "verify", "clear"],
+        help="""
+    build: Delete the cache, then parse all the fonts again.
+    refresh: Only parse the fonts added or modified since the cache has been updated.
+    stats: Show the number of fonts, the size of the cache and the quarantined fonts.
+    verify: Check if the cached files have been modified or deleted since they have been parsed.
+    clear: Delete the cache and the list of the quarantined fonts.
+    """,
+    )
+    parser.add_argument(
+        "--additional-fonts",
+        nargs="+",
+        type=Path,
+        help="""
+    Directories or .zip archives containing font files. Their cache is also managed. You can specify more than one additional-fonts.
+    """,
+    )
+    parser.add_argument(
+        "--exclude-system-fonts",
+        action="store_false",
+        help="""
+    If specified, the cache of the system fonts won't be managed.
+    """,
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="""
+    Number of process used to parse the fonts. By default, it is the number of CPU.
+    """,
+    )
+    parser.add_argument(
+        "--use-font-index",
+        action="store_true",
+        help="""
+    If specified, manage the index of the system fonts instead of their cache.
+    """,
+    )
+    parser.add_argument(
+        "--font-index-format",
+        choices=["sqlite", "mmap"],
+        default="sqlite",
+        help="""
+    Format of the index used by --use-font-index.
+    """,
+    )
+    parser.add_argument(
+        "--parse-timeout",
+        type=float,
+        help="""
+    Maximum time, in seconds, to parse a font file. The fonts that take too much time or that crash the parser are quarantined.
+    """,
+    )
+
+    args = parser.parse_args(arguments)
+
+    if args.additional_fonts is not None:
+        additional_fonts = args.additional_fonts
+    else:
+        additional_fonts = set()
+
+    return (
+        args.action,
+        additional_fonts,
+        args.exclude_system_fonts,
+        args.jobs,
+        args.use_font_index,
+        args.font_index_format,
+        args.parse_timeout
     )
@@ -0,0 +1,10 @@
+import pytest
+import tempfile
+
+
+@pytest.fixture(autouse=True)
+def temporary_directory(tmp_path_factory, monkeypatch):
+    # The caches, their locks and the quarantine are saved in the temporary directory.
+    # Each test has its own, so the tests never read or delete the caches of the user.
+    # It isn't tmp_path, since some tests watch the modification time of tmp_path.
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path_factory.mktemp("tempdir")))
@@ -1,6 +1,10 @@
+import copyreg
 import os
+import pickle
+import pytest
 import string
 from font_collector import Font
+from fontTools.ttLib.ttFont import TTFont
 
 dir_path = os.path.dirname(os.path.realpath(__file__))
 font_without_os2_table = os.path.join(dir_path, "fonts", "font_mac.TTF")
@@ -111,6 +115,23 @@ def test_font_get_missing_glyphs_cmap_encoding_mac_platform():
     assert missing_glyphs == set(["@", "¸", "~"])
 
 
+def test_font_get_missing_glyphs_coverage_same_as_freetype():
+    text = [chr(codepoint) for codepoint in range(0x20, 0x600)] + list("ｦ&*🇦🤍")
+
+    for font_name in ["font_cmap_encoding_0.ttf", "font_cmap_encoding_2.TTF", "font_mac.TTF"]:
+        font = Font.from_font_path(os.path.join(dir_path, "fonts", font_name))[0]
+        assert font.coverage is not None
+
+        # Without coverage, the glyphs are searched with freetype
+        font_without_coverage = Font(font.filename, font.font_index, font.family_names, font.weight, font.italic, font.exact_names)
+        assert font_without_coverage.coverage is None
+
+        for support_only_ascii_char_for_symbol_font in (False, True):
+            assert font.get_missing_glyphs(text, support_only_ascii_char_for_symbol_font) == font_without_coverage.get_missing_glyphs(
+                text, support_only_ascii_char_for_symbol_font
+            )
+
+
 def test_variable_font_with_invalid_fvar_axes():
 
     font_path = os.path.join(dir_path, "variable font tests", "Test #1", "Test #1.ttf")
@@ -358,3 +379,74 @@ def test_variable_font_duplicate_font_face():
     ]
 
     assert fonts == expected_fonts
+
+
+def test_font_is_immutable():
+    font = Font(font_without_os2_table, 0, ["Brushstroke Plain"], 400, False, [])
+
+    with pytest.raises(AttributeError):
+        font.weight = 700
+    assert font.weight == 400
+    assert isinstance(font.family_names, frozenset)
+    assert not hasattr(font, "__dict__")
+
+
+def test_font_pickle():
+    variable_font = Font("font.ttf", 1, ["Alegreya"], 700, True, ["Alegreya Bold Italic"], {"wght": 700.0})
+    font = Font("font.ttf", 0, ["Alegreya"], 400, False, ["Alegreya Regular"])
+
+    for original_font in (variable_font, font):
+        unpickled_font = pickle.loads(pickle.dumps(original_font))
+        assert unpickled_font == original_font
+        assert hash(unpickled_font) == hash(original_font)
+        assert unpickled_font.named_instance_coordinates == original_font.named_instance_coordinates
+
+    parsed_font = Font.from_font_path(font_without_os2_table)[0]
+    assert parsed_font.coverage is not None
+    assert pickle.loads(pickle.dumps(parsed_font)).coverage == parsed_font.coverage
+    # The names are interned
+    assert next(iter(pickle.loads(pickle.dumps(font)).family_names)) is next(iter(font.family_names))
+
+
+class _LegacyFont:
+    # How the Font were pickled before they had __slots__
+    def __init__(self, state):
+        self.state = state
+
+    def __reduce__(self):
+        return (copyreg._reconstructor, (Font, object, None), self.state)
+
+
+def test_font_unpickle_legacy_cache():
+    legacy_font = _LegacyFont(
+        {
+            "filename": "font.ttf",
+            "font_index": 0,
+            "_Font__family_names": {"alegreya"},
+            "weight": 400,
+            "italic": False,
+            "_Font__exact_names": {"alegreya regular"},
+            "named_instance_coordinates": {},
+        }
+    )
+
+    font = pickle.loads(pickle.dumps(legacy_font))
+    assert font == Font("font.ttf", 0, ["Alegreya"], 400, False, ["Alegreya Regular"])
+    assert hash(font) == hash(Font("font.ttf", 0, ["Alegreya"], 400, False, ["Alegreya Regular"]))
+
+
+def test_font_from_font_path_only_read_the_identification_tables(monkeypatch):
+    read_tables = set()
+    read_table = TTFont._readTable
+
+    def record_read_table(self, tag):
+        read_tables.add(tag)
+        return read_table(self, tag)
+
+    monkeypatch.setattr(TTFont, "_readTable", record_read_table)
+
+    Font.from_font_path(os.path.join(dir_path, "fonts", "font_cmap_encoding_2.TTF"))
+    Font.from_font_path(os.path.join(dir_path, "fonts", "Asap-VariableFont_wdth,wght.ttf"))
+
+    assert "name" in read_tables
+    assert read_tables.issubset({"name", "OS/2", "fvar", "STAT"})
@@ -0,0 +1,605 @@
+import os
+import pickle
+import pytest
+import shutil
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from font_collector import font_loader, AssStyle, Font, FontFile, FontLoader, Helpers
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+raleway_dir = os.path.join(dir_path, "fonts", "Raleway")
+
+
+def test_load_fonts_from_paths_with_multiple_jobs():
+    fonts_paths = [
+        os.path.join(raleway_dir, file)
+        for file in os.listdir(raleway_dir)
+        if file.endswith(".ttf")
+    ]
+
+    serial_fonts = FontLoader.load_fonts_from_paths(fonts_paths, 1)
+    parallel_fonts = FontLoader.load_fonts_from_paths(fonts_paths, 4)
+
+    assert len(serial_fonts) == len(fonts_paths)
+    assert [font.filename for font in parallel_fonts] == [
+        font.filename for font in serial_fonts
+    ]
+    assert parallel_fonts == serial_fonts
+
+
+def test_load_system_fonts_reparse_modified_font(tmp_path, monkeypatch):
+    font_path = str(tmp_path / "font.ttf")
+    cache_file = tmp_path / "FontCollector_SystemFont.bin"
+    monkeypatch.setattr(font_loader, "get_system_fonts_filename", lambda: {font_path})
+    monkeypatch.setattr(FontLoader, "get_system_font_directories_cache_file_path", lambda: tmp_path / "FontCollector_SystemFontDirectories.bin")
+    monkeypatch.setattr(FontLoader, "get_system_font_cache_file_path", lambda directory: cache_file)
+
+    shutil.copyfile(os.path.join(raleway_dir, "Raleway-Regular.ttf"), font_path)
+    fonts = FontLoader.load_system_fonts()
+    assert [font.weight for font in fonts] == [400]
+
+    # Replace the font in place. The cache must not return the old font.
+    shutil.copyfile(os.path.join(raleway_dir, "Raleway-Black.ttf"), font_path)
+    fonts = FontLoader.load_system_fonts()
+    assert [font.weight for font in fonts] == [900]
+
+    cached_fonts, files_signature = FontLoader.load_font_cache_file(cache_file)
+    assert cached_fonts == fonts
+    assert files_signature == {font_path: FontLoader.get_file_signature(font_path)}
+
+
+def test_load_system_font_index(tmp_path, monkeypatch):
+    fonts_paths = set(
+        os.path.join(raleway_dir, file)
+        for file in os.listdir(raleway_dir)
+        if file.endswith(".ttf")
+    )
+    monkeypatch.setattr(font_loader, "get_system_fonts_filename", lambda: fonts_paths)
+    monkeypatch.setattr(FontLoader, "get_system_font_directories_cache_file_path", lambda: tmp_path / "FontCollector_SystemFontDirectories.bin")
+    monkeypatch.setattr(FontLoader, "get_system_font_index_file_path", lambda: tmp_path / "FontCollector_SystemFont.db")
+
+    expected_fonts = set(FontLoader.load_fonts_from_paths(fonts_paths))
+
+    with FontLoader.load_system_font_index() as font_index:
+        assert font_index.fonts == expected_fonts
+        assert set(font_index.files_signature) == fonts_paths
+
+        assert set(font_index.get_fonts_by_family_name("raleway")) == set(
+            font for font in expected_fonts if "raleway" in font.family_names
+        )
+        assert font_index.get_fonts_by_exact_name("raleway black") == [
+            font for font in expected_fonts if "raleway black" in font.exact_names
+        ]
+
+    # Uninstall one font. Only this file must be removed from the index.
+    removed_path = os.path.join(raleway_dir, "Raleway-Thin.ttf")
+    fonts_paths.remove(removed_path)
+
+    with FontLoader.load_system_font_index(force_enumeration=True) as font_index:
+        assert font_index.fonts == set(
+            font for font in expected_fonts if font.filename != removed_path
+        )
+
+
+def test_fonts_is_rebuilt_only_when_generation_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(FontLoader, "get_generated_font_cache_file_path", lambda: tmp_path / "FontCollector_GeneratedFont.bin")
+
+    font_loader = FontLoader([os.path.join(raleway_dir, "Raleway-Regular.ttf")], False)
+    fonts = font_loader.fonts
+    assert len(fonts) == 1
+    assert font_loader.fonts is fonts
+
+    font_loader.add_additional_font(os.path.join(raleway_dir, "Raleway-Bold.ttf"))
+    assert len(font_loader.fonts) == 2
+
+    generated_font = FontLoader.load_fonts_from_paths([os.path.join(raleway_dir, "Raleway-Black.ttf")])[0]
+    FontLoader.add_generated_font(generated_font)
+    assert generated_font in font_loader.fonts
+
+    FontLoader.discard_generated_font_cache()
+    assert generated_font not in font_loader.fonts
+
+
+def test_fonts_see_the_generated_fonts_changed_by_another_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(FontLoader, "get_generated_font_cache_file_path", lambda: tmp_path / "FontCollector_GeneratedFont.bin")
+
+    font_loader = FontLoader([os.path.join(raleway_dir, "Raleway-Regular.ttf")], False)
+    assert len(font_loader.fonts) == 1
+
+    generated_font_path = tmp_path / "Raleway-Black.ttf"
+    shutil.copy(os.path.join(raleway_dir, "Raleway-Black.ttf"), generated_font_path)
+    generated_font = FontLoader.load_fonts_from_paths([str(generated_font_path)])[0]
+
+    # Another process does not increment the generation of this process
+    generation = FontLoader.generation
+    FontLoader.save_font_cache_file(FontLoader.get_generated_font_cache_file_path(), {generated_font})
+    assert FontLoader.generation == generation
+    assert generated_font in font_loader.fonts
+
+    # The snapshot is only checked with the generation and the signature of the cache, not with the files of the fonts
+    isfile_calls = []
+    isfile = os.path.isfile
+    with monkeypatch.context() as patch:
+        patch.setattr(os.path, "isfile", lambda path: isfile_calls.append(path) or isfile(path))
+        font_loader.fonts
+        font_loader.get_fonts_by_family_name("raleway")
+    assert isfile_calls == []
+
+    # The generated font file has been deleted by another process. It is detected when the font is about to be used.
+    os.remove(generated_font_path)
+    assert Helpers.get_used_font_by_style(font_loader, AssStyle("Raleway Black", 900, False)) is None
+    assert generated_font not in font_loader.fonts
+
+
+def test_font_loader_shared_between_threads(tmp_path, monkeypatch):
+    monkeypatch.setattr(FontLoader, "get_generated_font_cache_file_path", lambda: tmp_path / "FontCollector_GeneratedFont.bin")
+    fonts_paths = sorted(
+        os.path.join(raleway_dir, file) for file in os.listdir(raleway_dir) if file.endswith(".ttf")
+    )
+    regular_path = os.path.join(raleway_dir, "Raleway-Regular.ttf")
+    fonts_paths.remove(regular_path)
+
+    font_loader = FontLoader([regular_path], False)
+    stop_reading = threading.Event()
+
+    def read_fonts():
+        while not stop_reading.is_set():
+            # A snapshot is never modified while it is iterated
+            for font in font_loader.fonts:
+                assert font.filename == regular_path or font.filename in fonts_paths
+            assert len(font_loader.get_fonts_by_family_name("raleway")) >= 1
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        readers = [executor.submit(read_fonts) for _ in range(4)]
+        list(executor.map(font_loader.add_additional_font, fonts_paths))
+        stop_reading.set()
+
+        for reader in readers:
+            reader.result()
+
+    assert set(font.filename for font in font_loader.fonts) == set(fonts_paths + [regular_path])
+
+
+def test_add_generated_fonts_from_multiple_threads(tmp_path, monkeypatch):
+    monkeypatch.setattr(FontLoader, "get_generated_font_cache_file_path", lambda: tmp_path / "FontCollector_GeneratedFont.bin")
+    fonts = FontLoader.load_fonts_from_paths(
+        os.path.join(raleway_dir, file) for file in os.listdir(raleway_dir) if file.endswith(".ttf")
+    )
+
+    # Each thread load, then save the cache. No font must be lost.
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(FontLoader.add_generated_font, fonts))
+
+    assert FontLoader.load_generated_fonts() == set(fonts)
+
+
+from_font_path = Font.from_font_path
+
+
+def pathological_from_font_path(font_path):
+    if os.path.basename(font_path) == "slow.ttf":
+        time.sleep(60)
+    elif os.path.basename(font_path) == "crash.ttf":
+        os._exit(1)
+    return from_font_path(font_path)
+
+
+def test_load_fonts_from_paths_quarantine_font_that_timeout_or_crash(tmp_path, monkeypatch):
+    monkeypatch.setattr(FontLoader, "get_quarantine_file_path", lambda: tmp_path / "FontCollector_Quarantine.bin")
+    regular_path = os.path.join(raleway_dir, "Raleway-Regular.ttf")
+    slow_path = str(tmp_path / "slow.ttf")
+    crash_path = str(tmp_path / "crash.ttf")
+    shutil.copy(os.path.join(raleway_dir, "Raleway-Bold.ttf"), slow_path)
+    shutil.copy(os.path.join(raleway_dir, "Raleway-Black.ttf"), crash_path)
+
+    # The patched method is sent to the workers, so it need to be importable by a spawned worker
+    monkeypatch.setattr(Font, "from_font_path", pathological_from_font_path)
+
+    fonts = FontLoader.load_fonts_from_paths([regular_path, slow_path, crash_path], 2, parse_timeout=1)
+    assert [font.filename for font in fonts] == [regular_path]
+
+    quarantined_files = FontLoader.load_quarantined_files()
+    assert sorted(quarantined_files) == sorted([slow_path, crash_path])
+    assert "took more than" in quarantined_files[slow_path][1]
+    assert "crashed" in quarantined_files[crash_path][1]
+
+    # The quarantined files are skipped, even without isolation
+    assert FontLoader.load_fonts_from_paths([regular_path, slow_path, crash_path]) == fonts
+
+    # Until they are modified
+    monkeypatch.setattr(Font, "from_font_path", from_font_path)
+    os.utime(crash_path, ns=(0, 0))
+    fonts = FontLoader.load_fonts_from_paths([regular_path, slow_path, crash_path], parse_timeout=10)
+    assert [font.filename for font in fonts] == sorted([regular_path, crash_path])
+    assert list(FontLoader.load_quarantined_files()) == [slow_path]
+
+
+def test_save_index_build(tmp_path, monkeypatch):
+    monkeypatch.setattr(FontLoader, "get_index_builds_file_path", lambda: tmp_path / "FontCollector_IndexBuilds.bin")
+    assert FontLoader.load_index_builds() == {}
+
+    system_sources = ((), True, None)
+    additional_sources = ((str(tmp_path),), False, None)
+    FontLoader.save_index_build(system_sources, "build", 1000.0, 12.5)
+    FontLoader.save_index_build(additional_sources, "build", 1000.0, 1.5)
+    FontLoader.save_index_build(system_sources, "refresh", 2000.0, 0.5)
+    assert FontLoader.load_index_builds() == {
+        system_sources: ("refresh", 2000.0, 0.5),
+        additional_sources: ("build", 1000.0, 1.5),
+    }
+
+    # The build of cleared sources is forgotten
+    FontLoader.save_index_build(additional_sources, None)
+    assert FontLoader.load_index_builds() == {system_sources: ("refresh", 2000.0, 0.5)}
+
+
+def test_save_font_cache_file_is_atomic(tmp_path):
+    cache_file = tmp_path / "cache.bin"
+    fonts = set(FontLoader.load_fonts_from_paths([os.path.join(raleway_dir, "Raleway-Regular.ttf")]))
+
+    with FontLoader.get_cache_lock(cache_file):
+        FontLoader.save_font_cache_file(cache_file, fonts)
+        FontLoader.save_font_cache_file(cache_file, fonts)
+
+    # Only the cache and its lock must remain, no temporary file
+    assert sorted(os.listdir(tmp_path)) == ["cache.bin", "cache.bin.lock"]
+    assert FontLoader.load_font_cache_file(cache_file) == (fonts, {})
+
+
+def test_load_font_cache_file_migrate_old_schema(tmp_path, monkeypatch):
+    cache_file = tmp_path / "cache.bin"
+    regular, bold = FontLoader.load_fonts_from_paths(
+        [os.path.join(raleway_dir, "Raleway-Regular.ttf"), os.path.join(raleway_dir, "Raleway-Bold.ttf")]
+    )
+    FontLoader.save_font_cache_file(cache_file, {regular, bold})
+
+    def migration(font):
+        if font.weight == 700:
+            return None
+        return Font(font.filename, font.font_index, font.family_names, 450, font.italic, font.exact_names)
+
+    monkeypatch.setattr(FontLoader, "CACHE_SCHEMA_VERSION", FontLoader.CACHE_SCHEMA_VERSION + 1)
+    monkeypatch.setattr(FontLoader, "CACHE_MIGRATIONS", {FontLoader.CACHE_SCHEMA_VERSION - 1: migration})
+
+    cached_fonts, _ = FontLoader.load_font_cache_file(cache_file)
+    assert [font.weight for font in cached_fonts] == [450]
+
+    # Without migration, the cache can't be used
+    monkeypatch.setattr(FontLoader, "CACHE_MIGRATIONS", {})
+    assert FontLoader.load_font_cache_file(cache_file) == (set(), {})
+
+
+def test_load_cached_fonts_save_the_migrated_cache(tmp_path, monkeypatch):
+    cache_file = tmp_path / "cache.bin"
+    fonts_paths = {os.path.join(raleway_dir, "Raleway-Regular.ttf")}
+    fonts = FontLoader.load_cached_fonts(cache_file, fonts_paths)
+
+    def migration(font):
+        return Font(font.filename, font.font_index, font.family_names, font.weight, font.italic, font.exact_names, coverage=font.coverage)
+
+    monkeypatch.setattr(FontLoader, "CACHE_SCHEMA_VERSION", FontLoader.CACHE_SCHEMA_VERSION + 1)
+    monkeypatch.setattr(FontLoader, "CACHE_MIGRATIONS", {FontLoader.CACHE_SCHEMA_VERSION - 1: migration})
+
+    # No font changed, but the cache is saved with the new schema version, so it isn't migrated again
+    assert FontLoader.load_cached_fonts(cache_file, fonts_paths) == fonts
+    with open(cache_file, "rb") as file:
+        assert pickle.load(file)[0] == FontLoader.CACHE_SCHEMA_VERSION
+
+    monkeypatch.setattr(FontLoader, "CACHE_MIGRATIONS", {})
+    assert FontLoader.load_font_cache_file(cache_file)[0] == fonts
+
+
+def test_get_fonts_paths_in_directory_skip_unreadable_subdirectory(tmp_path, monkeypatch):
+    fonts_dir = tmp_path / "fonts"
+    os.makedirs(fonts_dir / "unreadable")
+    shutil.copyfile(os.path.join(raleway_dir, "Raleway-Regular.ttf"), fonts_dir / "Raleway-Regular.ttf")
+    shutil.copyfile(os.path.join(raleway_dir, "Raleway-Bold.ttf"), fonts_dir / "unreadable" / "Raleway-Bold.ttf")
+
+    # The permissions aren't enforced for root, so the error is simulated
+    scandir = os.scandir
+
+    def scandir_without_permission(path):
+        if os.path.basename(path) == "unreadable":
+            raise PermissionError(f"Permission denied: '{path}'")
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", scandir_without_permission)
+
+    assert FontLoader.get_fonts_paths_in_directory(fonts_dir) == {os.path.join(fonts_dir, "Raleway-Regular.ttf")}
+    # Only the directory itself must be readable
+    with pytest.raises(PermissionError):
+        FontLoader.get_fonts_paths_in_directory(fonts_dir / "unreadable")
+
+
+def test_load_additional_fonts_from_nested_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(FontLoader, "get_additional_font_cache_file_path", lambda directory: tmp_path / "cache.bin")
+    fonts_dir = tmp_path / "fonts"
+    os.makedirs(fonts_dir / "nested")
+    shutil.copyfile(os.path.join(raleway_dir, "Raleway-Regular.ttf"), fonts_dir / "Raleway-Regular.ttf")
+    shutil.copyfile(os.path.join(raleway_dir, "Raleway-Bold.ttf"), fonts_dir / "nested" / "Raleway-Bold.TTF")
+    shutil.copyfile(os.path.join(dir_path, "ass", "Style test.ass"), fonts_dir / "nested" / "Style test.ass")
+
+    assert FontLoader.get_fonts_paths_in_directory(fonts_dir) == {
+        os.path.join(fonts_dir, "Raleway-Regular.ttf"),
+        os.path.join(fonts_dir, "nested", "Raleway-Bold.TTF"),
+    }
+
+    fonts = FontLoader.load_additional_fonts([fonts_dir])
+    assert sorted(font.weight for font in fonts) == [400, 700]
+    assert os.path.isfile(tmp_path / "cache.bin")
+
+    # The cache must follow the removed and modified files
+    os.remove(fonts_dir / "Raleway-Regular.ttf")
+    shutil.copyfile(os.path.join(raleway_dir, "Raleway-Black.ttf"), fonts_dir / "nested" / "Raleway-Bold.TTF")
+    fonts = FontLoader.load_additional_fonts([fonts_dir])
+    assert [font.weight for font in fonts] == [900]
+    assert FontLoader.load_font_cache_file(tmp_path / "cache.bin")[0] == fonts
+
+
+def test_load_system_mapped_font_index(tmp_path, monkeypatch):
+    fonts_paths = set(
+        os.path.join(raleway_dir, file)
+        for file in os.listdir(raleway_dir)
+        if file.endswith(".ttf")
+    )
+    monkeypatch.setattr(font_loader, "get_system_fonts_filename", lambda: fonts_paths)
+    monkeypatch.setattr(FontLoader, "get_system_font_directories_cache_file_path", lambda: tmp_path / "FontCollector_SystemFontDirectories.bin")
+    monkeypatch.setattr(FontLoader, "get_system_mapped_font_index_file_path", lambda: tmp_path / "FontCollector_SystemFont.idx")
+
+    expected_fonts = set(FontLoader.load_fonts_from_paths(fonts_paths))
+
+    with FontLoader.load_system_mapped_font_index() as font_index:
+        assert font_index.fonts == expected_fonts
+
+    removed_path = os.path.join(raleway_dir, "Raleway-Thin.ttf")
+    fonts_paths.remove(removed_path)
+
+    with FontLoader.load_system_mapped_font_index(force_enumeration=True) as font_index:
+        assert set(font_index.files_signature) == fonts_paths
+        assert font_index.fonts == set(
+            font for font in expected_fonts if font.filename != removed_path
+        )
+
+
+def test_load_cached_fonts_does_not_parse_rejected_file_again(tmp_path, monkeypatch):
+    cache_file = tmp_path / "cache.bin"
+    font_path = str(tmp_path / "font.ttf")
+    rejected_path = str(tmp_path / "rejected.ttf")
+    shutil.copyfile(os.path.join(raleway_dir, "Raleway-Regular.ttf"), font_path)
+    shutil.copyfile(os.path.join(raleway_dir, "Raleway-Bold.ttf"), rejected_path)
+
+    parsed_paths = []
+    from_font_path = Font.from_font_path
+
+    def reject_font(font_path):
+        parsed_paths.append(font_path)
+        if font_path == rejected_path:
+            return []
+        return from_font_path(font_path)
+
+    monkeypatch.setattr(Font, "from_font_path", reject_font)
+
+    fonts = FontLoader.load_cached_fonts(cache_file, {font_path, rejected_path})
+    assert [font.filename for font in fonts] == [font_path]
+    assert sorted(parsed_paths) == sorted([font_path, rejected_path])
+
+    # The rejected file is in the cache, so nothing is parsed and the cache isn't rewritten
+    parsed_paths.clear()
+    cache_mtime = os.stat(cache_file).st_mtime_ns
+    assert FontLoader.load_cached_fonts(cache_file, {font_path, rejected_path}) == fonts
+    assert parsed_paths == []
+    assert os.stat(cache_file).st_mtime_ns == cache_mtime
+
+    # Until it change
+    shutil.copyfile(os.path.join(raleway_dir, "Raleway-Black.ttf"), rejected_path)
+    FontLoader.load_cached_fonts(cache_file, {font_path, rejected_path})
+    assert parsed_paths == [rejected_path]
+
+
+def test_load_system_fonts_only_rewrite_changed_shard(tmp_path, monkeypatch):
+    fonts_paths = set()
+    for directory, font_name in [("a", "Raleway-Regular.ttf"), ("b", "Raleway-Bold.ttf")]:
+        os.makedirs(tmp_path / directory)
+        shutil.copyfile(os.path.join(raleway_dir, font_name), tmp_path / directory / font_name)
+        fonts_paths.add(str(tmp_path / directory / font_name))
+
+    monkeypatch.setattr(font_loader, "get_system_fonts_filename", lambda: fonts_paths)
+    monkeypatch.setattr(FontLoader, "get_system_font_directories_cache_file_path", lambda: tmp_path / "FontCollector_SystemFontDirectories.bin")
+    monkeypatch.setattr(
+        FontLoader, "get_system_font_cache_file_path", lambda directory: tmp_path / f"{os.path.basename(directory)}.bin"
+    )
+
+    fonts = FontLoader.load_system_fonts()
+    assert sorted(font.weight for font in fonts) == [400, 700]
+    assert FontLoader.load_font_cache_file(tmp_path / "a.bin")[0] == set(font for font in fonts if font.weight == 400)
+
+    # Install a font in the directory "b". The shard of "a" must not be rewritten.
+    shard_a_mtime = os.stat(tmp_path / "a.bin").st_mtime_ns
+    shutil.copyfile(os.path.join(raleway_dir, "Raleway-Black.ttf"), tmp_path / "b" / "Raleway-Black.ttf")
+    fonts_paths.add(str(tmp_path / "b" / "Raleway-Black.ttf"))
+
+    fonts = FontLoader.load_system_fonts()
+    assert sorted(font.weight for font in fonts) == [400, 700, 900]
+    assert os.stat(tmp_path / "a.bin").st_mtime_ns == shard_a_mtime
+    assert len(FontLoader.load_font_cache_file(tmp_path / "b.bin")[0]) == 2
+
+
+def test_load_system_fonts_remove_the_shard_of_a_removed_directory(tmp_path, monkeypatch):
+    fonts_paths = set()
+    for directory, font_name in [("a", "Raleway-Regular.ttf"), ("b", "Raleway-Bold.ttf")]:
+        os.makedirs(tmp_path / directory)
+        shutil.copyfile(os.path.join(raleway_dir, font_name), tmp_path / directory / font_name)
+        fonts_paths.add(str(tmp_path / directory / font_name))
+
+    monkeypatch.setattr(font_loader, "get_system_fonts_filename", lambda: fonts_paths)
+    monkeypatch.setattr(FontLoader, "get_system_font_directories_cache_file_path", lambda: tmp_path / "FontCollector_SystemFontDirectories.bin")
+    monkeypatch.setattr(
+        FontLoader,
+        "get_system_font_cache_file_path",
+        lambda directory: tmp_path / f"FontCollector_SystemFont_{os.path.basename(directory)}.bin",
+    )
+    monkeypatch.setattr(
+        FontLoader, "get_system_font_cache_files_paths", lambda: sorted(tmp_path.glob("FontCollector_SystemFont_*.bin"))
+    )
+
+    FontLoader.load_system_fonts()
+    assert len(FontLoader.read_system_font_cache()[2]) == 2
+
+    shutil.rmtree(tmp_path / "b")
+    fonts_paths.remove(str(tmp_path / "b" / "Raleway-Bold.ttf"))
+
+    fonts = FontLoader.load_system_fonts()
+    assert [font.weight for font in fonts] == [400]
+    assert FontLoader.read_system_font_cache() == (
+        fonts,
+        {str(tmp_path / "a" / "Raleway-Regular.ttf"): FontLoader.get_file_signature(str(tmp_path / "a" / "Raleway-Regular.ttf"))},
+        [tmp_path / "FontCollector_SystemFont_a.bin"],
+    )
+
+
+def test_get_system_fonts_paths_skip_enumeration_when_directories_unchanged(tmp_path, monkeypatch):
+    fonts_dir = tmp_path / "fonts"
+    os.makedirs(fonts_dir)
+    # The cache must not be in a directory that contains the fonts, otherwise saving it would change the directory
+    os.makedirs(tmp_path / "cache")
+    font_path = str(fonts_dir / "Raleway-Regular.ttf")
+    shutil.copyfile(os.path.join(raleway_dir, "Raleway-Regular.ttf"), font_path)
+
+    enumerations = []
+
+    def get_system_fonts_filename():
+        enumerations.append(True)
+        return set(str(fonts_dir / file) for file in os.listdir(fonts_dir))
+
+    monkeypatch.setattr(font_loader, "get_system_fonts_filename", get_system_fonts_filename)
+    monkeypatch.setattr(FontLoader, "get_system_font_directories_cache_file_path", lambda: tmp_path / "cache" / "FontCollector_SystemFontDirectories.bin")
+
+    assert FontLoader.get_system_fonts_paths() == {font_path}
+    assert FontLoader.get_system_fonts_paths() == {font_path}
+    assert len(enumerations) == 1
+
+    # The switch always enumerate the fonts
+    assert FontLoader.get_system_fonts_paths(force_enumeration=True) == {font_path}
+    assert len(enumerations) == 2
+
+    # Installing a font change the modification time of its directory
+    bold_path = str(fonts_dir / "Raleway-Bold.ttf")
+    shutil.copyfile(os.path.join(raleway_dir, "Raleway-Bold.ttf"), bold_path)
+    os.utime(fonts_dir, ns=(0, 0))
+    assert FontLoader.get_system_fonts_paths() == {font_path, bold_path}
+    assert len(enumerations) == 3
+
+
+def test_get_system_fonts_paths_detect_the_first_user_font(tmp_path, monkeypatch):
+    os.makedirs(tmp_path / "system_fonts")
+    user_fonts_dir = tmp_path / "home" / ".local" / "share" / "fonts"
+    font_path = str(tmp_path / "system_fonts" / "Raleway-Regular.ttf")
+    shutil.copyfile(os.path.join(raleway_dir, "Raleway-Regular.ttf"), font_path)
+
+    def get_system_fonts_filename():
+        fonts_paths = {font_path}
+        if os.path.isdir(user_fonts_dir):
+            fonts_paths.update(str(user_fonts_dir / file) for file in os.listdir(user_fonts_dir))
+        return fonts_paths
+
+    monkeypatch.setattr(font_loader, "get_system_fonts_filename", get_system_fonts_filename)
+    monkeypatch.setattr(FontLoader, "get_system_font_directories_cache_file_path", lambda: tmp_path / "FontCollector_SystemFontDirectories.bin")
+    monkeypatch.setattr(FontLoader, "get_standard_fonts_directories", lambda: {str(tmp_path / "system_fonts"), str(user_fonts_dir)})
+
+    assert FontLoader.get_system_fonts_paths() == {font_path}
+    assert FontLoader.load_font_directories_cache_file(tmp_path / "FontCollector_SystemFontDirectories.bin")[1][str(user_fonts_dir)] is None
+
+    # The user fonts directory didn't exist, but it is watched
+    os.makedirs(user_fonts_dir)
+    bold_path = str(user_fonts_dir / "Raleway-Bold.ttf")
+    shutil.copyfile(os.path.join(raleway_dir, "Raleway-Bold.ttf"), bold_path)
+    assert FontLoader.get_system_fonts_paths() == {font_path, bold_path}
+
+
+def test_add_generated_fonts_save_the_cache_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(FontLoader, "get_generated_font_cache_file_path", lambda: tmp_path / "FontCollector_GeneratedFont.bin")
+    fonts = FontLoader.load_fonts_from_paths(
+        [os.path.join(raleway_dir, "Raleway-Regular.ttf"), os.path.join(raleway_dir, "Raleway-Bold.ttf")]
+    )
+
+    saved_caches = []
+    save_generated_fonts = FontLoader.save_generated_fonts
+
+    def count_save(generated_fonts):
+        saved_caches.append(set(generated_fonts))
+        save_generated_fonts(generated_fonts)
+
+    monkeypatch.setattr(FontLoader, "save_generated_fonts", count_save)
+
+    FontLoader.add_generated_fonts(fonts)
+    assert saved_caches == [set(fonts)]
+    assert FontLoader.load_generated_fonts() == set(fonts)
+
+
+def test_read_system_font_cache(tmp_path, monkeypatch):
+    font_path = str(tmp_path / "font.ttf")
+    shutil.copyfile(os.path.join(raleway_dir, "Raleway-Regular.ttf"), font_path)
+    monkeypatch.setattr(font_loader, "get_system_fonts_filename", lambda: {font_path})
+    monkeypatch.setattr(FontLoader, "get_system_font_directories_cache_file_path", lambda: tmp_path / "FontCollector_SystemFontDirectories.bin")
+    monkeypatch.setattr(FontLoader, "get_system_font_cache_file_path", lambda directory: tmp_path / "FontCollector_SystemFont_0.bin")
+    monkeypatch.setattr(FontLoader, "get_system_font_cache_files_paths", lambda: [tmp_path / "FontCollector_SystemFont_0.bin"])
+    monkeypatch.setattr(FontLoader, "get_system_mapped_font_index_file_path", lambda: tmp_path / "FontCollector_SystemFont.idx")
+
+    fonts = FontLoader.load_system_fonts()
+    assert FontLoader.read_system_font_cache() == (
+        fonts,
+        {font_path: FontLoader.get_file_signature(font_path)},
+        [tmp_path / "FontCollector_SystemFont_0.bin"],
+    )
+
+    # The index isn't built by reading it
+    assert FontLoader.read_system_font_cache(True, "mmap") == (set(), {}, [])
+    FontLoader.load_system_mapped_font_index().close()
+    assert FontLoader.read_system_font_cache(True, "mmap")[0] == fonts
+
+
+def test_load_additional_fonts_from_zip_archive(tmp_path, monkeypatch):
+    monkeypatch.setattr(FontLoader, "get_additional_font_cache_file_path", lambda directory: tmp_path / "cache.bin")
+    archive_path = str(tmp_path / "fonts.zip")
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.write(os.path.join(raleway_dir, "Raleway-Regular.ttf"), "Raleway/Raleway-Regular.ttf")
+        archive.write(os.path.join(raleway_dir, "Raleway-Bold.ttf"), "Raleway-Bold.ttf")
+        archive.writestr("readme.txt", "Not a font")
+
+    fonts = FontLoader.load_additional_fonts([archive_path])
+    assert sorted(font.filename for font in fonts) == [
+        FontFile.join_archive_member(archive_path, "Raleway-Bold.ttf"),
+        FontFile.join_archive_member(archive_path, "Raleway/Raleway-Regular.ttf"),
+    ]
+    assert sorted(font.weight for font in fonts) == [400, 700]
+
+    # The members are cached with the signature of the archive
+    cached_fonts, files_signature = FontLoader.load_font_cache_file(tmp_path / "cache.bin")
+    assert cached_fonts == fonts
+    assert set(files_signature.values()) == {FontLoader.get_file_signature(archive_path)}
+
+    font = next(font for font in fonts if font.weight == 700)
+    assert font.get_missing_glyphs("abc") == set()
+
+
+def test_load_additional_fonts_path_with_archive_member_separator(tmp_path, monkeypatch):
+    monkeypatch.setattr(FontLoader, "get_additional_font_cache_file_path", lambda directory: tmp_path / "cache.bin")
+    # A path on the disk can contain the separator, it isn't an archive member
+    font_path = str(tmp_path / "weird::name.ttf")
+    shutil.copyfile(os.path.join(raleway_dir, "Raleway-Bold.ttf"), font_path)
+    assert not FontFile.is_archive_member(font_path)
+    assert FontLoader.get_file_signature(font_path) == FontLoader.get_file_signature(str(tmp_path / "weird::name.ttf"))
+
+    # Even in the path of an archive
+    os.makedirs(tmp_path / "a::b")
+    archive_path = str(tmp_path / "a::b" / "fonts.zip")
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.write(os.path.join(raleway_dir, "Raleway-Regular.ttf"), "Raleway::Regular.ttf")
+    member_path = FontFile.join_archive_member(archive_path, "Raleway::Regular.ttf")
+    assert FontFile.split_archive_member(member_path) == (archive_path, "Raleway::Regular.ttf")
+
+    fonts = FontLoader.load_additional_fonts([font_path, archive_path])
+    assert sorted((font.filename, font.weight) for font in fonts) == [(member_path, 400), (font_path, 700)]
+    assert all(font.get_missing_glyphs("abc") == set() for font in fonts)
@@ -1,6 +1,14 @@
+import os
+import pytest
+import shutil
+from ctypes import addressof
+from font_collector.font_file import FontFacePool, FontFileReader
 from font_collector.font_parser import FontParser
+from fontTools.ttLib.ttFont import TTFont
 from fontTools.ttLib.tables._n_a_m_e import NameRecord
 
+dir_path = os.path.dirname(os.path.realpath(__file__))
+
 
 def test_fallback_encoding():
     # The string are from the font in this pack: https://github.com/libass/libass/issues/643#issuecomment-1476459274
@@ -22,3 +30,52 @@ def test_fallback_encoding():
     name_record.platEncID = 4
     name_record.langID = 0
     FontParser.get_decoded_name(name_record) == "文鼎中特廣告體"
+
+
+def test_font_file_reader_shared_by_fonttools_and_freetype():
+    font_path = os.path.join(dir_path, "fonts", "Raleway", "Raleway-Regular.ttf")
+
+    with FontFileReader(font_path) as font_file_reader:
+        ttFont = TTFont(font_file_reader.get_stream())
+        assert FontParser.get_font_postscript_property(font_path, 0, font_file_reader) == "Raleway-Regular"
+        # The face is created once
+        assert font_file_reader.get_face(0) is font_file_reader.get_face(0)
+
+        del ttFont["OS/2"]
+        assert FontParser.get_font_italic_bold_property(ttFont, font_path, 0, font_file_reader) == (False, 400)
+
+    # The mapping is released when the reader is closed
+    with pytest.raises(ValueError):
+        font_file_reader.get_stream()
+
+    assert FontParser.get_font_postscript_property(font_path, 0) == "Raleway-Regular"
+
+
+def test_font_face_pool(tmp_path):
+    font_path = str(tmp_path / "Raleway-Regular.ttf")
+    other_font_path = str(tmp_path / "Raleway-Bold.ttf")
+    shutil.copy(os.path.join(dir_path, "fonts", "Raleway", "Raleway-Regular.ttf"), font_path)
+    shutil.copy(os.path.join(dir_path, "fonts", "Raleway", "Raleway-Bold.ttf"), other_font_path)
+
+    pool = FontFacePool(max_size=1)
+
+    with pool.acquire(font_path, 0) as face:
+        # A lent face isn't shared with another user
+        with pool.acquire(font_path, 0) as other_face:
+            assert addressof(other_face.contents) != addressof(face.contents)
+        face_address = addressof(other_face.contents)
+    assert len(pool) == 1
+
+    # The face is used again
+    with pool.acquire(font_path, 0) as face:
+        assert addressof(face.contents) == face_address
+
+    # The least recently used face is released
+    with pool.acquire(other_font_path, 0):
+        pass
+    assert len(pool) == 1
+    with pool.acquire(other_font_path, 0):
+        assert len(pool) == 0
+
+    pool.close()
+    assert len(pool) == 0
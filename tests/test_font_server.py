@@ -0,0 +1,126 @@
+import os
+import pytest
+import socket
+import stat
+import threading
+from font_collector import AssDocument, Font, FontLoader, Helpers
+from font_collector import font_server as font_server_module
+from font_collector.font_server import FontClient, FontServer
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+path_ass = os.path.join(dir_path, "ass", "Bold italic test.ass")
+generated_fonts_dir = os.path.join(dir_path, "fonts", "Raleway", "generated_fonts")
+
+
+def test_font_server(tmp_path):
+    socket_path = tmp_path / "FontCollector.sock"
+    font_loader = FontLoader([generated_fonts_dir], False)
+    config = FontServer.get_config([generated_fonts_dir], False)
+
+    assert FontClient.connect(socket_path) is None
+
+    with FontServer(font_loader, config, socket_path) as font_server:
+        thread = threading.Thread(target=font_server.serve_forever)
+        thread.start()
+
+        try:
+            with FontClient.connect(socket_path) as font_client:
+                assert font_client.ping()["config"] == config
+
+                style = list(AssDocument.from_file(path_ass).get_used_style().keys())[0]
+                expected_font_result = Helpers.get_used_font_by_style(font_loader, style)
+
+                font_result = font_client.get_used_fonts_by_style([style])[0]
+                assert font_result.font == expected_font_result.font
+                assert font_result.font.filename == expected_font_result.font.filename
+                assert font_result.mismatch_bold == expected_font_result.mismatch_bold
+                assert font_result.mismatch_italic == expected_font_result.mismatch_italic
+
+                assert font_client.get_missing_glyphs(font_result.font, "a€") == font_result.font.get_missing_glyphs("a€")
+
+                # The coverage is sent with the font, so the server doesn't need to open the font file
+                assert font_result.font.coverage is not None
+                assert font_result.font.coverage == expected_font_result.font.coverage
+                font_without_file = Font(
+                    str(tmp_path / "deleted.ttf"), 0, ["Raleway"], 400, False, [], {}, font_result.font.coverage
+                )
+                assert font_client.get_missing_glyphs(font_without_file, "a€") == font_result.font.get_missing_glyphs("a€")
+
+                analyzed_styles = font_client.analyze(path_ass)
+                assert len(analyzed_styles) == 1
+                assert analyzed_styles[0]["style"] == style
+                assert analyzed_styles[0]["font_result"].font == expected_font_result.font
+        finally:
+            font_server.shutdown()
+            thread.join()
+
+    assert not os.path.exists(socket_path)
+
+
+def test_font_server_socket_is_only_accessible_by_its_user(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    socket_path = FontServer.get_socket_path()
+
+    assert socket_path.parent == tmp_path / "FontCollector"
+    assert stat.S_IMODE(os.stat(socket_path.parent).st_mode) == 0o700
+
+    with FontServer(FontLoader([], False), FontServer.get_config([], False)) as font_server:
+        assert font_server.server_address == str(socket_path)
+        assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+
+    # A directory that other users can access isn't used
+    os.chmod(socket_path.parent, 0o777)
+    with pytest.raises(PermissionError):
+        FontServer.get_socket_path()
+    assert FontClient.connect() is None
+
+
+def test_font_server_and_client_refuse_another_user(tmp_path, monkeypatch):
+    socket_path = tmp_path / "FontCollector.sock"
+
+    with FontServer(FontLoader([], False), FontServer.get_config([], False), socket_path) as font_server:
+        thread = threading.Thread(target=font_server.serve_forever)
+        thread.start()
+
+        try:
+            current_uid = os.getuid()
+            client_connection, server_connection = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+            with client_connection, server_connection:
+                assert font_server.verify_request(server_connection, None)
+
+                # The server and its socket belong to another user
+                monkeypatch.setattr(os, "getuid", lambda: current_uid + 1)
+                assert not font_server.verify_request(server_connection, None)
+                assert FontClient.connect(socket_path) is None
+
+                # Even if the socket seems to belong to the current user, the server is verified
+                monkeypatch.setattr(font_server_module, "_is_owned_by_current_user", lambda socket_path: True)
+                assert FontClient.connect(socket_path) is None
+        finally:
+            monkeypatch.undo()
+            font_server.shutdown()
+            thread.join()
+
+
+def test_font_server_only_replace_a_remaining_socket(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+
+    # Connecting doesn't create the socket directory
+    assert FontClient.connect() is None
+    assert not os.path.exists(tmp_path / "FontCollector")
+
+    # Any other file is kept
+    notes_path = tmp_path / "notes.txt"
+    notes_path.write_text("notes")
+    with pytest.raises(FileExistsError):
+        FontServer(FontLoader([], False), FontServer.get_config([], False), notes_path)
+    assert notes_path.read_text() == "notes"
+
+    # The socket of a killed server is replaced
+    socket_path = tmp_path / "FontCollector.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as remaining_socket:
+        remaining_socket.bind(str(socket_path))
+
+    with FontServer(FontLoader([], False), FontServer.get_config([], False), socket_path) as font_server:
+        assert font_server.server_address == str(socket_path)
+        assert stat.S_ISSOCK(os.lstat(socket_path).st_mode)
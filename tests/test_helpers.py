@@ -1,5 +1,6 @@
 import os
-from font_collector import AssDocument, Helpers, FontLoader
+import zipfile
+from font_collector import AssDocument, AssStyle, Font, FontFile, FontIndex, FontLoader, Helpers
 
 # Get ass path used for tests
 dir_path = os.path.dirname(os.path.realpath(__file__))
@@ -25,3 +26,79 @@ def test_get_used_font_by_style():
     # If it would have prefer to match the italic, the weight would be 700 and italic would be true.
     assert font_result.font.weight == 900
     assert font_result.font.italic == False
+
+
+def test_get_used_font_by_style_with_font_index(tmp_path):
+    style = list(subtitle.get_used_style().keys())[0]
+    font_collection = FontLoader(
+        [os.path.join(dir_path, "fonts", "Raleway", "generated_fonts")], False
+    ).fonts
+
+    with FontIndex(tmp_path / "index.db") as font_index:
+        font_index.add_fonts(
+            font_collection,
+            {font.filename: FontLoader.get_file_signature(font.filename) for font in font_collection},
+        )
+
+        font_result = Helpers.get_used_font_by_style(font_index, style)
+
+    assert font_result.font == Helpers.get_used_font_by_style(font_collection, style).font
+    assert font_result.font.coverage is not None
+    assert font_result.font.coverage == Helpers.get_used_font_by_style(font_collection, style).font.coverage
+    assert font_result.font.weight == 900
+    assert font_result.font.italic == False
+
+
+def test_get_used_font_by_style_load_system_fonts_only_when_needed(monkeypatch):
+    style = list(subtitle.get_used_style().keys())[0]
+    system_font = FontLoader.load_fonts_from_paths([os.path.join(dir_path, "fonts", "font_mac.TTF")])[0]
+
+    loaded_system_fonts = []
+
+    def load_system_fonts(jobs=1, force_enumeration=False, parse_timeout=None):
+        loaded_system_fonts.append(True)
+        return {system_font}
+
+    monkeypatch.setattr(FontLoader, "load_system_fonts", load_system_fonts)
+
+    font_loader = FontLoader(
+        [os.path.join(dir_path, "fonts", "Raleway", "generated_fonts")], lazy_system_font=True
+    )
+
+    # The style is found in the additional fonts
+    font_result = Helpers.get_used_font_by_style(font_loader, style)
+    assert font_result.font.weight == 900
+    assert loaded_system_fonts == []
+
+    # "Brushstroke Plain" is only in the system fonts
+    font_result = Helpers.get_used_font_by_style(font_loader, AssStyle("brushstroke plain", 400, False))
+    assert font_result.font == system_font
+    assert loaded_system_fonts == [True]
+
+    Helpers.get_used_font_by_style(font_loader, AssStyle("brushstroke plain", 400, False))
+    assert loaded_system_fonts == [True]
+
+
+def test_get_used_font_by_style_prefer_family_name_to_exact_name_in_every_tier(monkeypatch):
+    additional_font = Font("additional.ttf", 0, ["other family"], 400, False, ["arial"])
+    system_font = Font("system.ttf", 0, ["arial"], 400, False, ["arial regular"])
+
+    monkeypatch.setattr(FontLoader, "load_additional_fonts", lambda *args, **kwargs: {additional_font})
+    monkeypatch.setattr(FontLoader, "load_system_fonts", lambda *args, **kwargs: {system_font})
+    font_loader = FontLoader(["additional"], lazy_system_font=True)
+
+    # The additional font only has the exact name, so the system fonts are searched by family name first
+    assert Helpers.get_used_font_by_style(font_loader, AssStyle("arial", 400, False)).font.filename == "system.ttf"
+    assert Helpers.get_used_font_by_style(font_loader, AssStyle("other family", 400, False)).font.filename == "additional.ttf"
+
+
+def test_copy_font_to_directory_from_zip_archive(tmp_path):
+    archive_path = str(tmp_path / "fonts.zip")
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.write(os.path.join(dir_path, "fonts", "Raleway", "Raleway-Bold.ttf"), "Raleway/Raleway-Bold.ttf")
+
+    font = Font.from_font_path(FontFile.join_archive_member(archive_path, "Raleway/Raleway-Bold.ttf"))[0]
+    Helpers.copy_font_to_directory([font], tmp_path / "output")
+
+    with open(os.path.join(dir_path, "fonts", "Raleway", "Raleway-Bold.ttf"), "rb") as file:
+        assert (tmp_path / "output" / "Raleway-Bold.ttf").read_bytes() == file.read()
@@ -0,0 +1,71 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from font_collector import Font, FontLoader, MappedFontIndex
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+raleway_dir = os.path.join(dir_path, "fonts", "Raleway")
+variable_font = os.path.join(dir_path, "fonts", "font_without axis_value.ttf")
+
+
+def test_mapped_font_index_lookup(tmp_path):
+    fonts_paths = [
+        os.path.join(raleway_dir, file)
+        for file in os.listdir(raleway_dir)
+        if file.endswith(".ttf")
+    ] + [variable_font]
+    fonts = FontLoader.load_fonts_from_paths(fonts_paths)
+    files_signature = {font_path: FontLoader.get_file_signature(font_path) for font_path in fonts_paths}
+    index_path = tmp_path / "index.idx"
+
+    MappedFontIndex.build(index_path, fonts, files_signature)
+
+    with MappedFontIndex(index_path) as font_index:
+        assert len(font_index) == len(fonts)
+        assert font_index.files_signature == files_signature
+        assert font_index.fonts == set(fonts)
+        assert {(font.filename, font.font_index): font.coverage for font in font_index.fonts} == {
+            (font.filename, font.font_index): font.coverage for font in fonts
+        }
+
+        assert set(font_index.get_fonts_by_family_name("raleway")) == set(
+            font for font in fonts if "raleway" in font.family_names
+        )
+        assert font_index.get_fonts_by_exact_name("raleway black") == [
+            font for font in fonts if "raleway black" in font.exact_names
+        ]
+        assert font_index.get_fonts_by_family_name("does not exist") == []
+
+        inter_fonts = font_index.get_fonts_by_family_name("inter")
+        assert len(inter_fonts) == 18
+        assert all(font.is_var for font in inter_fonts)
+        assert sorted(font.named_instance_coordinates["wght"] for font in inter_fonts) == sorted(
+            font.named_instance_coordinates["wght"] for font in fonts if font.filename == variable_font
+        )
+
+
+def test_mapped_font_index_empty(tmp_path):
+    index_path = tmp_path / "index.idx"
+    MappedFontIndex.build(index_path, [], {})
+
+    with MappedFontIndex(index_path) as font_index:
+        assert len(font_index) == 0
+        assert font_index.fonts == set()
+        assert font_index.get_fonts_by_exact_name("raleway") == []
+
+
+def _get_family_names_in_worker(font_index, family_name):
+    return [font.filename for font in font_index.get_fonts_by_family_name(family_name)]
+
+
+def test_font_loader_to_mapped_font_index_shared_with_workers(tmp_path):
+    font_loader = FontLoader([raleway_dir], False)
+
+    with font_loader.to_mapped_font_index(tmp_path / "fonts.idx") as font_index:
+        assert font_index.fonts == font_loader.fonts
+
+        # The index is sent to the workers by its path
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            filenames = list(executor.map(_get_family_names_in_worker, [font_index, font_index], ["raleway", "raleway"]))
+
+        assert filenames[0] == filenames[1]
+        assert sorted(filenames[0]) == sorted(font.filename for font in font_loader.get_fonts_by_family_name("raleway"))
@@ -0,0 +1,45 @@
+import os
+import zipfile
+from font_collector import Font, FontFile, Mkvpropedit
+from font_collector import mkvpropedit as mkvpropedit_module
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+raleway_dir = os.path.join(dir_path, "fonts", "Raleway")
+
+
+def test_merge_fonts_into_mkv_archive_members_with_same_name(tmp_path, monkeypatch):
+    archive_path = str(tmp_path / "fonts.zip")
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.write(os.path.join(raleway_dir, "Raleway-Regular.ttf"), "Regular/Raleway.ttf")
+        archive.write(os.path.join(raleway_dir, "Raleway-Bold.ttf"), "Bold/Raleway.ttf")
+
+    fonts = [
+        Font.from_font_path(FontFile.join_archive_member(archive_path, "Regular/Raleway.ttf"))[0],
+        Font.from_font_path(FontFile.join_archive_member(archive_path, "Bold/Raleway.ttf"))[0],
+    ]
+
+    attachments = []
+
+    def run(command, **kwargs):
+        # The temporary files only exist while mkvpropedit run
+        for argument in command.split(" --add-attachment ")[1:]:
+            with open(argument.strip('"'), "rb") as file:
+                attachments.append((os.path.basename(argument.strip('"')), file.read()))
+
+        class Output:
+            stderr = ""
+
+        return Output()
+
+    monkeypatch.setattr(Mkvpropedit, "is_mkvpropedit_path_valid", lambda: True)
+    monkeypatch.setattr(Mkvpropedit, "is_mkv", lambda filename: True)
+    monkeypatch.setattr(mkvpropedit_module.subprocess, "run", run)
+    Mkvpropedit.merge_fonts_into_mkv(fonts, tmp_path / "video.mkv")
+
+    expected_attachments = []
+    for font_name in ["Raleway-Regular.ttf", "Raleway-Bold.ttf"]:
+        with open(os.path.join(raleway_dir, font_name), "rb") as file:
+            expected_attachments.append(("Raleway.ttf", file.read()))
+
+    # Each member is attached once, with its own content and its name
+    assert sorted(attachments) == sorted(expected_attachments)